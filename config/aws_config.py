@@ -1,12 +1,146 @@
 # DynamoDB connection
+# One process-wide registry: every module shares the same pooled, thread-safe low-level client.
+# boto3 resources are not thread-safe, so get_dynamodb()/get_table() hand out facades that
+# resolve to a per-thread resource built on that client (no extra connections or model loads).
 
 import boto3
 import os
+import threading
+from botocore.config import Config
 
-def get_dynamodb():
-    return boto3.resource(
-        "dynamodb",
-        region_name="ap-southeast-1",
-        aws_access_key_id=os.getenv("AWS_ACCESS_KEY"),
-        aws_secret_access_key=os.getenv("AWS_SECRET_KEY")
-    )
+DEFAULT_REGION = "ap-southeast-1"
+
+# Shared connection pool with keep-alive and adaptive retries
+BOTO_CONFIG = Config(
+    max_pool_connections=int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50")),
+    tcp_keepalive=True,
+    connect_timeout=3,
+    read_timeout=10,
+    retries={"max_attempts": 5, "mode": "adaptive"},
+)
+
+_FROM_ENV = object()
+
+_lock = threading.Lock()
+_clients = {}          # credentials -> low-level client (thread-safe, owns the connection pool)
+_resource_classes = {} # credentials -> generated dynamodb ServiceResource class
+_resources = {}        # credentials -> _ThreadLocalResource
+_tables = {}           # (table name, *credentials) -> _ThreadLocalTable
+
+
+class _ThreadState(threading.local):
+    def __init__(self):
+        self.resources = {}
+        self.tables = {}
+
+
+_local = _ThreadState()
+
+
+def _resolve(region_name, aws_access_key_id, aws_secret_access_key):
+    if aws_access_key_id is _FROM_ENV:
+        aws_access_key_id = os.getenv("AWS_ACCESS_KEY")
+    if aws_secret_access_key is _FROM_ENV:
+        aws_secret_access_key = os.getenv("AWS_SECRET_KEY")
+    return region_name, aws_access_key_id, aws_secret_access_key
+
+
+def _shared_client(key):
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                region_name, access_key, secret_key = key
+                session = boto3.session.Session(
+                    region_name=region_name,
+                    aws_access_key_id=access_key,
+                    aws_secret_access_key=secret_key
+                )
+                resource = session.resource("dynamodb", config=BOTO_CONFIG)
+                _resource_classes[key] = type(resource)
+                client = _clients[key] = resource.meta.client
+    return client
+
+
+def _thread_resource(key):
+    """This thread's DynamoDB resource, sharing the process-wide client"""
+    resource = _local.resources.get(key)
+    if resource is None:
+        client = _shared_client(key)
+        resource = _local.resources[key] = _resource_classes[key](client=client)
+    return resource
+
+
+class _ThreadLocalResource:
+    """Stands in for a DynamoDB resource; every thread uses its own underneath"""
+
+    def __init__(self, key):
+        self._key = key
+
+    def Table(self, name):
+        return _table_for(name, self._key)
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return getattr(_thread_resource(self._key), attr)
+
+
+class _ThreadLocalTable:
+    """Stands in for a Table; safe to keep in a module global and use from any thread"""
+
+    def __init__(self, key, name):
+        self._key = key
+        self.name = name
+
+    def _table(self):
+        table_key = (self.name,) + self._key
+        table = _local.tables.get(table_key)
+        if table is None:
+            table = _local.tables[table_key] = _thread_resource(self._key).Table(self.name)
+        return table
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return getattr(self._table(), attr)
+
+    def __repr__(self):
+        return f"dynamodb.Table(name={self.name!r})"
+
+
+def _table_for(table_name, key):
+    table_key = (table_name,) + key
+    table = _tables.get(table_key)
+    if table is None:
+        with _lock:
+            table = _tables.setdefault(table_key, _ThreadLocalTable(key, table_name))
+    return table
+
+
+def get_client(region_name=DEFAULT_REGION, aws_access_key_id=_FROM_ENV, aws_secret_access_key=_FROM_ENV):
+    """Return the shared low-level DynamoDB client (thread-safe) for these credentials."""
+    return _shared_client(_resolve(region_name, aws_access_key_id, aws_secret_access_key))
+
+
+def get_dynamodb(region_name=DEFAULT_REGION, aws_access_key_id=_FROM_ENV, aws_secret_access_key=_FROM_ENV):
+    """
+    Return the shared DynamoDB resource for these credentials, creating the client once per process.
+    Keys default to AWS_ACCESS_KEY / AWS_SECRET_KEY; pass None to use the default boto3 credential chain.
+    The returned object can be shared across threads: each thread gets its own resource on the shared client.
+    """
+    key = _resolve(region_name, aws_access_key_id, aws_secret_access_key)
+    resource = _resources.get(key)
+    if resource is None:
+        with _lock:
+            resource = _resources.setdefault(key, _ThreadLocalResource(key))
+    return resource
+
+
+def get_table(table_name, region_name=DEFAULT_REGION, aws_access_key_id=_FROM_ENV, aws_secret_access_key=_FROM_ENV):
+    """
+    Return a cached, lazy table handle (usable from any thread). No DescribeTable
+    round trip is made; a missing table surfaces on the first real read or write.
+    """
+    return _table_for(table_name, _resolve(region_name, aws_access_key_id, aws_secret_access_key))
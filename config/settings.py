@@ -14,4 +14,10 @@ APPOINTMENTS_TABLE = "appointments"
 FEEDBACK_TABLE = "feedback"
 
 # OpenAI API Key
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
\ No newline at end of file
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# DynamoDB parallel scan segments used for full-table (admin) scans
+SCAN_SEGMENTS = int(os.getenv("DYNAMODB_SCAN_SEGMENTS", "4"))
+
+# Seconds a user looked up by ID stays in the in-process user directory cache
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "300"))
@@ -2,6 +2,7 @@
 
 from config.aws_config import get_dynamodb
 from boto3.dynamodb.conditions import Attr
+from database.indexes import query_by
 from datetime import datetime, timedelta
 
 dynamodb = get_dynamodb()
@@ -38,16 +39,10 @@ def update_appointment_status(appointment_id, status, rejection_note=None):
     )
 
 def get_appointments_by_parent(parent_id):
-    response = appointments_table.scan(
-        FilterExpression=Attr("ParentID").eq(parent_id)
-    )
-    return response.get("Items", [])
+    return query_by(appointments_table, "ParentID", parent_id)
 
 def get_appointments_by_therapist(therapist_id):
-    response = appointments_table.scan(
-        FilterExpression=Attr("TherapistID").eq(therapist_id)
-    )
-    return response.get("Items", [])
+    return query_by(appointments_table, "TherapistID", therapist_id)
 
 def get_available_slots(therapist_id):
     # Get existing appointments for the therapist
@@ -68,10 +63,10 @@ def get_available_slots(therapist_id):
     return slots
 
 def get_upcoming_approved_appointments_by_parent(parent_id):
-    response = appointments_table.scan(
-        FilterExpression=Attr("ParentID").eq(parent_id) & Attr("Status").eq("APPROVED")
+    items = query_by(
+        appointments_table, "ParentID", parent_id,
+        filter_expression=Attr("Status").eq("APPROVED")
     )
-    items = response.get("Items", [])
     now = datetime.now()
     today_str = now.strftime("%Y-%m-%d")
     upcoming = []
@@ -82,10 +77,10 @@ def get_upcoming_approved_appointments_by_parent(parent_id):
     return upcoming
 
 def get_upcoming_approved_appointments_by_therapist(therapist_id):
-    response = appointments_table.scan(
-        FilterExpression=Attr("TherapistID").eq(therapist_id) & Attr("Status").eq("APPROVED")
+    items = query_by(
+        appointments_table, "TherapistID", therapist_id,
+        filter_expression=Attr("Status").eq("APPROVED")
     )
-    items = response.get("Items", [])
     now = datetime.now()
     today_str = now.strftime("%Y-%m-%d")
     upcoming = []
@@ -1,7 +1,8 @@
 # CRUD child data
 
 from config.aws_config import get_dynamodb
-from boto3.dynamodb.conditions import Attr
+from database.indexes import query_by
+from database.pagination import parallel_scan_all
 from datetime import datetime
 
 dynamodb = get_dynamodb()
@@ -31,16 +32,10 @@ def assign_therapist_to_child(child_id, therapist_id, therapist_name):
     )
 
 def get_children_by_parent(parent_id):
-    response = children_table.scan(
-        FilterExpression=Attr("ParentID").eq(parent_id)
-    )
-    return response.get("Items", [])
+    return query_by(children_table, "ParentID", parent_id)
 
 def get_children_by_therapist(therapist_id):
-    response = children_table.scan(
-        FilterExpression=Attr("TherapistID").eq(therapist_id)
-    )
-    return response.get("Items", [])
+    return query_by(children_table, "TherapistID", therapist_id)
 
 def update_child(child_id, updates):
     """
@@ -56,5 +51,4 @@ def update_child(child_id, updates):
     return True
 
 def get_all_children():
-    response = children_table.scan()
-    return response.get("Items", [])
+    return parallel_scan_all(children_table)
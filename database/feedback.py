@@ -1,7 +1,7 @@
 # CRUD session feedback
 
 from config.aws_config import get_dynamodb
-from boto3.dynamodb.conditions import Attr
+from database.indexes import query_by
 
 dynamodb = get_dynamodb()
 feedback_table = dynamodb.Table("feedback")
@@ -19,10 +19,7 @@ def create_feedback(feedback_id, child_id, parent_id, therapist_id, rating, note
     )
 
 def get_feedback_by_child(child_id):
-    response = feedback_table.scan(
-        FilterExpression=Attr("ChildID").eq(child_id)
-    )
-    return response.get("Items", [])
+    return query_by(feedback_table, "ChildID", child_id)
 
 def submit_feedback():
     pass
@@ -0,0 +1,125 @@
+# Declared GSI catalog and the query router used by database/* lookups
+
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+
+from database.pagination import query_all, scan_all
+
+# Primary key of every table: (hash key, range key or None)
+TABLE_KEYS = {
+    "users": ("UserID", None),
+    "children": ("ChildID", None),
+    "sessions": ("session_id", None),
+    "messages": ("message_id", None),
+    "reports": ("ReportID", None),
+    "appointments": ("AppointmentID", None),
+    "feedback": ("FeedbackID", None),
+    "nlp": ("session_id", None),
+    "Emotion": ("session_id", "timestamp"),
+}
+
+# Global secondary indexes per table: index name -> (hash key, range key or None)
+INDEX_CATALOG = {
+    "users": {
+        "Email-index": ("Email", None),
+    },
+    "children": {
+        "ParentID-index": ("ParentID", None),
+        "TherapistID-index": ("TherapistID", None),
+    },
+    "sessions": {
+        "child_id-created_at-index": ("child_id", "created_at"),
+    },
+    "messages": {
+        "session_id-timestamp-index": ("session_id", "timestamp"),
+    },
+    "reports": {
+        "ChildID-index": ("ChildID", None),
+        "TherapistID-index": ("TherapistID", None),
+    },
+    "appointments": {
+        "ParentID-index": ("ParentID", None),
+        "TherapistID-index": ("TherapistID", None),
+    },
+    "feedback": {
+        "ChildID-index": ("ChildID", None),
+    },
+}
+
+# Indexes that failed at runtime (not created yet); lookups on them go straight to a scan
+_missing_indexes = set()
+
+
+def find_index(table_name, attribute):
+    """Return (index name, range key) of the declared GSI hashed on attribute, or (None, None)."""
+    for index_name, (hash_key, range_key) in INDEX_CATALOG.get(table_name, {}).items():
+        if hash_key == attribute:
+            return index_name, range_key
+    return None, None
+
+
+def _is_missing_index_error(error):
+    """
+    True only if the index itself does not exist. Other ValidationExceptions
+    (bad expression, wrong key type, ...) are caller bugs and must surface,
+    not silently switch the lookup to scans for the rest of the process.
+    """
+    details = error.response.get("Error", {})
+    code = details.get("Code", "")
+    if code == "ResourceNotFoundException":
+        return True
+    message = details.get("Message", "").lower()
+    return code == "ValidationException" and "specified index" in message
+
+
+def query_by(table, attribute, value, filter_expression=None, scan_forward=True, max_items=None,
+             range_from=None, **kwargs):
+    """
+    Return all items of table whose attribute equals value.
+    range_from restricts the result to items whose index range key is >= range_from.
+
+    Routes through the declared GSI for (table, attribute) so the read costs
+    O(matching rows). If the index is not declared or does not exist yet,
+    falls back to a paginated filter-scan (sorted by the index range key when
+    there is one), so callers see the same result either way.
+    """
+    table_name = table.name
+    index_name, range_key = find_index(table_name, attribute)
+    if range_from is not None and not range_key:
+        raise ValueError(f"No declared index on {table_name}.{attribute} has a range key")
+
+    if index_name and (table_name, index_name) not in _missing_indexes:
+        query_kwargs = dict(kwargs)
+        if filter_expression is not None:
+            query_kwargs["FilterExpression"] = filter_expression
+        key_condition = Key(attribute).eq(value)
+        if range_from is not None:
+            key_condition = key_condition & Key(range_key).gte(range_from)
+        try:
+            return query_all(
+                table,
+                max_items=max_items,
+                IndexName=index_name,
+                KeyConditionExpression=key_condition,
+                ScanIndexForward=scan_forward,
+                **query_kwargs
+            )
+        except ClientError as e:
+            if not _is_missing_index_error(e):
+                raise
+            print(f"⚠️ Index {index_name} not available on {table_name}, using scan: {e}")
+            _missing_indexes.add((table_name, index_name))
+
+    condition = Attr(attribute).eq(value)
+    if range_from is not None:
+        condition = condition & Attr(range_key).gte(range_from)
+    if filter_expression is not None:
+        condition = condition & filter_expression
+    # A query page Limit would turn the scan into one-row pages; read full pages instead
+    kwargs.pop("Limit", None)
+    items = scan_all(table, FilterExpression=condition, **kwargs)
+    if range_key:
+        items.sort(key=lambda x: x.get(range_key, ""), reverse=not scan_forward)
+    if max_items is not None:
+        items = items[:max_items]
+    return items
@@ -1,7 +1,7 @@
 # CRUD for messages
 
 from config.aws_config import get_dynamodb
-from boto3.dynamodb.conditions import Attr
+from database.indexes import query_by
 
 dynamodb = get_dynamodb()
 messages_table = dynamodb.Table("messages")
@@ -19,12 +19,8 @@ def create_message(message_id, session_id, sender, text, timestamp):
 
 def get_messages_by_session(session_id):
     try:
-        response = messages_table.scan(
-            FilterExpression=Attr("session_id").eq(session_id)
-        )
-        # Sort by timestamp
-        items = response.get("Items", [])
-        items.sort(key=lambda x: x['timestamp'])
+        # session_id-timestamp-index returns the messages already ordered by timestamp
+        items = query_by(messages_table, "session_id", session_id)
         # Map to expected format: Sender from role, Text from content, Timestamp from timestamp
         for msg in items:
             msg['Sender'] = msg.pop('role')
@@ -0,0 +1,253 @@
+"""
+Create and verify the GSIs declared in database/indexes.py
+
+Usage (local DynamoDB stand-in, e.g. DynamoDB Local on port 8000):
+    python -m database.migrate_indexes --endpoint-url http://localhost:8000 --create-tables
+    python -m database.migrate_indexes --endpoint-url http://localhost:8000 --verify-only
+
+A GSI with a range key only contains items that have that attribute. Sessions
+written before created_at was added would be invisible to
+child_id-created_at-index, so migrate() backfills it (from the session's first
+message, its EndTime, or the epoch as a last resort) and verify() reports any
+session still missing it.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import boto3
+
+from database.indexes import INDEX_CATALOG, TABLE_KEYS
+
+
+def get_client(endpoint_url=None, region_name=None):
+    """DynamoDB client; a local endpoint gets dummy credentials if none are set."""
+    kwargs = {"region_name": region_name or os.getenv("AWS_REGION", "ap-southeast-1")}
+    if endpoint_url:
+        kwargs["endpoint_url"] = endpoint_url
+        kwargs["aws_access_key_id"] = os.getenv("AWS_ACCESS_KEY", "local")
+        kwargs["aws_secret_access_key"] = os.getenv("AWS_SECRET_KEY", "local")
+    return boto3.client("dynamodb", **kwargs)
+
+
+def _key_schema(hash_key, range_key):
+    schema = [{"AttributeName": hash_key, "KeyType": "HASH"}]
+    if range_key:
+        schema.append({"AttributeName": range_key, "KeyType": "RANGE"})
+    return schema
+
+
+def _attribute_definitions(*key_pairs):
+    names = []
+    for hash_key, range_key in key_pairs:
+        for name in (hash_key, range_key):
+            if name and name not in names:
+                names.append(name)
+    return [{"AttributeName": name, "AttributeType": "S"} for name in names]
+
+
+def describe(client, table_name):
+    try:
+        return client.describe_table(TableName=table_name)["Table"]
+    except client.exceptions.ResourceNotFoundException:
+        return None
+
+
+def create_table(client, table_name):
+    """Create a table with its primary key and every declared GSI in one call."""
+    hash_key, range_key = TABLE_KEYS[table_name]
+    indexes = INDEX_CATALOG.get(table_name, {})
+    kwargs = {
+        "TableName": table_name,
+        "KeySchema": _key_schema(hash_key, range_key),
+        "AttributeDefinitions": _attribute_definitions((hash_key, range_key), *indexes.values()),
+        "BillingMode": "PAY_PER_REQUEST",
+    }
+    if indexes:
+        kwargs["GlobalSecondaryIndexes"] = [
+            {
+                "IndexName": index_name,
+                "KeySchema": _key_schema(index_hash, index_range),
+                "Projection": {"ProjectionType": "ALL"},
+            }
+            for index_name, (index_hash, index_range) in indexes.items()
+        ]
+    client.create_table(**kwargs)
+    client.get_waiter("table_exists").wait(TableName=table_name)
+    print(f"✅ Created table {table_name} with {len(indexes)} index(es)")
+
+
+def create_index(client, table, index_name, index_hash, index_range):
+    """Add one GSI to an existing table (DynamoDB allows one index creation per update)."""
+    index = {
+        "IndexName": index_name,
+        "KeySchema": _key_schema(index_hash, index_range),
+        "Projection": {"ProjectionType": "ALL"},
+    }
+    billing = table.get("BillingModeSummary", {}).get("BillingMode", "PROVISIONED")
+    if billing != "PAY_PER_REQUEST":
+        index["ProvisionedThroughput"] = {"ReadCapacityUnits": 5, "WriteCapacityUnits": 5}
+
+    client.update_table(
+        TableName=table["TableName"],
+        AttributeDefinitions=_attribute_definitions((index_hash, index_range)),
+        GlobalSecondaryIndexUpdates=[{"Create": index}],
+    )
+    print(f"🛠️ Creating index {index_name} on {table['TableName']}...")
+
+
+def wait_for_indexes(client, table_name, timeout=300):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        table = describe(client, table_name)
+        statuses = [gsi.get("IndexStatus") for gsi in table.get("GlobalSecondaryIndexes", [])]
+        if table.get("TableStatus") == "ACTIVE" and all(status == "ACTIVE" for status in statuses):
+            return True
+        time.sleep(2)
+    return False
+
+
+# Oldest possible created_at: sorts before every real session of the child
+EPOCH_CREATED_AT = "1970-01-01T00:00:00"
+
+
+def _sessions_missing_created_at(client):
+    """Yield session items that have a child_id but no created_at (low-level attribute format)."""
+    paginator = client.get_paginator("scan")
+    for page in paginator.paginate(
+        TableName="sessions",
+        FilterExpression="attribute_exists(child_id) AND attribute_not_exists(created_at)",
+        ProjectionExpression="session_id, EndTime",
+    ):
+        yield from page.get("Items", [])
+
+
+def _first_message_time(client, session_id):
+    try:
+        response = client.query(
+            TableName="messages",
+            IndexName="session_id-timestamp-index",
+            KeyConditionExpression="session_id = :s",
+            ExpressionAttributeValues={":s": {"S": session_id}},
+            ScanIndexForward=True,
+            Limit=1,
+        )
+    except client.exceptions.ResourceNotFoundException:
+        return None
+    items = response.get("Items", [])
+    return items[0]["timestamp"]["S"] if items and "timestamp" in items[0] else None
+
+
+def backfill_session_created_at(client):
+    """Give every session a created_at so child_id-created_at-index includes it. Returns the count."""
+    if not describe(client, "sessions"):
+        return 0
+    count = 0
+    for item in _sessions_missing_created_at(client):
+        session_id = item["session_id"]["S"]
+        created_at = (
+            _first_message_time(client, session_id)
+            or item.get("EndTime", {}).get("S")
+            or EPOCH_CREATED_AT
+        )
+        try:
+            client.update_item(
+                TableName="sessions",
+                Key={"session_id": {"S": session_id}},
+                UpdateExpression="SET created_at = :c",
+                ConditionExpression="attribute_not_exists(created_at)",
+                ExpressionAttributeValues={":c": {"S": created_at}},
+            )
+            count += 1
+        except client.exceptions.ConditionalCheckFailedException:
+            pass  # Written concurrently by the app
+    if count:
+        print(f"🛠️ Backfilled created_at on {count} session(s)")
+    return count
+
+
+def verify(client):
+    """Check every declared index exists, is ACTIVE and has the declared key schema."""
+    problems = []
+    for table_name, indexes in INDEX_CATALOG.items():
+        table = describe(client, table_name)
+        if not table:
+            problems.append(f"{table_name}: table missing")
+            continue
+        existing = {gsi["IndexName"]: gsi for gsi in table.get("GlobalSecondaryIndexes", [])}
+        for index_name, (index_hash, index_range) in indexes.items():
+            gsi = existing.get(index_name)
+            if not gsi:
+                problems.append(f"{table_name}.{index_name}: missing")
+            elif gsi["KeySchema"] != _key_schema(index_hash, index_range):
+                problems.append(f"{table_name}.{index_name}: key schema {gsi['KeySchema']} does not match catalog")
+            elif gsi.get("IndexStatus", "ACTIVE") != "ACTIVE":
+                problems.append(f"{table_name}.{index_name}: status {gsi.get('IndexStatus')}")
+            else:
+                # Prove the index answers queries
+                client.query(
+                    TableName=table_name,
+                    IndexName=index_name,
+                    KeyConditionExpression="#k = :v",
+                    ExpressionAttributeNames={"#k": index_hash},
+                    ExpressionAttributeValues={":v": {"S": "__verify__"}},
+                    Limit=1,
+                )
+
+    if describe(client, "sessions"):
+        missing = sum(1 for _ in _sessions_missing_created_at(client))
+        if missing:
+            problems.append(f"sessions: {missing} session(s) without created_at are not in child_id-created_at-index")
+    return problems
+
+
+def migrate(client, create_tables=False):
+    for table_name in TABLE_KEYS:
+        table = describe(client, table_name)
+        if not table:
+            if create_tables:
+                create_table(client, table_name)
+            else:
+                print(f"⚠️ Table {table_name} not found (use --create-tables on a local stand-in)")
+            continue
+
+        existing = {gsi["IndexName"] for gsi in table.get("GlobalSecondaryIndexes", [])}
+        for index_name, (index_hash, index_range) in INDEX_CATALOG.get(table_name, {}).items():
+            if index_name in existing:
+                continue
+            create_index(client, table, index_name, index_hash, index_range)
+            if not wait_for_indexes(client, table_name):
+                print(f"❌ Timed out waiting for {table_name}.{index_name}")
+                return False
+            table = describe(client, table_name)
+
+    backfill_session_created_at(client)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create and verify the DynamoDB GSIs used by database/*")
+    parser.add_argument("--endpoint-url", help="DynamoDB endpoint, e.g. http://localhost:8000 for DynamoDB Local")
+    parser.add_argument("--region", help="AWS region (default: $AWS_REGION or ap-southeast-1)")
+    parser.add_argument("--create-tables", action="store_true", help="Create missing tables (local stand-in only)")
+    parser.add_argument("--verify-only", action="store_true", help="Only check the indexes, do not create anything")
+    args = parser.parse_args(argv)
+
+    client = get_client(args.endpoint_url, args.region)
+
+    if not args.verify_only and not migrate(client, create_tables=args.create_tables):
+        return 1
+
+    problems = verify(client)
+    if problems:
+        for problem in problems:
+            print(f"❌ {problem}")
+        return 1
+    print("✅ All declared indexes exist and answer queries")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+# Paginated scan/query helpers shared by every table accessor
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import SCAN_SEGMENTS
+
+_PAGE_QUEUE_SIZE = 8
+_DONE = object()
+
+
+def iter_pages(operation, **kwargs):
+    """
+    Call a DynamoDB scan/query operation repeatedly, following LastEvaluatedKey.
+    Yields the Items of each page as soon as it arrives.
+    """
+    while True:
+        response = operation(**kwargs)
+        yield response.get("Items", [])
+        last_key = response.get("LastEvaluatedKey")
+        if not last_key:
+            return
+        kwargs["ExclusiveStartKey"] = last_key
+
+
+def _iter_limited(pages, max_items):
+    count = 0
+    for items in pages:
+        for item in items:
+            yield item
+            count += 1
+            if max_items is not None and count >= max_items:
+                return
+
+
+def _iter_parallel_pages(table, segments, kwargs):
+    """Run one paginated scan per segment on a thread pool, streaming pages back."""
+    pages = queue.Queue(maxsize=_PAGE_QUEUE_SIZE)
+    stop = threading.Event()
+
+    def _put(entry):
+        while not stop.is_set():
+            try:
+                pages.put(entry, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _scan_segment(segment):
+        try:
+            for items in iter_pages(table.scan, Segment=segment, TotalSegments=segments, **kwargs):
+                if not _put(items):
+                    return
+        except Exception as e:
+            _put(e)
+        finally:
+            _put(_DONE)
+
+    executor = ThreadPoolExecutor(max_workers=segments, thread_name_prefix="dynamodb-scan")
+    try:
+        for segment in range(segments):
+            executor.submit(_scan_segment, segment)
+
+        remaining = segments
+        while remaining:
+            entry = pages.get()
+            if entry is _DONE:
+                remaining -= 1
+            elif isinstance(entry, Exception):
+                raise entry
+            else:
+                yield entry
+    finally:
+        # Unblock workers if the consumer stopped early, then let them finish in the background
+        stop.set()
+        executor.shutdown(wait=False)
+
+
+def iter_scan(table, segments=1, max_items=None, **kwargs):
+    """
+    Stream every item of a scan, across all pages.
+
+    segments > 1 runs a DynamoDB parallel scan (Segment/TotalSegments) on a
+    thread pool; items then arrive in no particular order.
+    Extra kwargs (FilterExpression, ProjectionExpression, ...) are passed to scan().
+    """
+    if segments and segments > 1:
+        pages = _iter_parallel_pages(table, segments, kwargs)
+    else:
+        pages = iter_pages(table.scan, **kwargs)
+    return _iter_limited(pages, max_items)
+
+
+def scan_all(table, segments=1, max_items=None, **kwargs):
+    """Return every item of a scan as a list (see iter_scan)."""
+    return list(iter_scan(table, segments=segments, max_items=max_items, **kwargs))
+
+
+def parallel_scan_all(table, max_items=None, **kwargs):
+    """Full-table scan split into the configured number of parallel segments."""
+    return scan_all(table, segments=SCAN_SEGMENTS, max_items=max_items, **kwargs)
+
+
+def iter_query(table, max_items=None, **kwargs):
+    """Stream every item matched by a query, across all pages."""
+    return _iter_limited(iter_pages(table.query, **kwargs), max_items)
+
+
+def query_all(table, max_items=None, **kwargs):
+    """Return every item matched by a query as a list."""
+    return list(iter_query(table, max_items=max_items, **kwargs))
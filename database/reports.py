@@ -1,7 +1,8 @@
 # CRUD auto reports
 
 from config.aws_config import get_dynamodb
-from boto3.dynamodb.conditions import Attr
+from database.indexes import query_by
+from database.pagination import parallel_scan_all
 
 dynamodb = get_dynamodb()
 reports_table = dynamodb.Table("reports")
@@ -31,16 +32,10 @@ def approve_report(report_id):
     )
 
 def get_reports_by_child(child_id):
-    response = reports_table.scan(
-        FilterExpression=Attr("ChildID").eq(child_id)
-    )
-    return response.get("Items", [])
+    return query_by(reports_table, "ChildID", child_id)
 
 def get_reports_by_therapist(therapist_id):
-    response = reports_table.scan(
-        FilterExpression=Attr("TherapistID").eq(therapist_id)
-    )
-    return response.get("Items", [])
+    return query_by(reports_table, "TherapistID", therapist_id)
 
 def update_report_approval(report_id, approved):
     return reports_table.update_item(
@@ -67,5 +62,4 @@ def update_report_text(report_id, nlp_text):
     )
 
 def get_all_reports():
-    response = reports_table.scan()
-    return response.get("Items", [])
+    return parallel_scan_all(reports_table)
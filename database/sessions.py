@@ -1,11 +1,20 @@
 # CRUD for sessions
 
-from config.aws_config import get_dynamodb
 from boto3.dynamodb.conditions import Attr
+from config.aws_config import get_dynamodb
+from database.indexes import query_by
+from database.pagination import parallel_scan_all
+from datetime import datetime
 
 dynamodb = get_dynamodb()
 sessions_table = dynamodb.Table("sessions")
 
+# The therapist app keeps one pointer item per room in this table ('active#<room>',
+# item_type 'active_pointer'). Scans of the table must exclude them with SESSION_ITEMS_FILTER.
+ACTIVE_POINTER_PREFIX = "active#"
+ACTIVE_POINTER_TYPE = "active_pointer"
+SESSION_ITEMS_FILTER = Attr("item_type").not_exists() | Attr("item_type").ne(ACTIVE_POINTER_TYPE)
+
 def create_session(session_id, child_id, child_name, session_number, status="ACTIVE"):
     return sessions_table.put_item(
         Item={
@@ -13,16 +22,22 @@ def create_session(session_id, child_id, child_name, session_number, status="ACT
             "child_id": child_id,
             "child_name": child_name,
             "session_number": session_number,
-            "status": status
+            "status": status,
+            "created_at": datetime.utcnow().isoformat()  # range key of child_id-created_at-index
         }
     )
 
 def get_sessions_by_child(child_id):
     try:
-        response = sessions_table.scan(
-            FilterExpression=Attr("child_id").eq(child_id)
-        )
-        return response.get("Items", [])
+        return query_by(sessions_table, "child_id", child_id)
+    except Exception as e:
+        print(f"Error accessing sessions table: {e}")
+        return []
+
+def get_all_sessions():
+    """Every session record (room pointer items excluded)."""
+    try:
+        return parallel_scan_all(sessions_table, FilterExpression=SESSION_ITEMS_FILTER)
     except Exception as e:
         print(f"Error accessing sessions table: {e}")
         return []
@@ -1,13 +1,26 @@
 import boto3
+import copy
+import threading
+import time
 import uuid
+from cachetools import TTLCache
 from utils.helpers import hash_password, verify_password, set_session
 from config.aws_config import get_dynamodb
-from config.settings import USERS_TABLE
+from config.settings import USERS_TABLE, USER_CACHE_TTL_SECONDS
+from database.indexes import query_by
+from database.pagination import parallel_scan_all
 from datetime import datetime
 
 dynamodb = get_dynamodb()
 users_table = dynamodb.Table(USERS_TABLE)
 
+# User directory cache: UserID -> user item, shared by every page in the process
+_user_cache = TTLCache(maxsize=2048, ttl=USER_CACHE_TTL_SECONDS)
+_user_cache_lock = threading.Lock()
+
+BATCH_GET_MAX_KEYS = 100  # DynamoDB BatchGetItem limit per request
+BATCH_GET_MAX_RETRIES = 5  # Rounds of UnprocessedKeys retries before giving up on the rest
+
 def create_user(email, password, role, full_name, contact_number, license_id=None, registration_date=None):
     existing_user = get_user_by_email(email)
     if existing_user:
@@ -36,11 +49,8 @@ def create_user(email, password, role, full_name, contact_number, license_id=Non
 
 
 def get_user_by_email(email):
-    response = users_table.scan(
-        FilterExpression="Email = :email_val",
-        ExpressionAttributeValues={":email_val": email}
-    )
-    items = response.get('Items', [])
+    # Single Email-index query instead of a full-table scan
+    items = query_by(users_table, "Email", email, max_items=1)
     if items:
         return items[0]
     return None
@@ -52,8 +62,7 @@ def authenticate_user(email, password):
     return None
 
 def get_all_users():
-    response = users_table.scan()
-    return response.get('Items', [])
+    return parallel_scan_all(users_table)
 
 def update_user_approval(email, approved):
     user = get_user_by_email(email)
@@ -64,6 +73,7 @@ def update_user_approval(email, approved):
         UpdateExpression="SET Approved = :val",
         ExpressionAttributeValues={':val': approved}
     )
+    invalidate_user_cache(user['UserID'])
     return True
 
 def register_new_user(email, password, role, full_name, contact_number, license_id=None, registration_date=None):
@@ -96,21 +106,78 @@ def authenticate_user_service(email, password):
         return user, None
     return None, "Invalid email or password."
 
+def _cache_users(users):
+    with _user_cache_lock:
+        for user in users:
+            _user_cache[user['UserID']] = user
+
+def invalidate_user_cache(user_id=None):
+    with _user_cache_lock:
+        if user_id is None:
+            _user_cache.clear()
+        else:
+            _user_cache.pop(user_id, None)
+
 def get_user_by_id(user_id):
-    response = users_table.scan(
-        FilterExpression="UserID = :id_val",
-        ExpressionAttributeValues={":id_val": user_id}
-    )
-    items = response.get('Items', [])
-    if items:
-        return items[0]
-    return None
+    # Callers get their own copy: the cached item is shared by every page in the process
+    if not user_id:
+        return None
+    with _user_cache_lock:
+        user = _user_cache.get(user_id)
+    if user is not None:
+        return copy.deepcopy(user)
+    # UserID is the hash key: one keyed read
+    user = users_table.get_item(Key={'UserID': user_id}).get('Item')
+    if user:
+        _cache_users([user])
+        return copy.deepcopy(user)
+    return user
+
+def get_users_by_ids(user_ids):
+    """
+    Resolve many users in as few round trips as possible.
+    Returns a dict of UserID -> user item (copies; unknown IDs, and IDs still
+    throttled after BATCH_GET_MAX_RETRIES retries, are left out).
+    """
+    wanted = {uid for uid in user_ids if uid}
+    found = {}
+    with _user_cache_lock:
+        for uid in wanted:
+            user = _user_cache.get(uid)
+            if user is not None:
+                found[uid] = user
+    missing = list(wanted - found.keys())
+
+    fetched = []
+    unresolved = []
+    for start in range(0, len(missing), BATCH_GET_MAX_KEYS):
+        request = {USERS_TABLE: {'Keys': [{'UserID': uid} for uid in missing[start:start + BATCH_GET_MAX_KEYS]]}}
+        attempt = 0
+        while request:
+            response = dynamodb.batch_get_item(RequestItems=request)
+            fetched.extend(response.get('Responses', {}).get(USERS_TABLE, []))
+            request = response.get('UnprocessedKeys') or None
+            if request:
+                if attempt >= BATCH_GET_MAX_RETRIES:
+                    unresolved.extend(key['UserID'] for key in request.get(USERS_TABLE, {}).get('Keys', []))
+                    break
+                # Throttled keys come back unprocessed; retry them with backoff
+                attempt += 1
+                time.sleep(min(0.05 * (2 ** attempt), 1.0))
+
+    if unresolved:
+        print(f"⚠️ Users table throttled, {len(unresolved)} user(s) not loaded: {unresolved}")
+
+    _cache_users(fetched)
+    found.update({user['UserID']: user for user in fetched})
+    return {uid: copy.deepcopy(user) for uid, user in found.items()}
 
 def delete_user(email):
     user = get_user_by_email(email)
     if not user:
         return False
     users_table.delete_item(Key={'UserID': user['UserID']})
+    invalidate_user_cache(user['UserID'])
     return True
 
 def update_user(user_id, updates):
@@ -124,6 +191,7 @@ def update_user(user_id, updates):
         UpdateExpression=update_expression,
         ExpressionAttributeValues=expression_values
     )
+    invalidate_user_cache(user_id)
     return True
 
 def set_logged_in_session(user_data):
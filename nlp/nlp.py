@@ -3,12 +3,13 @@ import string
 from collections import Counter
 import spacy
 from sentence_transformers import SentenceTransformer, util
-import boto3
 from boto3.dynamodb.conditions import Key
+from config.aws_config import get_dynamodb
 from typing import List, Dict, Any
 
 # -------- CONFIG (no hardcoded AWS keys) ----------
-dynamodb = boto3.resource("dynamodb", region_name="ap-southeast-1")
+# Shared resource; None keys keep the default boto3 credential chain
+dynamodb = get_dynamodb(aws_access_key_id=None, aws_secret_access_key=None)
 table_msgs = dynamodb.Table("messages")
 table_sess = dynamodb.Table("sessions")
 table_focus = dynamodb.Table("FocusSummaries")
@@ -3,7 +3,7 @@ import pandas as pd
 from utils.session_state import clear_cookies
 from utils.ui_components import render_footer
 from database.children import get_all_children
-from database.users import get_user_by_id
+from database.users import get_users_by_ids
 
 def logout():
     """Clears session state and cookies for logout and forces a rerun."""
@@ -59,8 +59,9 @@ if children:
     df = df[['Name', 'DOB', 'ParentID', 'TherapistName']]
     # Handle cases where no therapist is assigned
     df['TherapistName'] = df['TherapistName'].fillna('Not Assigned')
-    # Get parent names instead of IDs
-    df['ParentName'] = df['ParentID'].apply(lambda pid: get_user_by_id(pid).get('FullName', 'Unknown') if pid else 'Unknown')
+    # Get parent names instead of IDs (one batched lookup for all parents)
+    parents = get_users_by_ids(df['ParentID'].dropna().unique())
+    df['ParentName'] = df['ParentID'].map(lambda pid: parents.get(pid, {}).get('FullName', 'Unknown'))
     # Select and rename columns for better readability
     df = df[['Name', 'DOB', 'ParentName', 'TherapistName']]
     df.columns = ['Child Name', 'Date of Birth', 'Parent Name', 'Assigned Therapist']
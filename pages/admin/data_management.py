@@ -1,12 +1,13 @@
 import streamlit as st
 from streamlit_option_menu import option_menu
-import boto3
 import os
 import pandas as pd
 from utils.session_state import clear_cookies
 from utils.ui_components import render_footer
 from dotenv import load_dotenv
 from datetime import datetime, date
+from config.aws_config import get_dynamodb
+from database.indexes import query_by
 
 # -----------------------------
 # Load AWS credentials
@@ -16,9 +17,8 @@ AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_REGION = os.getenv("AWS_REGION", "ap-southeast-1")
 
-# Initialize DynamoDB
-dynamodb = boto3.resource(
-    "dynamodb",
+# Shared DynamoDB resource (this script re-runs on every interaction)
+dynamodb = get_dynamodb(
     region_name=AWS_REGION,
     aws_access_key_id=AWS_ACCESS_KEY_ID,
     aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
@@ -240,8 +240,8 @@ elif selected_tab == "Conversation Logs":
                     selected_child_name = st.selectbox("Select Child:", list(child_options.keys()))
                     selected_child_id = child_options[selected_child_name]
 
-                    sessions = sessions_table.scan().get("Items", [])
-                    sessions_for_child = [s for s in sessions if s.get("child_id") == selected_child_id]
+                    # Index query: only this child's sessions (never the room pointer items)
+                    sessions_for_child = query_by(sessions_table, "child_id", selected_child_id)
 
                     if sessions_for_child:
                         # Use session number for selection
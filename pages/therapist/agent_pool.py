@@ -0,0 +1,108 @@
+"""
+Warm pool of ready LanguageScreeningAgents with their greeting already generated
+
+Each pooled entry has a constructed agent, a greeting from start_conversation()
+and the greeting audio already in the TTS cache, so "Start Session" only has to
+hand the entry over. Entries cost an LLM call and a TTS call, so the pool stays
+empty until it is asked for one: it fills in the background whenever a
+therapist selects a child in the clinician app (EVENT_PREWARM_AGENTS on the event
+bus, which reaches the child-view process). Without that event, acquire() builds
+the agent on the spot as before.
+"""
+
+import threading
+import time
+from collections import deque
+
+import agent_settings
+from event_bus import get_event_bus, EVENT_PREWARM_AGENTS
+from llm_agent import LanguageScreeningAgent
+
+
+class AgentPool:
+    """Pre-built agents with pre-synthesised greetings"""
+
+    def __init__(self, audio_handler=None, size: int = 1):
+        """
+        Args:
+            audio_handler: Synthesises each greeting into the TTS cache (None to skip)
+            size: Ready entries to keep (each one costs an LLM call and a TTS call)
+        """
+        self.audio_handler = audio_handler
+        self.size = size
+        self._lock = threading.Lock()
+        self._ready = deque()
+        self._filler = None
+        self._listener = None
+
+    def _build(self) -> dict:
+        start = time.time()
+        agent = LanguageScreeningAgent()
+        greeting = agent.start_conversation()
+        if self.audio_handler and agent_settings.ENABLE_TEXT_TO_SPEECH:
+            self.audio_handler.synthesize(greeting['response'])
+        print(f"🔥 Warm agent ready in {time.time() - start:.2f}s")
+        return {'agent': agent, 'greeting': greeting, 'created_at': time.time()}
+
+    def _fill(self):
+        while True:
+            with self._lock:
+                if len(self._ready) >= self.size:
+                    self._filler = None
+                    return
+            try:
+                entry = self._build()
+            except Exception as e:
+                print(f"❌ Agent pre-warm failed: {e}")
+                with self._lock:
+                    self._filler = None
+                return
+            with self._lock:
+                self._ready.append(entry)
+
+    def refill(self):
+        """Top the pool up in the background (no-op if a refill is already running)"""
+        with self._lock:
+            if self._filler is not None or len(self._ready) >= self.size:
+                return
+            self._filler = threading.Thread(target=self._fill, name="agent-pool-fill", daemon=True)
+            self._filler.start()
+
+    def acquire(self, session_id: str) -> dict:
+        """
+        Take a ready agent for a new session (built on the spot if the pool is empty)
+
+        Returns:
+            dict with 'agent' (tracking session_id) and 'greeting' (start_conversation result)
+        """
+        with self._lock:
+            entry = self._ready.popleft() if self._ready else None
+        if entry is None:
+            print("⚠️ Agent pool empty - building agent now")
+            entry = self._build()
+        else:
+            print(f"⚡ Using warm agent (age {time.time() - entry['created_at']:.0f}s)")
+
+        agent = entry['agent']
+        agent.set_session_id(session_id)
+        agent.last_response_time = time.time()  # Child's response time counts from now
+        return entry
+
+    def ready_count(self) -> int:
+        with self._lock:
+            return len(self._ready)
+
+    def listen(self):
+        """Refill whenever a prewarm event is published (e.g. a child was selected)"""
+        if self._listener is not None:
+            return
+        subscription = get_event_bus().subscribe()
+
+        def _run():
+            while True:
+                events = subscription.wait()
+                if any(event.get('type') == EVENT_PREWARM_AGENTS for event in events):
+                    self.refill()
+
+        self._listener = threading.Thread(target=_run, name="agent-pool-listener", daemon=True)
+        self._listener.start()
@@ -23,20 +23,76 @@ OPENAI_MODEL = "gpt-4o-mini"  # Fast model
 SYSTEM_PROMPT_PATH = "system-prompt.txt"
 TEMPERATURE = 0.7
 RESPONSE_TIMEOUT_SECONDS = 30
+VERBOSE_TRACE = os.getenv("VERBOSE_TRACE", "False").lower() == "true"  # Per-call emotion/command tracing
+
+# Structured turn output (turn_output.py): the LLM replies through a function call with the text,
+# a robot action constrained to the 14 valid names, the reason and the question type.
+# False = legacy free text with a ROBOT_ACTION: line parsed out of the reply
+STRUCTURED_TURN_OUTPUT = os.getenv("STRUCTURED_TURN_OUTPUT", "True").lower() == "true"
+
+# Prompt assembly (prompt_assembler.py): stable cacheable prefix + token-budgeted history
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 6000))  # Max input tokens per LLM call
+PROMPT_HISTORY_MAX_MESSAGES = 20   # Most history messages sent before the budget applies
+PROMPT_HISTORY_TRIM_STEP = 6       # Old history is dropped in blocks so the cached prefix lasts several turns
+
+# Rolling conversation memory (conversation_memory.py): older turns become a summary + facts
+MEMORY_ENABLED = os.getenv("MEMORY_ENABLED", "True").lower() == "true"
+MEMORY_RECENT_MESSAGES = 8     # Newest messages always sent verbatim
+MEMORY_SUMMARY_BATCH = 6       # Older messages are summarised this many at a time (in the background)
+MEMORY_SUMMARY_MODEL = os.getenv("MEMORY_SUMMARY_MODEL", OPENAI_MODEL)
+MEMORY_SUMMARY_MAX_WORDS = 120
 
 # Audio Settings
 ENABLE_SPEECH_TO_TEXT = True
 ENABLE_TEXT_TO_SPEECH = True
 
+# Stream LLM tokens and speak each sentence as soon as it is complete
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "True").lower() == "true"
+
+# Per-stage deadlines (seconds) for the concurrent turn pipeline (turn_orchestrator.py)
+# A side stage that misses its deadline is dropped instead of delaying the reply
+TURN_STAGE_DEADLINES = {
+    "emotion": 1.5,           # EmotiBit lookup (the reply goes ahead without emotion context)
+    "user_write": 5.0,        # Child message write
+    "assistant_write": 5.0,   # Reply message write
+}
+
 # OPTIMIZED AUDIO SETTINGS
 TTS_VOICE = "nova"  # Child-friendly voice (alternatives: "alloy", "echo", "shimmer")
 TTS_SPEED = 0.95    # Slightly slower for clarity (0.90-1.0 recommended for children)
                     # This affects playback speed, NOT generation speed
+TTS_MODEL = "tts-1"   # tts-1 is ~2x faster than tts-1-hd
+TTS_FORMAT = "mp3"    # Smaller and faster than other formats
+AUDIO_END_GRACE_SECONDS = 3.0  # Recording re-opens this long after the exact clip length
+                               # if the browser's playback-ended signal never arrives
+
+# Content-hash URLs for audio clips, emotion GIFs and pictures (downloaded once, browser-cached)
+# Default: files in static/assets/ next to the app script, served same-origin by Streamlit
+# (server.enableStaticServing in .streamlit/config.toml). Optional: a local HTTP endpoint
+# instead; give it a fixed port and the URL the browser reaches it at (e.g. an HTTPS reverse-proxy
+# path on the app's host, "https://robot.example.org/assets"); each process needs its own port
+ASSET_SERVER_ENABLED = os.getenv("ASSET_SERVER_ENABLED", "False").lower() == "true"
+ASSET_SERVER_HOST = os.getenv("ASSET_SERVER_HOST", "127.0.0.1")     # Behind the proxy; 0.0.0.0 to serve the LAN directly
+ASSET_SERVER_PORT = int(os.getenv("ASSET_SERVER_PORT", 0))        # Required when enabled
+ASSET_PUBLIC_URL = os.getenv("ASSET_PUBLIC_URL", "")              # Required when enabled
+ASSET_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Per process, in the static folder or in memory
+
+# Shared service health checks (robot ping, DynamoDB) are cached this long
+HEALTH_CHECK_TTL_SECONDS = 30
+
+# Ready agents (greeting generated and synthesised) kept by the child view for new sessions,
+# built when a child is selected in the clinician app (EVENT_PREWARM_AGENTS), never at start-up
+AGENT_POOL_SIZE = int(os.getenv("AGENT_POOL_SIZE", 1))
 
 # AWS DynamoDB Settings
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_REGION = os.getenv("AWS_REGION")
+AWS_CREDENTIALS = {
+    "region_name": AWS_REGION,
+    "aws_access_key_id": AWS_ACCESS_KEY_ID,
+    "aws_secret_access_key": AWS_SECRET_ACCESS_KEY,
+}
 
 # DynamoDB Table Names
 DYNAMODB_SESSIONS_TABLE_NAME = os.getenv("DYNAMODB_SESSIONS_TABLE_NAME", "sessions")
@@ -44,19 +100,62 @@ DYNAMODB_CHILDREN_TABLE_NAME = os.getenv("DYNAMODB_CHILDREN_TABLE_NAME", "childr
 DYNAMODB_MESSAGES_TABLE_NAME = os.getenv("DYNAMODB_MESSAGES_TABLE_NAME", "messages")
 DYNAMODB_EMOTION_TABLE_NAME = os.getenv("DYNAMODB_EMOTION_TABLE_NAME", "Emotion")
 
+# Room/device this clinician station and its child screen belong to
+# (keys the active-session pointer in the sessions table)
+CHILD_ROOM_ID = os.getenv("CHILD_ROOM_ID", "default")
+
+# Session event bus (see event_bus.py)
+# The socket backend uses a broker on EVENT_BUS_HOST:EVENT_BUS_PORT. Unless EVENT_BUS_START_BROKER
+# is False, the first app process that finds no broker there hosts it (change the port if 8765 is in use)
+EVENT_BUS_BACKEND = os.getenv("EVENT_BUS_BACKEND", "socket")  # "socket" (cross-process) or "memory"
+EVENT_BUS_HOST = os.getenv("EVENT_BUS_HOST", "127.0.0.1")
+EVENT_BUS_PORT = int(os.getenv("EVENT_BUS_PORT", "8765"))
+EVENT_BUS_START_BROKER = os.getenv("EVENT_BUS_START_BROKER", "True").lower() == "true"  # False = polling only without an external broker
+EVENT_FALLBACK_POLL_SECONDS = float(os.getenv("EVENT_FALLBACK_POLL_SECONDS", "10"))  # Re-read DynamoDB if no event arrives
+EVENT_SUBSCRIPTION_IDLE_SECONDS = 300  # Subscriptions of closed browser tabs are dropped after this long unread
+
+# Message persistence
+MESSAGE_WRITE_BEHIND = os.getenv("MESSAGE_WRITE_BEHIND", "True").lower() == "true"  # Child turn loop only
+MESSAGE_JOURNAL_PATH = os.getenv("MESSAGE_JOURNAL_PATH", os.path.join(BASE_DIR, ".journal", "messages.jsonl"))
+MESSAGE_FLUSH_INTERVAL_SECONDS = 0.2  # Wait this long for the rest of a turn before writing a batch
+MESSAGE_FLUSH_MAX_ATTEMPTS = 6        # Throttled/network-failed batches are retried this often, then dead-lettered
+MESSAGE_SYNC_LOOKBACK_SECONDS = 5     # Cursor reads re-check this window for late-landing writes
+
+# Live pane refresh intervals (st.fragment run_every, seconds)
+LIVE_PANE_REFRESH_SECONDS = 1.0   # Message list / session watcher (DynamoDB is only read on events)
+HARDWARE_REFRESH_SECONDS = 2.0    # Eye-tracker status and calibration wizard
+HEALTH_REFRESH_SECONDS = 10.0     # Remote process health over SSH
+
 # Robot Settings (WaveGo)
 ENABLE_ROBOT_ACTIONS = os.getenv("ENABLE_ROBOT_ACTIONS", "True").lower() == "true"
 ROBOT_IP = os.getenv("ROBOT_IP")  
 ROBOT_PORT = int(os.getenv("ROBOT_PORT"))
+ROBOT_COMMAND_TIMEOUT = 2.0     # Seconds per command (sent by a background worker, never in the turn)
+ROBOT_PING_TIMEOUT = 1.0        # Seconds per health probe
+ROBOT_HEARTBEAT_SECONDS = 10    # Health probe interval; gestures are skipped while the robot is offline
 
 # PERFORMANCE TUNING
 USE_LOCAL_WHISPER = False  # Set to True to use local Whisper (faster if you have good CPU/GPU)
 WHISPER_MODEL = "tiny"     # Options: tiny (fastest), base, small, medium, large
                            # "tiny" is ~10x faster than "base" with minimal accuracy loss
+# Speech-to-text engine:
+#   "api"   - upload to the whisper-1 API
+#   "local" - warm local Whisper worker pool (no upload; falls back to the API on failure)
+#   "race"  - run both and take the first non-empty transcript
+STT_MODE = os.getenv("STT_MODE", "local" if USE_LOCAL_WHISPER else "api").lower()
+STT_LOCAL_WORKERS = int(os.getenv("STT_LOCAL_WORKERS", 1))  # Each worker holds its own model copy
+STT_TIMEOUT_SECONDS = 30  # Give up on a local/race transcription after this long
+STT_UPLOAD_FORMAT = "flac"    # In-memory encoding of the trimmed 16 kHz audio (lossless, ~half of WAV)
+STT_VAD_THRESHOLD_DB = -45    # Frames quieter than this (dBFS) are trimmed as silence
+STT_VAD_PAD_MS = 250          # Audio kept before/after detected speech
 
 # TTS Caching (for repeated phrases)
 ENABLE_TTS_CACHE = True
 TTS_CACHE_SIZE = 50  # Number of phrases to cache
+# On-disk cache shared by the clinician app and the child view (survives restarts)
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(BASE_DIR, ".tts_cache"))
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", 200 * 1024 * 1024))  # LRU eviction above this
+TTS_CACHE_HOT_BYTES = 32 * 1024 * 1024  # Memory-mapped clips kept per process
 
 # Common phrases to pre-cache (optional - speeds up first use)
 COMMON_TTS_PHRASES = [
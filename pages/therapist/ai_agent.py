@@ -30,8 +30,8 @@ sys.path.insert(0, current_dir)  # <--- insert(0) puts it at the FRONT of the li
 
 import streamlit as st
 from llm_agent import LanguageScreeningAgent
-from audio_handler import AudioHandler
-from database_handler import DatabaseHandler
+from resources import get_registry
+from event_bus import get_event_bus, EVENT_CHILD_READY, EVENT_PREWARM_AGENTS
 import agent_settings
 import base64
 import uuid
@@ -40,7 +40,6 @@ import re
 import paramiko # Added for Hardware Control
 from datetime import datetime
 import streamlit.components.v1 as components
-from robot_controller import RobotController
 from utils.session_state import clear_cookies
 
 def logout():
@@ -58,6 +57,8 @@ def logout():
         del st.session_state['full_name']
     if 'user_email' in st.session_state:
         del st.session_state['user_email']
+    if 'event_subscription' in st.session_state:
+        st.session_state.pop('event_subscription').close()
 
     # Rerun the app to go back to the main login/home page
     st.rerun()
@@ -319,14 +320,12 @@ def initialize_session():
         st.session_state.session_id = None
     if "agent" not in st.session_state:
         st.session_state.agent = None
+    # Process-wide services (built once, shared by every therapist tab)
+    registry = get_registry()
     if "audio_handler" not in st.session_state:
-        st.session_state.audio_handler = AudioHandler()
-        # PRE-LOAD common phrases for instant TTS on first use
-        if agent_settings.ENABLE_TTS_CACHE:
-            print("🚀 Pre-loading common TTS phrases...")
-            st.session_state.audio_handler.preload_common_phrases()
+        st.session_state.audio_handler = registry.get("audio")
     if "db_handler" not in st.session_state:
-        st.session_state.db_handler = DatabaseHandler()
+        st.session_state.db_handler = registry.get("db")
     if "messages" not in st.session_state:
         st.session_state.messages = []
     if "conversation_started" not in st.session_state:
@@ -345,8 +344,14 @@ def initialize_session():
         st.session_state.selected_child_id = None
     if "selected_child_name" not in st.session_state:
         st.session_state.selected_child_name = None
-    if "last_db_message_count" not in st.session_state:
-        st.session_state.last_db_message_count = 0
+    if "event_subscription" not in st.session_state:
+        st.session_state.event_subscription = get_event_bus().subscribe()
+    if "last_sync_time" not in st.session_state:
+        st.session_state.last_sync_time = 0
+    if "message_cursor" not in st.session_state:
+        st.session_state.message_cursor = None
+    if "seen_message_ids" not in st.session_state:
+        st.session_state.seen_message_ids = set()
     if "monitoring_mode" not in st.session_state:
         st.session_state.monitoring_mode = True
     if "child_window_opened" not in st.session_state:
@@ -357,10 +362,7 @@ def initialize_session():
         st.session_state.greeting_sent = False
     
     if "robot_controller" not in st.session_state:
-        if agent_settings.ENABLE_ROBOT_ACTIONS:
-            st.session_state.robot_controller = RobotController()
-        else:
-            st.session_state.robot_controller = None
+        st.session_state.robot_controller = registry.get("robot")
     
     if "robot_enabled" not in st.session_state:
         st.session_state.robot_enabled = agent_settings.ENABLE_ROBOT_ACTIONS
@@ -452,16 +454,16 @@ def open_child_window():
 def sync_messages_from_db():
     """
     Sync messages from database - only for CURRENT session
-    FIXED: Now syncs BOTH user and assistant messages with FULL DEBUG
+    Incremental: fetches only messages newer than the per-session timestamp cursor
+    and deduplicates by message_id.
     """
     if not st.session_state.session_id:
         print("⚠️ SYNC: No session_id - cannot sync")
         return False
     
-    # ===== ADD THIS CHECK =====
-    # Verify this session still exists and is active
+    # Verify this session still exists and is active (single keyed read, no messages)
     try:
-        session = st.session_state.db_handler.get_session(st.session_state.session_id)
+        session = st.session_state.db_handler.get_session_item(st.session_state.session_id)
         if not session:
             print(f"❌ SYNC ERROR: Session {st.session_state.session_id} not found in database!")
             return False
@@ -469,100 +471,60 @@ def sync_messages_from_db():
         if session.get('status') != 'active':
             print(f"⚠️ SYNC WARNING: Session {st.session_state.session_id} is not active (status: {session.get('status')})")
             return False
-        
-        print(f"✅ Session {st.session_state.session_id} verified (status: active)")
     except Exception as e:
         print(f"❌ Session verification failed: {e}")
         return False
-    # ===== END CHECK =====
     
     try:
-        print(f"\n🔍 SYNC CHECK:")
-        print(f"   Session ID: {st.session_state.session_id}")
-        print(f"   Local message count: {len(st.session_state.messages)}")
+        new_messages, cursor = st.session_state.db_handler.get_messages_since(
+            st.session_state.session_id,
+            st.session_state.message_cursor
+        )
+        st.session_state.message_cursor = cursor
         
-        # Get all messages from database for current session
-        db_messages = st.session_state.db_handler.get_session_messages(st.session_state.session_id)
-        
-        print(f"   DB message count: {len(db_messages)}")
-        
-        # Debug: Show what's in the database
-        if db_messages:
-            print(f"   📋 DB Messages:")
-            for idx, msg in enumerate(db_messages):
-                print(f"      {idx+1}. [{msg.get('role')}] {msg.get('content', '')[:40]}...")
-        else:
-            print(f"   ⚠️ No messages found in database!")
-        
-        # Get current local count
-        current_local_count = len(st.session_state.messages)
-        
-        # Check if there are new messages in database
-        if len(db_messages) > current_local_count:
-            print(f"📥 SYNC: Found {len(db_messages) - current_local_count} new message(s)")
-            
-            # Get all new messages (not just the last one)
-            new_messages = db_messages[current_local_count:]
+        seen_ids = st.session_state.seen_message_ids
+        messages_added = 0
+        for new_message in new_messages:
+            message_id = new_message.get('message_id')
+            if message_id in seen_ids:
+                continue
+            seen_ids.add(message_id)
             
-            print(f"   🆕 New messages to sync:")
-            for idx, msg in enumerate(new_messages):
-                print(f"      {idx+1}. [{msg.get('role')}] {msg.get('content', '')[:50]}...")
+            # Prepare message data
+            message_data = {
+                "role": new_message['role'],
+                "content": new_message['content']
+            }
             
-            # Add each new message to local state
-            messages_added = False
-            for new_message in new_messages:
-                # Check if message already exists (by content comparison)
-                already_exists = any(
-                    m.get('content') == new_message['content'] and 
-                    m.get('role') == new_message['role']
-                    for m in st.session_state.messages
-                )
-                
-                if already_exists:
-                    print(f"   ⏭️ Skipping duplicate: [{new_message['role']}] {new_message['content'][:30]}...")
-                    continue
+            # Add metadata for assistant messages
+            if new_message['role'] == 'assistant':
+                metadata = new_message.get('metadata', {})
                 
-                # Prepare message data
-                message_data = {
-                    "role": new_message['role'],
-                    "content": new_message['content']
-                }
-                
-                # Add metadata for assistant messages
-                if new_message['role'] == 'assistant':
-                    metadata = new_message.get('metadata', {})
-                    
-                    # Extract robot action if present
-                    if metadata.get('robot_action'):
-                        message_data['robot_action'] = metadata['robot_action']
-                    
-                    # Extract emotion if present
-                    if metadata.get('emotion'):
-                        message_data['emotion'] = metadata['emotion']
-                    
-                    # Extract picture info if present
-                    if metadata.get('picture_path'):
-                        message_data['picture'] = {
-                            'path': metadata.get('picture_path'),
-                            'filename': metadata.get('picture_filename'),
-                            'complexity': metadata.get('picture_complexity')
-                        }
+                # Extract robot action if present
+                if metadata.get('robot_action'):
+                    message_data['robot_action'] = metadata['robot_action']
                 
-                # Add to local messages
-                st.session_state.messages.append(message_data)
-                messages_added = True
+                # Extract emotion if present
+                if metadata.get('emotion'):
+                    message_data['emotion'] = metadata['emotion']
                 
-                print(f"   ✅ Added {new_message['role']} message: {new_message['content'][:50]}...")
+                # Extract picture info if present
+                if metadata.get('picture_path'):
+                    message_data['picture'] = {
+                        'path': metadata.get('picture_path'),
+                        'filename': metadata.get('picture_filename'),
+                        'complexity': metadata.get('picture_complexity')
+                    }
             
-            if messages_added:
-                print(f"✅ SYNC: Successfully synced {len(new_messages)} message(s)")
-                print(f"   Total local messages now: {len(st.session_state.messages)}")
-                return True
-            else:
-                print(f"⚠️ SYNC: No new messages added (all duplicates)")
-                return False
-        else:
-            print(f"   ℹ️ No new messages (DB: {len(db_messages)}, Local: {current_local_count})")
+            # Add to local messages
+            st.session_state.messages.append(message_data)
+            messages_added += 1
+            
+            print(f"   ✅ Added {new_message['role']} message: {new_message['content'][:50]}...")
+        
+        if messages_added:
+            print(f"📥 SYNC: Synced {messages_added} new message(s), total {len(st.session_state.messages)}")
+            return True
         
         return False
         
@@ -572,6 +534,28 @@ def sync_messages_from_db():
         traceback.print_exc()
         return False
 
+def poll_session_events() -> bool:
+    """
+    Drain pushed events without blocking
+    
+    Returns:
+        True if any event belongs to the current session
+    """
+    relevant = False
+    for event in st.session_state.event_subscription.drain():
+        if event.get('session_id') != st.session_state.session_id:
+            continue
+        relevant = True
+        if event.get('type') == EVENT_CHILD_READY and event.get('ready'):
+            st.session_state.waiting_for_child_ready = False
+    return relevant
+
+def reset_message_sync():
+    """Forget the sync cursor and seen message IDs (new or ended session)"""
+    st.session_state.message_cursor = None
+    st.session_state.seen_message_ids = set()
+    st.session_state.last_sync_time = 0
+
 def start_conversation(child_id: str, clinician_id: str = None):
     """Start a new screening session AND Launch Nexus Hardware"""
     
@@ -585,13 +569,12 @@ def start_conversation(child_id: str, clinician_id: str = None):
     
     print(f"👨‍⚕️ Starting session with clinician_id: {clinician_id}")
     
-    # 2. End any existing active sessions
-    print(f"🔍 Checking for existing active sessions...")
-    existing_sessions = st.session_state.db_handler.get_all_sessions(limit=50)
-    for session in existing_sessions:
-        if session.get('status') == 'active':
-            print(f"⚠️ Found active session: {session.get('session_id')} - ending it")
-            st.session_state.db_handler.end_session(session.get('session_id'))
+    # 2. End the room's existing active session (keyed read of the active-session pointer)
+    print(f"🔍 Checking for existing active session...")
+    previous_session_id = st.session_state.db_handler.get_active_session_id()
+    if previous_session_id:
+        print(f"⚠️ Found active session: {previous_session_id} - ending it")
+        st.session_state.db_handler.end_session(previous_session_id)
     
     # 3. Generate new session ID
     st.session_state.session_id = f"session_{uuid.uuid4().hex[:12]}"
@@ -643,7 +626,7 @@ def start_conversation(child_id: str, clinician_id: str = None):
     st.session_state.messages = []  # Clear local messages
     st.session_state.conversation_started = True
     st.session_state.last_interaction_time = time.time()
-    st.session_state.last_db_message_count = 0
+    reset_message_sync()
     st.session_state.child_window_opened = False
     st.session_state.audio_played_count = 0
     st.session_state.waiting_for_child_ready = True
@@ -713,50 +696,172 @@ def end_conversation():
     st.session_state.last_interaction_time = None
     st.session_state.selected_child_id = None
     st.session_state.selected_child_name = None
-    st.session_state.last_db_message_count = 0
+    reset_message_sync()
     st.session_state.child_window_opened = False
     st.session_state.waiting_for_child_ready = False
     st.session_state.greeting_sent = False
 
-def main():
-    # 1. SETUP LAYOUT
-    st.set_page_config(layout="wide")
-    initialize_session()
+# ==========================================
+# LIVE PANES (fragments: each refreshes on its own without rerunning the page)
+# ==========================================
 
-    # ===== ADD THIS SECTION HERE (BEFORE loading children) =====
-    # Auto-sync messages BEFORE rendering anything
-    if st.session_state.conversation_started and st.session_state.monitoring_mode:
-        sync_result = sync_messages_from_db()
-        if sync_result:
-            print("🔄 New messages detected - rerunning...")
-            time.sleep(0.3)
+def poll_hardware_output():
+    """Parse pending eye-tracker shell output for calibration step and focus status"""
+    if not (st.session_state.get('hardware_running', False) and st.session_state.shell):
+        return
+    if st.session_state.shell.recv_ready():
+        try:
+            data = st.session_state.shell.recv(4096).decode("utf-8", errors='ignore')
+            
+            # PARSE CALIBRATION STEPS
+            if "STEP 1" in data: st.session_state.calibration_step = 1
+            elif "STEP 2" in data: st.session_state.calibration_step = 2
+            elif "STEP 3" in data: st.session_state.calibration_step = 3
+            elif "STEP 4" in data: st.session_state.calibration_step = 4
+            elif "STEP 5" in data: st.session_state.calibration_step = 5
+            elif "SESSION STARTING" in data: st.session_state.calibration_step = 6
+            
+            # PARSE STATUS (Eyes)
+            if "Focused" in data: st.session_state.last_hardware_status = "Focused"
+            elif "Distracted" in data: st.session_state.last_hardware_status = "Distracted"
+        except:
+            pass
+
+@st.fragment(run_every=agent_settings.HEALTH_REFRESH_SECONDS)
+def system_health_pane():
+    """Remote process health (SSH round trips), refreshed on its own interval"""
+    with st.expander("🧠 System Health", expanded=False):
+        client = get_ssh_client()
+        # Emotion AI Status
+        emo_run, emo_log = check_process_status(client, "rpi_emotion_detect.py", "/tmp/nexus_emo.log")
+        emo_color = "health-running" if emo_run else "health-stopped"
+        st.markdown(f"""<div class="health-card {emo_color}"><b>Emotion AI</b><br>{emo_log[-50:]}</div>""", unsafe_allow_html=True)
+        
+        # MQTT Status
+        mqtt_run, mqtt_log = check_process_status(client, "mqtt_to_dynamo.py", "/tmp/nexus_mqtt.log")
+        mqtt_color = "health-running" if mqtt_run else "health-stopped"
+        st.markdown(f"""<div class="health-card {mqtt_color}"><b>MQTT Bridge</b><br>{mqtt_log[-50:]}</div>""", unsafe_allow_html=True)
+        
+        # Shared app services (cached health checks)
+        for name, status in get_registry().health().items():
+            color = "health-running" if status['ok'] else "health-stopped"
+            st.markdown(f"""<div class="health-card {color}"><b>{name}</b><br>{status['detail']}</div>""", unsafe_allow_html=True)
+        
+        if st.button("Disconnect HW"):
+            st.session_state.is_connected = False
             st.rerun()
-    # ===== END NEW SECTION =====
+
+@st.fragment(run_every=agent_settings.HARDWARE_REFRESH_SECONDS)
+def session_status_pane():
+    """Eye focus and child-ready status for the active session"""
+    if st.session_state.get('hardware_running', False):
+        status_color = "🟢" if st.session_state.last_hardware_status == "Focused" else "🔴"
+        st.markdown(f"**Eye Focus:** {status_color} {st.session_state.last_hardware_status}")
+
+    if st.session_state.waiting_for_child_ready:
+        st.warning("⏳ Waiting for child interface...")
+    elif st.session_state.greeting_sent:
+        st.success("✅ Conversation started!")
+
+@st.fragment(run_every=agent_settings.HARDWARE_REFRESH_SECONDS)
+def calibration_pane():
+    """Calibration wizard driven by the eye-tracker shell output"""
+    poll_hardware_output()
     
-    if not st.session_state.children_list:
-        load_children()
+    # Only show while calibration is not finished (Step < 6)
+    curr_step = st.session_state.get('calibration_step', 0)
+    if not 0 < curr_step < 6:
+        return
+    
+    progress = int((curr_step - 1) * 20)
+    st.markdown(f"**System Calibration: {progress}% Complete**")
+    st.progress(progress)
+    
+    instr = ["Initializing...", "Look at the CENTER", "Look LEFT Limit", "Look RIGHT Limit", "Look TOP Limit", "Look BOTTOM Limit", "Active"][curr_step]
+    
+    st.markdown(f"""
+    <div class="calib-card">
+        <div class="instruction-big">{instr}</div>
+        <div class="instruction-small">Instruct the child to hold their gaze steady, then press Capture.</div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    col_c1, col_c2, col_c3 = st.columns([1, 2, 1])
+    with col_c2:
+        if st.button("✅ Capture Position", use_container_width=True):
+            if st.session_state.shell:
+                st.session_state.shell.send("\n")
+                with st.spinner(f"Calibrating Step {curr_step}..."):
+                    time.sleep(1.0)
+                st.rerun(scope="fragment")
+    
+    st.divider() # Separate calibration from chat potential
+
+@st.fragment(run_every=agent_settings.LIVE_PANE_REFRESH_SECONDS)
+def live_conversation_pane():
+    """
+    Message list for the active session
+    DynamoDB is only read when a session event was pushed or the fallback interval expired
+    """
+    if not st.session_state.conversation_started:
+        return
     
-    # --- HARDWARE DATA LOOP ---
-    # Parse shell output for calibration status
-    if st.session_state.get('hardware_running', False) and st.session_state.shell:
-        if st.session_state.shell.recv_ready():
-            try:
-                data = st.session_state.shell.recv(4096).decode("utf-8", errors='ignore')
+    events_arrived = poll_session_events()
+    fallback_due = time.time() - st.session_state.last_sync_time >= agent_settings.EVENT_FALLBACK_POLL_SECONDS
+    if st.session_state.monitoring_mode and (events_arrived or fallback_due):
+        st.session_state.last_sync_time = time.time()
+        if sync_messages_from_db():
+            # The greeting is only written once the child screen is ready
+            st.session_state.waiting_for_child_ready = False
+    
+    # Display conversation (ALWAYS show if session started)
+    if not st.session_state.messages:
+        # Only show waiting message if truly no messages exist
+        st.markdown("""
+            <div style='text-align: center; background-color: white; padding: 50px; border-radius: 20px;'>
+                <h2 style='font-size: 2em; color: #667eea;'>⏳ Waiting for conversation to begin...</h2>
+                <p style='font-size: 1.3em; color: #555;'>Messages will appear here once the child starts talking.</p>
+            </div>
+        """, unsafe_allow_html=True)
+    with st.container(height=650, border=False):
+        if not st.session_state.messages:
+            st.markdown("<h3 style='text-align:center;color:#ccc;'>Waiting for conversation...</h3>", unsafe_allow_html=True)
+            return
+        
+        # Display all messages
+        for idx, message in enumerate(st.session_state.messages):
+            avatar = "🤖" if message["role"] == "assistant" else "😊"
+            with st.chat_message(message["role"], avatar=avatar):
+                st.write(message["content"])
                 
-                # PARSE CALIBRATION STEPS
-                if "STEP 1" in data: st.session_state.calibration_step = 1
-                elif "STEP 2" in data: st.session_state.calibration_step = 2
-                elif "STEP 3" in data: st.session_state.calibration_step = 3
-                elif "STEP 4" in data: st.session_state.calibration_step = 4
-                elif "STEP 5" in data: st.session_state.calibration_step = 5
-                elif "SESSION STARTING" in data: st.session_state.calibration_step = 6
+                # ===== ENHANCED ROBOT ACTION DISPLAY =====
+                if message["role"] == "assistant" and message.get("robot_action"):
+                    robot_action = message["robot_action"]
+                    action_name = robot_action.get('action', 'unknown')
+                    reason = robot_action.get('reason', 'No reason provided')
+                    
+                    # Format action name nicely (jump_forward → Jump Forward)
+                    formatted_action = action_name.replace('_', ' ').title()
                 
-                # PARSE STATUS (Eyes)
-                if "Focused" in data: st.session_state.last_hardware_status = "Focused"
-                elif "Distracted" in data: st.session_state.last_hardware_status = "Distracted"
-            except:
-                pass
+                    # Display with nice formatting
+                    st.info(f"""
+        **🤖 Robot Action:** {formatted_action}  
+        **💭 Reason:** {reason}
+                    """.strip())
+                # ===== END ENHANCED DISPLAY =====
+
+                # Show picture indicator if present
+                if message["role"] == "assistant" and message.get("picture"):
+                    picture_info = message['picture']
+                    st.success(f"🖼️ Picture shown: {picture_info.get('filename', 'Unknown')} ({picture_info.get('complexity', 'N/A')} complexity)")
+
+def main():
+    # 1. SETUP LAYOUT
+    st.set_page_config(layout="wide")
+    initialize_session()
 
+    if not st.session_state.children_list:
+        load_children()
     
    # 2. DEFINE COLUMNS (Left: Chat, Right: Controls)
     chat_col, control_col = st.columns([0.8, 0.2], gap="large")
@@ -791,22 +896,7 @@ def main():
                         time.sleep(1)
                         st.rerun()
         else:
-            # HEALTH MONITOR
-            with st.expander("🧠 System Health", expanded=False):
-                client = get_ssh_client()
-                # Emotion AI Status
-                emo_run, emo_log = check_process_status(client, "rpi_emotion_detect.py", "/tmp/nexus_emo.log")
-                emo_color = "health-running" if emo_run else "health-stopped"
-                st.markdown(f"""<div class="health-card {emo_color}"><b>Emotion AI</b><br>{emo_log[-50:]}</div>""", unsafe_allow_html=True)
-                
-                # MQTT Status
-                mqtt_run, mqtt_log = check_process_status(client, "mqtt_to_dynamo.py", "/tmp/nexus_mqtt.log")
-                mqtt_color = "health-running" if mqtt_run else "health-stopped"
-                st.markdown(f"""<div class="health-card {mqtt_color}"><b>MQTT Bridge</b><br>{mqtt_log[-50:]}</div>""", unsafe_allow_html=True)
-                
-                if st.button("Disconnect HW"):
-                    st.session_state.is_connected = False
-                    st.rerun()
+            system_health_pane()
         
         st.divider()
         
@@ -834,6 +924,11 @@ def main():
                 )
                 selected_child_id = child_options[selected_display]
                 
+                # Have the child view top up its warm agent pool before "Start Session" is clicked
+                if st.session_state.get('prewarmed_child_id') != selected_child_id:
+                    st.session_state.prewarmed_child_id = selected_child_id
+                    get_event_bus().publish(EVENT_PREWARM_AGENTS, child_id=selected_child_id)
+                
                 selected_child = next((c for c in st.session_state.children_list if c.get('ChildID', c.get('child_id')) == selected_child_id), None)
                 
                 if selected_child:
@@ -898,15 +993,7 @@ def main():
 
             st.info(f"**Therapist:** {clinician_name}\n\n**Child:** {st.session_state.selected_child_name}\n\n**Parent:** {parent_name}\n\n**Session:** {st.session_state.session_id}")
             
-            # Show Hardware Status
-            if st.session_state.get('hardware_running', False):
-                status_color = "🟢" if st.session_state.last_hardware_status == "Focused" else "🔴"
-                st.markdown(f"**Eye Focus:** {status_color} {st.session_state.last_hardware_status}")
-
-            if st.session_state.waiting_for_child_ready:
-                st.warning("⏳ Waiting for child interface...")
-            elif st.session_state.greeting_sent:
-                st.success("✅ Conversation started!")
+            session_status_pane()
             
             # Open child window button (Corrected)
             if not st.session_state.child_window_opened:
@@ -948,34 +1035,8 @@ def main():
         st.markdown("<h1>Live Conversation Monitor 💙</h1>", unsafe_allow_html=True)
     
         # --- CALIBRATION WIZARD (Overlay) ---
-        # Only show if hardware is running AND calibration is not finished (Step < 6)
-        curr_step = st.session_state.get('calibration_step', 0)
-        
-        if st.session_state.conversation_started and st.session_state.get('hardware_running', False) and 0 < curr_step < 6:
-            
-            progress = int((curr_step - 1) * 20)
-            st.markdown(f"**System Calibration: {progress}% Complete**")
-            st.progress(progress)
-            
-            instr = ["Initializing...", "Look at the CENTER", "Look LEFT Limit", "Look RIGHT Limit", "Look TOP Limit", "Look BOTTOM Limit", "Active"][curr_step]
-            
-            st.markdown(f"""
-            <div class="calib-card">
-                <div class="instruction-big">{instr}</div>
-                <div class="instruction-small">Instruct the child to hold their gaze steady, then press Capture.</div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            col_c1, col_c2, col_c3 = st.columns([1, 2, 1])
-            with col_c2:
-                if st.button("✅ Capture Position", use_container_width=True):
-                    if st.session_state.shell:
-                        st.session_state.shell.send("\n")
-                        with st.spinner(f"Calibrating Step {curr_step}..."):
-                            time.sleep(1.0)
-                        st.rerun()
-            
-            st.divider() # Separate calibration from chat potential
+        if st.session_state.conversation_started and st.session_state.get('hardware_running', False):
+            calibration_pane()
 
         # --- MAIN VIEW LOGIC ---
         if not st.session_state.conversation_started:
@@ -992,49 +1053,8 @@ def main():
             """, unsafe_allow_html=True)
 
         else:
-            # Display conversation (ALWAYS show if session started)
-            if not st.session_state.messages:
-                # Only show waiting message if truly no messages exist
-                st.markdown("""
-                    <div style='text-align: center; background-color: white; padding: 50px; border-radius: 20px;'>
-                        <h2 style='font-size: 2em; color: #667eea;'>⏳ Waiting for conversation to begin...</h2>
-                        <p style='font-size: 1.3em; color: #555;'>Messages will appear here once the child starts talking.</p>
-                    </div>
-                """, unsafe_allow_html=True)
-            with st.container(height=650, border=False):
-                if not st.session_state.messages:
-                    st.markdown("<h3 style='text-align:center;color:#ccc;'>Waiting for conversation...</h3>", unsafe_allow_html=True)
-                else:
-                    # Display all messages
-                    for idx, message in enumerate(st.session_state.messages):
-                        avatar = "🤖" if message["role"] == "assistant" else "😊"
-                        with st.chat_message(message["role"], avatar=avatar):
-                            st.write(message["content"])
-                            
-                            # ===== ENHANCED ROBOT ACTION DISPLAY =====
-                            if message["role"] == "assistant" and message.get("robot_action"):
-                                robot_action = message["robot_action"]
-                                action_name = robot_action.get('action', 'unknown')
-                                reason = robot_action.get('reason', 'No reason provided')
-                                
-                                # Format action name nicely (jump_forward → Jump Forward)
-                                formatted_action = action_name.replace('_', ' ').title()
-                            
-                                # Display with nice formatting
-                                st.info(f"""
-                    **🤖 Robot Action:** {formatted_action}  
-                    **💭 Reason:** {reason}
-                                """.strip())
-                            # ===== END ENHANCED DISPLAY =====
-
-                            # Show picture indicator if present
-                            if message["role"] == "assistant" and message.get("picture"):
-                                picture_info = message['picture']
-                                st.success(f"🖼️ Picture shown: {picture_info.get('filename', 'Unknown')} ({picture_info.get('complexity', 'N/A')} complexity)")
-        # Auto-refresh
-        if st.session_state.conversation_started and st.session_state.monitoring_mode:
-            time.sleep(2)
-            st.rerun()
+            # Only this pane refreshes while the session runs
+            live_conversation_pane()
 
 if __name__ == "__main__":
     try:
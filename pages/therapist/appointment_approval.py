@@ -2,7 +2,7 @@ import streamlit as st
 from streamlit_option_menu import option_menu
 from database.appointments import get_appointments_by_therapist, update_appointment_status
 from database.children import get_children_by_therapist
-from database.users import get_user_by_id
+from database.users import get_users_by_ids
 from utils.session_state import clear_cookies
 from utils.ui_components import render_footer
 
@@ -76,6 +76,7 @@ appts = get_appointments_by_therapist(therapist_id)
 children = get_children_by_therapist(therapist_id)
 child_dict = {c['ChildID']: c['Name'] for c in children}
 parent_dict = {c['ChildID']: c['ParentID'] for c in children}
+parents = get_users_by_ids(parent_dict.values())
 
 if selected == "Pending":
     filtered_appts = [appt for appt in appts if appt['Status'] == 'PENDING']
@@ -94,7 +95,7 @@ if selected == "Pending":
                 with col2:
                     parent_id = parent_dict.get(appt['ChildID'])
                     if parent_id:
-                        parent = get_user_by_id(parent_id)
+                        parent = parents.get(parent_id)
                         if parent:
                             st.markdown(f"**Parent Name:** {parent.get('FullName', 'N/A')}")
                             st.markdown(f"**Parent Phone:** {parent.get('ContactNumber', 'N/A')}")
@@ -0,0 +1,313 @@
+"""
+Content-addressed asset URLs for audio clips, emotion GIFs and pictures
+
+Each asset gets a URL named after its SHA-256, so the browser downloads each GIF
+or clip once and later reruns only send the URL.
+
+By default assets are written as static/assets/<sha256>.<ext> next to the running
+app script and served by Streamlit itself (server.enableStaticServing in
+.streamlit/config.toml), on the app's own origin, so tablets and HTTPS
+deployments need no extra port or proxy. Oldest files are deleted above
+ASSET_CACHE_MAX_BYTES.
+
+Optionally (ASSET_SERVER_ENABLED) assets are kept in memory instead and served by
+a small local HTTP server at /a/<sha256>.<ext>, which needs a fixed port and the
+public URL the browser reaches it at (ASSET_PUBLIC_URL).
+
+When neither is available the same calls return data: URIs, still encoded once
+and kept in memory.
+"""
+
+import base64
+import hashlib
+import mimetypes
+import os
+import sys
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+import agent_settings
+
+_EXTENSIONS = {
+    'audio/mpeg': 'mp3',
+    'image/gif': 'gif',
+    'image/png': 'png',
+    'image/jpeg': 'jpg',
+    'image/webp': 'webp',
+}
+
+
+class AssetStore:
+    """In-memory assets by content hash, least recently used evicted above max_bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._assets = OrderedDict()  # digest -> (bytes, mime)
+        self._size = 0
+
+    def put(self, data: bytes, mime: str) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if digest in self._assets:
+                self._assets.move_to_end(digest)
+                return digest
+            self._assets[digest] = (data, mime)
+            self._size += len(data)
+            while self._size > self.max_bytes and len(self._assets) > 1:
+                _, (old_data, _) = self._assets.popitem(last=False)
+                self._size -= len(old_data)
+        return digest
+
+    def get(self, digest: str):
+        with self._lock:
+            asset = self._assets.get(digest)
+            if asset is not None:
+                self._assets.move_to_end(digest)
+            return asset
+
+
+class _AssetHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        name = self.path.split('?', 1)[0].rsplit('/', 1)[-1]
+        digest = name.split('.', 1)[0]
+        asset = self.server.store.get(digest) if self.path.startswith('/a/') else None
+        if asset is None:
+            self.send_error(404)
+            return
+
+        data, mime = asset
+        etag = f'"{digest}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', mime)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'public, max-age=31536000, immutable')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # One line per GIF fetch would drown the app log
+
+
+class _AssetHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class AssetServer:
+    """Registers assets and hands out URLs for them"""
+
+    def __init__(self, store: AssetStore, host: str, port: int, public_url: str):
+        """
+        Args:
+            store: Asset bytes by content hash
+            host, port: Address to listen on
+            public_url: Base URL the browser uses for this server (scheme, host and any proxy path)
+        """
+        self.store = store
+        self._server = _AssetHTTPServer((host, port), _AssetHandler)
+        self._server.store = store
+        self.base_url = f"{public_url.rstrip('/')}/a/"
+        threading.Thread(target=self._server.serve_forever, name="asset-server", daemon=True).start()
+        print(f"🖼️ Asset server listening on {self.base_url}")
+
+    def url_for(self, data: bytes, mime: str) -> str:
+        digest = self.store.put(data, mime)
+        return f"{self.base_url}{digest}.{_EXTENSIONS.get(mime, 'bin')}"
+
+    def has(self, digest: str) -> bool:
+        return self.store.get(digest) is not None
+
+
+class StaticAssetDir:
+    """Writes assets as content-hash files into a folder served by Streamlit's static file handler"""
+
+    def __init__(self, directory: str, base_url: str, max_bytes: int):
+        """
+        Args:
+            directory: Folder under the app's static/ folder
+            base_url: URL of that folder, relative to the page (e.g. "app/static/assets/")
+            max_bytes: Oldest files are deleted above this total size
+        """
+        self.directory = directory
+        self.base_url = base_url
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._files = OrderedDict()  # digest -> (file name, size), oldest first
+        self._size = 0
+
+        os.makedirs(directory, exist_ok=True)
+        # Files left by earlier runs count towards the limit
+        existing = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith('.tmp'):
+                os.remove(path)
+            elif os.path.isfile(path):
+                existing.append((os.path.getmtime(path), name, os.path.getsize(path)))
+        for _, name, size in sorted(existing):
+            self._files[name.split('.', 1)[0]] = (name, size)
+            self._size += size
+        print(f"🖼️ Serving assets from {directory}")
+
+    def url_for(self, data: bytes, mime: str) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        name = f"{digest}.{_EXTENSIONS.get(mime, 'bin')}"
+        with self._lock:
+            if digest in self._files:
+                self._files.move_to_end(digest)
+            else:
+                path = os.path.join(self.directory, name)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)  # Never served half-written
+                self._files[digest] = (name, len(data))
+                self._size += len(data)
+                self._evict()
+        # ?v= makes the static handler send a long-lived Cache-Control (the name already changes with the content)
+        return f"{self.base_url}{name}?v=1"
+
+    def has(self, digest: str) -> bool:
+        with self._lock:
+            return digest in self._files
+
+    def _evict(self):
+        while self._size > self.max_bytes and len(self._files) > 1:
+            _, (name, size) = self._files.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+
+_server = None
+_server_lock = threading.Lock()
+_server_failed = False
+
+# path -> (mtime, url, digest) so files are not re-read or re-encoded on every rerun
+_file_urls = {}
+_data_uris = OrderedDict()
+_DATA_URI_CACHE_SIZE = 32
+
+
+def _start_http_server():
+    """The optional local HTTP endpoint, or None if not configured or it cannot start"""
+    if not agent_settings.ASSET_PUBLIC_URL or not agent_settings.ASSET_SERVER_PORT:
+        # A guessed localhost URL would only load on the machine running the app
+        print("⚠️ Asset server needs ASSET_SERVER_PORT and ASSET_PUBLIC_URL, using Streamlit static serving")
+        return None
+    try:
+        return AssetServer(
+            AssetStore(agent_settings.ASSET_CACHE_MAX_BYTES),
+            agent_settings.ASSET_SERVER_HOST,
+            agent_settings.ASSET_SERVER_PORT,
+            agent_settings.ASSET_PUBLIC_URL
+        )
+    except OSError as e:
+        print(f"⚠️ Asset server unavailable, using Streamlit static serving: {e}")
+        return None
+
+
+def _open_static_dir():
+    """static/assets/ next to the running app script, or None if Streamlit does not serve it"""
+    if not st.get_option("server.enableStaticServing"):
+        print("⚠️ Streamlit static serving is off (server.enableStaticServing), using inline data URIs")
+        return None
+    # Streamlit sets argv[0] to the script it runs; each app process serves its own static/ folder
+    app_dir = os.path.dirname(os.path.abspath(sys.argv[0]))
+    try:
+        return StaticAssetDir(
+            os.path.join(app_dir, "static", "assets"),
+            "app/static/assets/",
+            agent_settings.ASSET_CACHE_MAX_BYTES
+        )
+    except OSError as e:
+        print(f"⚠️ Static asset folder unavailable, using inline data URIs: {e}")
+        return None
+
+
+def get_asset_server():
+    """Process-wide asset server (HTTP endpoint if enabled, else Streamlit static folder), or None if unavailable"""
+    global _server, _server_failed
+    if _server is None and not _server_failed:
+        with _server_lock:
+            if _server is None and not _server_failed:
+                if agent_settings.ASSET_SERVER_ENABLED:
+                    _server = _start_http_server()
+                if _server is None:
+                    _server = _open_static_dir()
+                _server_failed = _server is None
+    return _server
+
+
+def _data_uri(data: bytes, mime: str) -> str:
+    digest = hashlib.sha256(data).hexdigest()
+    with _server_lock:
+        uri = _data_uris.get(digest)
+        if uri is not None:
+            _data_uris.move_to_end(digest)
+            return uri
+    uri = f"data:{mime};base64,{base64.b64encode(data).decode()}"
+    with _server_lock:
+        _data_uris[digest] = uri
+        while len(_data_uris) > _DATA_URI_CACHE_SIZE:
+            _data_uris.popitem(last=False)
+    return uri
+
+
+def asset_url(data: bytes, mime: str) -> str:
+    """
+    URL for in-memory asset bytes
+
+    Args:
+        data: Asset contents
+        mime: MIME type (e.g. "audio/mpeg")
+
+    Returns:
+        Content-hash URL (static folder or asset server), or a data: URI fallback
+    """
+    server = get_asset_server()
+    if server is not None:
+        return server.url_for(data, mime)
+    return _data_uri(data, mime)
+
+
+def file_asset_url(path: str, mime: str = None) -> str:
+    """
+    URL for a file on disk (read once, re-read only if the file changes)
+
+    Returns:
+        Asset URL, or None if the file cannot be read
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError as e:
+        print(f"❌ Asset file unavailable: {e}")
+        return None
+
+    cached = _file_urls.get(path)
+    if cached and cached[0] == mtime:
+        _, url, digest = cached
+        server = get_asset_server()
+        # Data URIs never expire; asset URLs only while the asset is still held
+        if server is None or server.has(digest):
+            return url
+
+    mime = mime or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    with open(path, 'rb') as f:
+        data = f.read()
+    url = asset_url(data, mime)
+    _file_urls[path] = (mtime, url, hashlib.sha256(data).hexdigest())
+    return url
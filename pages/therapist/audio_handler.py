@@ -4,24 +4,67 @@ UPDATED: Streaming TTS, parallel processing, and optimized for speed
 """
 
 import os
-import tempfile
 from openai import OpenAI
-import soundfile as sf
 import agent_settings
+from tts_cache import get_tts_cache, make_key
+from stt_engine import get_local_engine
+from audio_preprocess import prepare_for_stt
+from mp3_info import mp3_duration
 from functools import lru_cache
-import hashlib
 import threading
-from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import importlib.util
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
 import asyncio
 import io
 
-import os
 # REMOVE: import config 
-from openai import OpenAI
 from dotenv import load_dotenv
 
 load_dotenv() # Load env vars directly here
 
+
+class _SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into one execution
+    
+    The first caller runs the function; callers arriving while it is in flight
+    wait on the same future and get the same result (or exception).
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+    
+    def do(self, key: str, fn, label: str = ""):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        
+        if not leader:
+            print(f"⏳ Joining in-flight request: {label[:40]}...")
+            return future.result()
+        
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+# Shared by every AudioHandler in the process (sessions, reruns, preloading)
+_in_flight = _SingleFlight()
+
+
 class AudioHandler:
     """Handle speech-to-text and text-to-speech with minimal latency"""
     
@@ -32,16 +75,19 @@ class AudioHandler:
         #self.client = OpenAI(api_key=agent_settings.OPENAI_API_KEY)
         self._whisper_model = None
         
-        # Dedicated thread pool for audio operations
-        self.executor = ThreadPoolExecutor(max_workers=3)
+        # Dedicated thread pool for audio operations (shared by every session in the process)
+        self.executor = ThreadPoolExecutor(max_workers=8)
         
-        # TTS cache for instant responses on repeated phrases
-        self._tts_cache = {}
-        self._cache_max_size = 100
+        # Persistent TTS cache shared with other processes (instant responses on repeated phrases)
+        self._tts_cache = get_tts_cache() if agent_settings.ENABLE_TTS_CACHE else None
         
         # Pre-warm the TTS API with a dummy call to reduce first-call latency
         self._prewarm_tts()
         
+        # Start the local Whisper workers now so the first utterance doesn't pay the model load
+        if agent_settings.STT_MODE != "api":
+            self.load_whisper_model()
+        
         print(" Ultra-Fast Audio Handler initialized")
     
     def _prewarm_tts(self):
@@ -51,7 +97,7 @@ class AudioHandler:
             def _warmup():
                 try:
                     self.client.audio.speech.create(
-                        model="tts-1",
+                        model=agent_settings.TTS_MODEL,
                         voice=agent_settings.TTS_VOICE,
                         input=".",
                         speed=1.0
@@ -66,46 +112,94 @@ class AudioHandler:
             pass
     
     def load_whisper_model(self):
-        """Load Whisper model for transcription"""
+        """Start the local Whisper worker pool (the model loads inside the workers)"""
         if self._whisper_model is None:
-            try:
-                import whisper
-                # Use 'tiny' model - fastest option
-                self._whisper_model = whisper.load_model("tiny")
-                print("✅ Loaded Whisper 'tiny' model")
-            except ImportError:
+            if importlib.util.find_spec("whisper") is None:
+                print("⚠️ openai-whisper not installed - using the Whisper API")
                 self._whisper_model = "api"
+            else:
+                self._whisper_model = get_local_engine()
+                self._whisper_model.warm()
         return self._whisper_model
     
     def transcribe_audio(self, audio_data, use_local=False) -> str:
         """
         Convert audio to text using Whisper (optimized for speed)
+        Identical recordings transcribed concurrently (e.g. on a rerun) share one request
+        """
+        if isinstance(audio_data, bytes):
+            key = "stt:" + hashlib.sha256(audio_data).hexdigest()
+            return _in_flight.do(key, lambda: self._transcribe(audio_data, use_local), label="transcription")
+        return self._transcribe(audio_data, use_local)
+    
+    def _transcribe(self, audio_data, use_local=False) -> str:
+        # Decode, resample to 16 kHz and trim silence in memory (smaller upload, no temp files)
+        prepared = prepare_for_stt(audio_data)
+        if prepared is not None:
+            if not prepared['pcm']:
+                print("🔇 No speech detected - skipping transcription")
+                return ""
+            print(f"🎚️ Audio prepared: {prepared['original_duration']:.1f}s -> {prepared['duration']:.1f}s "
+                  f"({len(prepared['encoded']) // 1024} KB {prepared['format']})")
+        
+        mode = "local" if use_local else agent_settings.STT_MODE
+        engine = self.load_whisper_model() if mode != "api" else "api"
+        if engine == "api" or prepared is None:
+            return self._transcribe_api(prepared or audio_data)
+        
+        pcm = (prepared['pcm'], prepared['sample_rate'])
+        if mode == "local":
+            try:
+                return engine.transcribe(*pcm, timeout=agent_settings.STT_TIMEOUT_SECONDS)
+            except Exception as e:
+                print(f"⚠️ Local transcription failed, using API: {e}")
+                return self._transcribe_api(prepared)
+        
+        # Race: local worker vs API, first non-empty transcript wins
+        futures = {
+            engine.submit(*pcm): "local",
+            self.executor.submit(self._transcribe_api, prepared): "api"
+        }
+        try:
+            for future in as_completed(futures, timeout=agent_settings.STT_TIMEOUT_SECONDS):
+                try:
+                    transcript = future.result()
+                except Exception as e:
+                    print(f"⚠️ {futures[future]} transcription failed: {e}")
+                    continue
+                if transcript and transcript.strip():
+                    print(f"🏁 {futures[future]} transcription won")
+                    return transcript
+        except FutureTimeout:
+            print("⏱️ Transcription timed out")
+        return None
+    
+    def _transcribe_api(self, audio) -> str:
         """
-        temp_dir = tempfile.mkdtemp()
-        temp_path = os.path.join(temp_dir, "temp_audio.wav")
+        Transcribe with the whisper-1 API
         
+        Args:
+            audio: Prepared audio from prepare_for_stt, encoded bytes, or a file path
+        """
         try:
-            # Save audio to temporary file
-            if isinstance(audio_data, str) and os.path.exists(audio_data):
-                temp_path = audio_data
-            elif isinstance(audio_data, bytes):
-                with open(temp_path, "wb") as f:
-                    f.write(audio_data)
+            if isinstance(audio, dict):
+                upload = (f"speech.{audio['format']}", audio['encoded'])
+            elif isinstance(audio, bytes):
+                upload = ("speech.wav", audio)
+            elif isinstance(audio, str) and os.path.exists(audio):
+                with open(audio, "rb") as audio_file:
+                    upload = (os.path.basename(audio), audio_file.read())
             else:
-                try:
-                    sf.write(temp_path, audio_data, 16000)
-                except Exception:
-                    audio_data.export(temp_path, format="wav")
+                print("Transcription error: unsupported audio input")
+                return None
             
             # OpenAI Whisper API is usually FASTER than local
-            # Use API by default for best speed
-            with open(temp_path, "rb") as audio_file:
-                transcript = self.client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    language="en",
-                    response_format="text"
-                )
+            transcript = self.client.audio.transcriptions.create(
+                model="whisper-1",
+                file=upload,
+                language="en",
+                response_format="text"
+            )
             
             if isinstance(transcript, str):
                 return transcript
@@ -114,20 +208,16 @@ class AudioHandler:
         except Exception as e:
             print(f"Transcription error: {e}")
             return None
-        
-        finally:
-            try:
-                if os.path.exists(temp_path) and temp_path != audio_data:
-                    os.remove(temp_path)
-                if os.path.exists(temp_dir):
-                    os.rmdir(temp_dir)
-            except Exception:
-                pass
     
     def _get_cache_key(self, text: str) -> str:
         """Generate cache key for TTS"""
-        key_string = f"{text}_{agent_settings.TTS_VOICE}_{agent_settings.TTS_SPEED}"
-        return hashlib.md5(key_string.encode()).hexdigest()
+        return make_key(
+            text,
+            agent_settings.TTS_VOICE,
+            agent_settings.TTS_SPEED,
+            agent_settings.TTS_MODEL,
+            agent_settings.TTS_FORMAT
+        )
     
     def text_to_speech(self, text: str, use_cache: bool = True) -> bytes:
         """
@@ -148,40 +238,86 @@ class AudioHandler:
         """
         try:
             # FAST PATH: Check cache first
-            if use_cache and agent_settings.ENABLE_TTS_CACHE:
-                cache_key = self._get_cache_key(text)
-                if cache_key in self._tts_cache:
+            use_cache = use_cache and self._tts_cache is not None
+            cache_key = self._get_cache_key(text)
+            if use_cache:
+                cached = self._tts_cache.get(cache_key)
+                if cached is not None:
                     print(f"⚡ INSTANT - TTS cache hit: {text[:40]}...")
-                    return self._tts_cache[cache_key]
-            
-            print(f"🎤 Generating TTS for: {text[:50]}...")
-            start_time = __import__('time').time()
+                    return cached
             
-            # Generate TTS using tts-1 (fastest model)
-            response = self.client.audio.speech.create(
-                model="tts-1",  # CRITICAL: tts-1 is 2x faster than tts-1-hd
-                voice=agent_settings.TTS_VOICE,
-                input=text,
-                speed=agent_settings.TTS_SPEED,
-                response_format="mp3"  # MP3 is smaller and faster than other formats
+            # One network request per unique utterance, however many callers want it
+            return _in_flight.do(
+                "tts:" + cache_key,
+                lambda: self._synthesize(text, cache_key, use_cache),
+                label=text
             )
             
-            audio_bytes = response.content
-            
-            elapsed = __import__('time').time() - start_time
-            print(f"✅ TTS generated in {elapsed:.2f}s")
-            
-            # Cache for future use
-            if use_cache and agent_settings.ENABLE_TTS_CACHE and len(self._tts_cache) < self._cache_max_size:
-                cache_key = self._get_cache_key(text)
-                self._tts_cache[cache_key] = audio_bytes
-            
-            return audio_bytes
-            
         except Exception as e:
             print(f"❌ TTS error: {e}")
             return None
     
+    def _synthesize(self, text: str, cache_key: str, use_cache: bool) -> bytes:
+        """Call the TTS API and store the result (runs once per in-flight key)"""
+        if use_cache:
+            # A previous leader may have finished between our cache check and now
+            cached = self._tts_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        print(f"🎤 Generating TTS for: {text[:50]}...")
+        start_time = __import__('time').time()
+        
+        # Generate TTS using tts-1 (fastest model)
+        response = self.client.audio.speech.create(
+            model=agent_settings.TTS_MODEL,  # CRITICAL: tts-1 is 2x faster than tts-1-hd
+            voice=agent_settings.TTS_VOICE,
+            input=text,
+            speed=agent_settings.TTS_SPEED,
+            response_format=agent_settings.TTS_FORMAT
+        )
+        
+        audio_bytes = response.content
+        
+        elapsed = __import__('time').time() - start_time
+        print(f"✅ TTS generated in {elapsed:.2f}s")
+        
+        # Cache before the in-flight entry is released (other processes see it too)
+        if use_cache:
+            try:
+                self._tts_cache.put(cache_key, audio_bytes, text=text)
+            except Exception as e:
+                print(f"⚠️ TTS cache store failed: {e}")
+        
+        return audio_bytes
+    
+    def synthesize(self, text: str, use_cache: bool = True):
+        """
+        Text to speech with playback metadata
+        
+        Args:
+            text: Text to convert to speech
+            use_cache: Whether to use TTS cache
+            
+        Returns:
+            dict with 'text', 'audio' (bytes), 'format' and 'duration' (exact seconds,
+            parsed from the MP3 frame headers), or None if synthesis failed
+        """
+        audio_bytes = self.text_to_speech(text, use_cache)
+        if not audio_bytes:
+            return None
+        duration = mp3_duration(audio_bytes) if agent_settings.TTS_FORMAT == "mp3" else None
+        return {
+            'text': text,
+            'audio': audio_bytes,
+            'format': agent_settings.TTS_FORMAT,
+            'duration': duration
+        }
+    
+    def synthesize_parallel(self, text: str):
+        """synthesize() in a background thread; returns a Future"""
+        return self.executor.submit(self.synthesize, text)
+    
     def text_to_speech_streaming(self, text: str):
         """
         EXPERIMENTAL: Stream TTS audio as it's generated
@@ -225,12 +361,20 @@ class AudioHandler:
         """
         if phrases is None:
             phrases = agent_settings.COMMON_TTS_PHRASES
+        if self._tts_cache is None:
+            return
+        
+        # Phrases already on disk (from an earlier run or the other app) cost nothing
+        missing = [p for p in phrases if self._tts_cache.get(self._get_cache_key(p)) is None]
+        if not missing:
+            print(f"⚡ All {len(phrases)} common phrases already cached")
+            return
         
-        print(f" Pre-loading {len(phrases)} common phrases...")
+        print(f" Pre-loading {len(missing)} of {len(phrases)} common phrases...")
         
         # Use thread pool to pre-generate all in parallel
         futures = []
-        for phrase in phrases:
+        for phrase in missing:
             future = self.executor.submit(self.text_to_speech, phrase, True)
             futures.append(future)
         
@@ -241,7 +385,7 @@ class AudioHandler:
             except:
                 pass
         
-        print(f"Pre-loaded {len(self._tts_cache)} phrases in cache...")
+        print(f"Pre-loaded {self._tts_cache.stats()['entries']} phrases in cache...")
     
     def optimize_connection(self):
         """
@@ -255,14 +399,22 @@ class AudioHandler:
             pass
     
     def clear_tts_cache(self):
-        """Clear the TTS cache"""
-        self._tts_cache.clear()
+        """Clear the TTS cache (for every process sharing the cache directory)"""
+        if self._tts_cache is not None:
+            self._tts_cache.clear()
         print("🗑️ TTS cache cleared")
     
     def get_cache_stats(self):
         """Get TTS cache statistics"""
+        if self._tts_cache is None:
+            return {'cached_phrases': 0, 'cache_enabled': False}
+        stats = self._tts_cache.stats()
         return {
-            'cached_phrases': len(self._tts_cache),
-            'max_cache_size': self._cache_max_size,
-            'cache_enabled': agent_settings.ENABLE_TTS_CACHE
+            'cached_phrases': stats['entries'],
+            'cache_bytes': stats['bytes'],
+            'max_cache_bytes': stats['max_bytes'],
+            'hot_phrases': stats['hot_entries'],
+            'hits': stats['hits'],
+            'misses': stats['misses'],
+            'cache_enabled': True
         }
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+In-memory audio preparation for speech-to-text
+
+Recorded audio is decoded into a NumPy buffer, downmixed to mono, resampled to
+16 kHz, trimmed of leading/trailing silence with a frame-energy VAD and encoded
+into a compact in-memory buffer - no temp files, and a smaller upload.
+"""
+
+import io
+from math import gcd
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import resample_poly
+
+import agent_settings
+
+STT_SAMPLE_RATE = 16000
+_VAD_FRAME_MS = 30
+
+
+def decode(audio_data):
+    """
+    Decode recorded audio to mono float32
+
+    Args:
+        audio_data: Encoded bytes (WAV/FLAC/OGG), a file path, a pydub AudioSegment,
+                    or a NumPy array of 16 kHz samples
+
+    Returns:
+        (samples, sample_rate)
+    """
+    if isinstance(audio_data, (bytes, str)):
+        source = io.BytesIO(audio_data) if isinstance(audio_data, bytes) else audio_data
+        samples, sample_rate = sf.read(source, dtype='float32', always_2d=True)
+        return samples.mean(axis=1), sample_rate
+
+    if hasattr(audio_data, 'raw_data'):
+        # pydub AudioSegment
+        segment = audio_data.set_channels(1).set_sample_width(2)
+        samples = np.frombuffer(segment.raw_data, dtype=np.int16).astype(np.float32) / 32768.0
+        return samples, segment.frame_rate
+
+    samples = np.asarray(audio_data)
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    if samples.dtype.kind in 'iu':
+        samples = samples / float(np.iinfo(samples.dtype).max)
+    return samples.astype(np.float32), STT_SAMPLE_RATE
+
+
+def resample(samples: np.ndarray, sample_rate: int, target_rate: int = STT_SAMPLE_RATE) -> np.ndarray:
+    """Polyphase resampling (anti-aliased) to target_rate"""
+    if sample_rate == target_rate or samples.size == 0:
+        return samples
+    divisor = gcd(int(sample_rate), int(target_rate))
+    return resample_poly(samples, target_rate // divisor, int(sample_rate) // divisor).astype(np.float32)
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int, threshold_db: float = None, pad_ms: int = None) -> np.ndarray:
+    """
+    Cut leading and trailing silence using per-frame RMS energy
+
+    Args:
+        samples: Mono float32 samples in [-1, 1]
+        sample_rate: Sample rate of samples
+        threshold_db: Frames quieter than this (dBFS) count as silence
+        pad_ms: Audio kept on each side of the detected speech
+
+    Returns:
+        Trimmed samples (empty if no frame reaches the threshold)
+    """
+    threshold_db = agent_settings.STT_VAD_THRESHOLD_DB if threshold_db is None else threshold_db
+    pad_ms = agent_settings.STT_VAD_PAD_MS if pad_ms is None else pad_ms
+
+    frame_length = max(1, sample_rate * _VAD_FRAME_MS // 1000)
+    frame_count = samples.size // frame_length
+    if frame_count == 0:
+        return samples
+
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    voiced = np.flatnonzero(rms >= 10 ** (threshold_db / 20))
+    if voiced.size == 0:
+        return samples[:0]
+
+    pad = sample_rate * pad_ms // 1000
+    start = max(0, voiced[0] * frame_length - pad)
+    end = min(samples.size, (voiced[-1] + 1) * frame_length + pad)
+    return samples[start:end]
+
+
+def encode(samples: np.ndarray, sample_rate: int, audio_format: str = None) -> bytes:
+    """Encode 16-bit samples into an in-memory file (FLAC by default)"""
+    audio_format = audio_format or agent_settings.STT_UPLOAD_FORMAT
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, sample_rate, format=audio_format.upper(), subtype='PCM_16')
+    return buffer.getvalue()
+
+
+def prepare_for_stt(audio_data):
+    """
+    Decode, downmix, resample, trim and encode one utterance
+
+    Returns:
+        dict with 'pcm' (16-bit mono bytes), 'sample_rate', 'encoded', 'format',
+        'duration' (seconds of speech kept) and 'original_duration',
+        or None if the audio could not be decoded
+    """
+    try:
+        samples, sample_rate = decode(audio_data)
+        original_duration = samples.size / sample_rate if sample_rate else 0.0
+        samples = resample(samples, sample_rate)
+        samples = trim_silence(samples, STT_SAMPLE_RATE)
+        pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+        audio_format = agent_settings.STT_UPLOAD_FORMAT
+        return {
+            'pcm': pcm.tobytes(),
+            'sample_rate': STT_SAMPLE_RATE,
+            'encoded': encode(pcm, STT_SAMPLE_RATE, audio_format) if pcm.size else b"",
+            'format': audio_format,
+            'duration': pcm.size / STT_SAMPLE_RATE,
+            'original_duration': original_duration
+        }
+    except Exception as e:
+        print(f"⚠️ Audio preprocessing failed: {e}")
+        return None
@@ -3,7 +3,7 @@ from streamlit_option_menu import option_menu
 from database.children import get_children_by_therapist, assign_therapist_to_child, get_children_by_parent
 from database.sessions import get_sessions_by_therapist, get_sessions_by_child
 from database.messages import get_messages_by_session
-from database.users import get_all_users, get_user_by_id
+from database.users import get_all_users, get_users_by_ids
 import uuid
 from datetime import datetime, date
 from utils.session_state import clear_cookies
@@ -93,10 +93,11 @@ selected = option_menu(
 if selected == "Assigned Children":
     children = get_children_by_therapist(therapist_id)
     if children:
+        parents = get_users_by_ids(child.get('ParentID') for child in children)
         for child in children:
             age = calculate_age(child['DOB'])
             with st.expander(f"{child['Name']} (Age: {age})"):
-                parent = get_user_by_id(child['ParentID'])
+                parent = parents.get(child['ParentID'])
                 st.write(f"Parent Name: {parent['FullName'] if parent else 'Unknown'}")
                 st.write(f"Parent Phone Number: {parent.get('ContactNumber', 'Unknown') if parent else 'Unknown'}")
                 if st.button(f"View Details for {child['Name']}", key=f"view_{child['ChildID']}", use_container_width=True):
@@ -172,11 +173,12 @@ elif selected == "Session Logs":
     children = get_children_by_therapist(therapist_id)
     if children:
         # Group children by parent
+        parents = get_users_by_ids(child.get('ParentID') for child in children)
         parent_dict = {}
         for child in children:
             parent_id = child['ParentID']
             if parent_id not in parent_dict:
-                parent_dict[parent_id] = {'parent': get_user_by_id(parent_id), 'children': []}
+                parent_dict[parent_id] = {'parent': parents.get(parent_id), 'children': []}
             parent_dict[parent_id]['children'].append(child)
 
         parent_options = {f"{data['parent']['FullName']}": pid for pid, data in parent_dict.items()}
@@ -5,15 +5,14 @@ FIXED: Unicode console errors and missing UI elements
 """
 import os
 import streamlit as st
-from audio_handler import AudioHandler
-from database_handler import DatabaseHandler
-from emotion_display_handler import EmotionDisplayHandler
 from llm_agent import LanguageScreeningAgent
-from picture_handler import PictureHandler
-from robot_controller import RobotController
+from resources import get_registry
+from turn_orchestrator import TurnOrchestrator
+from event_bus import get_event_bus, EVENT_AUDIO_STATE, EVENT_EMOTION
+from asset_server import asset_url, file_asset_url
 import agent_settings
-import base64
-import uuid
+import hashlib
+import json
 import time
 import streamlit.components.v1 as components
 
@@ -313,32 +312,29 @@ st.markdown("""
         border: 2px solid #E1E4E8;
         min-height: calc(100vh - 100px);
     }
+
+    /* Clicked by the browser when reply audio ends */
+    .st-key-audio_ended_signal {
+        display: none;
+    }
     </style>
 """, unsafe_allow_html=True)
 
 def initialize_session():
     """Initialize session state"""
+    # Process-wide services (built once, shared by every tab); the session only keeps references
+    registry = get_registry()
     if "audio_handler" not in st.session_state:
-        st.session_state.audio_handler = AudioHandler()
-        # Pre-load common phrases for instant TTS
-        if agent_settings.ENABLE_TTS_CACHE:
-            st.session_state.audio_handler.preload_common_phrases()
+        st.session_state.audio_handler = registry.get("audio")
     if "db_handler" not in st.session_state:
-        st.session_state.db_handler = DatabaseHandler()
+        # Message writes go through the journaled write-behind queue (off the turn's critical path)
+        st.session_state.db_handler = registry.get("message_db")
     if "robot_controller" not in st.session_state:
-        if agent_settings.ENABLE_ROBOT_ACTIONS:
-            st.session_state.robot_controller = RobotController()
-            print("🤖 Robot controller initialized in child interface")
-        else:
-            st.session_state.robot_controller = None
+        st.session_state.robot_controller = registry.get("robot")
     if "emotion_handler" not in st.session_state:
-        try:
-            st.session_state.emotion_handler = EmotionDisplayHandler()
-        except Exception as e:
-            safe_print(f"[WARNING] Could not initialize emotion handler: {e}")
-            st.session_state.emotion_handler = None
-    if "picture_handler" not in st.session_state:
-        st.session_state.picture_handler = PictureHandler()
+        st.session_state.emotion_handler = registry.get("emotion_display")
+    # Starts listening for prewarm events (a child selected in the clinician app) to fill the warm agent pool
+    registry.get("agent_pool")
     if "active_session_id" not in st.session_state:
         st.session_state.active_session_id = None
     if "last_message_count" not in st.session_state:
@@ -351,6 +347,8 @@ def initialize_session():
         st.session_state.waiting_for_response = False
     if "current_emotion" not in st.session_state:
         st.session_state.current_emotion = "neutral"
+    if "emotion_message_id" not in st.session_state:
+        st.session_state.emotion_message_id = None
     if "audio_start_time" not in st.session_state:
         st.session_state.audio_start_time = None
     if "audio_duration" not in st.session_state:
@@ -359,59 +357,283 @@ def initialize_session():
         st.session_state.processed_audio_hash = None
     if "agent" not in st.session_state:
         st.session_state.agent = None
+    if "active_session_cache" not in st.session_state:
+        st.session_state.active_session_cache = None
+    if "event_subscription" not in st.session_state:
+        st.session_state.event_subscription = get_event_bus().subscribe()
+    if "child_messages" not in st.session_state:
+        reset_message_cache()
+    if "rendered_signature" not in st.session_state:
+        st.session_state.rendered_signature = None
+    if "last_watch_check" not in st.session_state:
+        st.session_state.last_watch_check = 0
+    if "messages_stale" not in st.session_state:
+        st.session_state.messages_stale = True
+    if "pending_clips" not in st.session_state:
+        st.session_state.pending_clips = []
+    if "clip_serial" not in st.session_state:
+        st.session_state.clip_serial = 0
       
-def estimate_audio_duration(text: str) -> float:
-    """
-    Estimate audio duration based on text length
-    Approximate speaking rate: ~150 words per minute at normal speed
-    With TTS_SPEED = 0.90, adjust accordingly
-    """
-    words = len(text.split())
-    # Base: 150 words/min = 2.5 words/sec
-    # With speed 0.90: 2.5 * 0.90 = 2.25 words/sec
-    speaking_rate = 2.25  # words per second at speed 0.90
-    duration = words / speaking_rate
-    # Add 1 second buffer for loading/processing
-    return duration + 1.0
-
-def create_audio_player_with_callback(audio_bytes, duration_estimate):
+# Playlist that lives in the parent page: clips queued by successive component iframes play
+# back-to-back (next clip preloaded), and keep playing when Streamlit reruns remove the iframes.
+# A clip's iframe is re-mounted until its reply has played, so push ignores clip IDs it already has.
+# Clips are fetched into audio/mpeg blobs: Streamlit's static folder serves .mp3 files as text/plain
+AUDIO_QUEUE_JS = """
+window.__ttsQueue = {
+    items: [],
+    current: null,
+    finishing: false,
+    queued: {},
+    push: function(src, id, reset) {
+        if (this.queued[id]) { return; }
+        this.queued[id] = true;
+        if (reset) { this.reset(); }
+        this.items.push(this.load(src));
+        if (!this.current) { this.next(); }
+    },
+    load: function(src) {
+        var clip = new Audio();
+        clip.preload = 'auto';
+        clip.ready = fetch(src).then(function(response) {
+            if (!response.ok) { throw new Error('HTTP ' + response.status); }
+            return response.blob();
+        }).then(function(blob) {
+            clip.src = URL.createObjectURL(new Blob([blob], {type: 'audio/mpeg'}));
+        });
+        clip.addEventListener('ended', function() { URL.revokeObjectURL(clip.src); });
+        return clip;
+    },
+    next: function() {
+        var self = this;
+        var clip = this.current = this.items.shift() || null;
+        if (!clip) { this.signalEnded(); return; }
+        clip.addEventListener('ended', function() { self.next(); });
+        clip.ready.then(function() {
+            // Dropped by reset() while it was loading
+            if (self.current === clip) { return clip.play(); }
+        }).catch(function(error) {
+            console.log('Audio play failed: ' + error);
+            if (self.current === clip) { self.next(); }
+        });
+    },
+    finish: function() {
+        // The reply is fully queued: report when the last clip ends
+        this.finishing = true;
+        if (!this.current && !this.items.length) { this.signalEnded(); }
+    },
+    signalEnded: function() {
+        if (!this.finishing) { return; }
+        this.finishing = false;
+        var tries = 0;
+        (function click() {
+            var button = document.querySelector('.st-key-audio_ended_signal button');
+            if (button) { button.click(); }
+            else if (tries++ < 40) { setTimeout(click, 250); }
+        })();
+    },
+    reset: function() {
+        if (this.current) { this.current.pause(); }
+        this.items = [];
+        this.current = null;
+        this.finishing = false;
+    }
+};
+"""
+
+def create_audio_queue_chunk(audio_bytes, clip_id, reset=False):
     """
-    Create auto-playing audio element with completion callback
-    Signals to database when audio finishes
+    Queue one MP3 clip on the parent-page playlist
+    
+    Args:
+        audio_bytes: MP3 data
+        clip_id: Unique clip ID (the playlist skips IDs it has already queued)
+        reset: Drop anything still queued (first clip of a new reply)
     """
     try:
-        b64 = base64.b64encode(audio_bytes).decode()
-        el_id = f"audio_{uuid.uuid4().hex[:8]}"
-        
-        # Convert duration to milliseconds
-        duration_ms = int(duration_estimate * 1000)
-        
+        # Content-hash URL: the clip bytes are not re-sent inside every iframe
+        clip_url = asset_url(audio_bytes, 'audio/mpeg')
         return f"""
-<audio id="{el_id}" autoplay style="display:none;">
-    <source src="data:audio/mp3;base64,{b64}" type="audio/mp3">
-</audio>
 <script>
-    var audio = document.getElementById('{el_id}');
-    
-    // Play audio
-    audio.play().catch(function(error) {{
-        console.log("Audio play failed: " + error);
-    }});
-    
-    // Set timeout to mark completion (fallback if ended event doesn't fire)
-    setTimeout(function() {{
-        console.log("Audio playback completed (timeout)");
-    }}, {duration_ms});
-    
-    // Also listen for ended event
-    audio.addEventListener('ended', function() {{
-        console.log("Audio playback completed (ended event)");
-    }});
+    var host = window.parent;
+    if (!host.__ttsQueue || !host.__ttsQueue.load) {{
+        host.eval({json.dumps(AUDIO_QUEUE_JS)});
+    }}
+    host.__ttsQueue.push({json.dumps(clip_url)}, {json.dumps(clip_id)}, {json.dumps(reset)});
 </script>
 """
     except:
         return None
 
+def queue_clip(audio_bytes, reset=False):
+    """
+    Queue one clip and keep its player iframe until the reply has played
+    (a rerun can remove an iframe before its script has run)
+    
+    Returns:
+        The player HTML, or None if the clip could not be queued
+    """
+    st.session_state.clip_serial += 1
+    clip_id = f"{st.session_state.active_session_id}-{st.session_state.clip_serial}"
+    audio_html = create_audio_queue_chunk(audio_bytes, clip_id, reset=reset)
+    if not audio_html:
+        return None
+    if reset:
+        st.session_state.pending_clips = []
+    st.session_state.pending_clips.append(audio_html)
+    return audio_html
+
+def render_pending_clips():
+    """Re-mount the players of the reply still playing; the playlist ignores clips it already has"""
+    if not is_audio_currently_playing():
+        st.session_state.pending_clips = []
+    for audio_html in st.session_state.pending_clips:
+        components.html(audio_html, height=0)
+
+def create_playback_end_signal():
+    """
+    Ask the parent-page playlist to click the hidden audio_ended_signal button
+    when its last queued clip ends (immediately if nothing is playing)
+    """
+    return f"""
+<script>
+    var host = window.parent;
+    if (!host.__ttsQueue || !host.__ttsQueue.load) {{
+        host.eval({json.dumps(AUDIO_QUEUE_JS)});
+    }}
+    host.__ttsQueue.finish();
+</script>
+"""
+
+def stream_reply(agent, user_text, emotion_context, orchestrator, session_id):
+    """
+    Streaming turn: each sentence is sent to TTS as soon as the LLM completes it,
+    and each clip is queued for playback (in order) as soon as it is synthesized.
+    The robot command and the reply write run in the background meanwhile.
+    
+    Returns:
+        (agent result dict, future of the assistant-message write)
+    """
+    audio_handler = st.session_state.audio_handler
+    pending = []  # (sentence, TTS future) in speaking order
+    state = {'first_clip': True, 'robot_action_sent': False, 'playback_end': 0.0}
+    
+    def _queue_ready_clips(block=False):
+        while pending and (block or pending[0][1].done()):
+            sentence, future = pending.pop(0)
+            try:
+                speech = future.result(timeout=agent_settings.RESPONSE_TIMEOUT_SECONDS)
+            except Exception as e:
+                safe_print(f"[AUDIO] TTS failed for sentence: {e}")
+                continue
+            audio_html = queue_clip(speech['audio'], reset=state['first_clip']) if speech else None
+            if not audio_html:
+                continue
+            components.html(audio_html, height=0)
+            now = time.time()
+            if state['first_clip']:
+                state['first_clip'] = False
+                st.session_state.audio_start_time = now
+                safe_print(f"[AUDIO] First clip queued: {sentence[:40]}...")
+            # A clip starts when it is queued or when the previous one ends, whichever is later
+            state['playback_end'] = max(now, state['playback_end']) + (speech['duration'] or 0)
+    
+    def _on_sentence(sentence):
+        if agent_settings.ENABLE_TEXT_TO_SPEECH:
+            pending.append((sentence, audio_handler.synthesize_parallel(sentence)))
+        _queue_ready_clips()
+    
+    def _on_robot_action(robot_action):
+        # Move while the rest of the reply is still being generated
+        orchestrator.dispatch_robot_action(robot_action)
+        state['robot_action_sent'] = True
+    
+    result = agent.chat_stream(
+        user_text,
+        on_sentence=_on_sentence,
+        on_robot_action=_on_robot_action,
+        emotion_context=emotion_context
+    )
+    
+    # Fallback action chosen after the stream (the LLM did not provide one)
+    if not state['robot_action_sent']:
+        orchestrator.dispatch_robot_action(result.get('robot_action'))
+    
+    # Persist the reply while the last clips are still being synthesized
+    reply_future = orchestrator.persist_reply(session_id, result)
+    _queue_ready_clips(block=True)
+    
+    if not state['first_clip']:
+        st.session_state.audio_duration = state['playback_end'] - st.session_state.audio_start_time
+        get_event_bus().publish(
+            EVENT_AUDIO_STATE,
+            session_id,
+            playing=True,
+            duration=st.session_state.audio_duration
+        )
+    return result, reply_future
+
+def run_child_turn(audio_bytes):
+    """
+    One child turn through the concurrent pipeline (see turn_orchestrator.py)
+    
+    Returns:
+        True if the child was heard and answered
+    """
+    session_id = st.session_state.active_session_id
+    orchestrator = TurnOrchestrator(
+        st.session_state.audio_handler,
+        st.session_state.db_handler,
+        st.session_state.robot_controller
+    )
+    state = {'reply_future': None}
+    
+    def _new_agent():
+        agent = LanguageScreeningAgent()
+        agent.set_session_id(session_id)
+        return agent
+    
+    def _respond(agent, transcript, emotion_context):
+        st.session_state.waiting_for_response = True
+        st.success(f"✅ Got it!")
+        
+        with st.spinner("🤔 Thinking..."):
+            if agent_settings.STREAM_RESPONSES:
+                # Sentences are spoken while the reply is still generating
+                result, state['reply_future'] = stream_reply(
+                    agent, transcript, emotion_context, orchestrator, session_id
+                )
+                return result
+            
+            result = agent.chat(transcript, emotion_context=emotion_context)
+            orchestrator.dispatch_robot_action(result.get('robot_action'))
+            state['reply_future'] = orchestrator.persist_reply(session_id, result)
+            
+            if agent_settings.ENABLE_TEXT_TO_SPEECH:
+                st.session_state.audio_handler.text_to_speech_parallel(result['response'])
+            return result
+    
+    turn = orchestrator.run_turn(
+        session_id,
+        audio_bytes,
+        agent=st.session_state.agent,
+        agent_factory=_new_agent,
+        respond=_respond
+    )
+    if not turn:
+        return False
+    
+    st.session_state.agent = turn['agent']
+    remember_message(turn['user_message'])
+    remember_message(orchestrator.await_stage('assistant_write', state['reply_future']))
+    
+    if agent_settings.STREAM_RESPONSES:
+        # Already queued for playback; do not synthesize it again on rerun
+        st.session_state.audio_played_count = len(st.session_state.child_messages)
+        st.session_state.last_message_count = len(st.session_state.child_messages)
+    
+    st.session_state.waiting_for_response = False
+    return True
+
 def display_emotion_in_column(emotion: str):
     """Display robot emotion GIF in the left column"""
     if not st.session_state.emotion_handler:
@@ -460,8 +682,6 @@ def display_picture(picture_path: str):
             current_dir = os.path.dirname(os.path.abspath(__file__))
             picture_path = os.path.join(current_dir, picture_path)
         
-        safe_print(f"[INFO] Attempting to load picture from: {picture_path}")
-        
         # Check if file exists
         if not os.path.exists(picture_path):
             safe_print(f"[ERROR] Picture file not found: {picture_path}")
@@ -498,36 +718,32 @@ def display_picture(picture_path: str):
                 """, unsafe_allow_html=True)
                 return
         
-        # Get base64 encoding
-        with open(picture_path, 'rb') as f:
-            image_bytes = f.read()
-            picture_base64 = base64.b64encode(image_bytes).decode('utf-8')
+        # Detect image format
+        file_ext = os.path.splitext(picture_path)[1].lower()
+        mime_types = {
+            '.jpg': 'image/jpeg',
+            '.jpeg': 'image/jpeg',
+            '.png': 'image/png',
+            '.gif': 'image/gif',
+            '.webp': 'image/webp'
+        }
+        mime_type = mime_types.get(file_ext, 'image/jpeg')
         
-        if picture_base64:
-            # Detect image format
-            file_ext = os.path.splitext(picture_path)[1].lower()
-            mime_types = {
-                '.jpg': 'image/jpeg',
-                '.jpeg': 'image/jpeg',
-                '.png': 'image/png',
-                '.gif': 'image/gif',
-                '.webp': 'image/webp'
-            }
-            mime_type = mime_types.get(file_ext, 'image/jpeg')
-            
+        # Content-hash URL (read once per process, downloaded once per browser)
+        picture_url = file_asset_url(picture_path, mime_type)
+        
+        if picture_url:
             # Display picture with nice frame
             st.markdown(f"""
                 <div class="picture-container">
                     <div class="picture-frame">
-                        <img src="data:{mime_type};base64,{picture_base64}" alt="Picture to describe">
+                        <img src="{picture_url}" alt="Picture to describe">
                     </div>
                     <div class="picture-prompt">👀 What do you see in this picture?</div>
                 </div>
             """, unsafe_allow_html=True)
-            
-            safe_print(f"[SUCCESS] Displayed picture: {picture_path}")
         else:
-            safe_print(f"[ERROR] Could not encode picture to base64")
+            safe_print(f"[ERROR] Could not load picture")
             
     except Exception as e:
         safe_print(f"[ERROR] Error displaying picture: {e}")
@@ -550,15 +766,28 @@ def display_picture(picture_path: str):
         """, unsafe_allow_html=True)
 
 def get_active_session_data():
-    """Get the full active session object from DB"""
+    """Get the active session for this room via its pointer item (keyed reads only)"""
     try:
-        sessions = st.session_state.db_handler.get_all_sessions(limit=5000)
-        sessions.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+        db = st.session_state.db_handler
+        session_id = db.get_active_session_id()
+        if not session_id:
+            st.session_state.active_session_cache = None
+            return None
         
-        for session in sessions:
-            if session.get('status') == 'active':
-                return session
-        return None
+        # Once the child is ready the session record no longer changes what we render,
+        # so while the pointer is unchanged the pointer read alone is enough
+        cached = st.session_state.get('active_session_cache')
+        if (cached and cached.get('session_id') == session_id
+                and cached.get('metadata', {}).get('child_ready')):
+            return cached
+        
+        session = db.get_session_item(session_id)
+        if not session or session.get('status') != 'active':
+            st.session_state.active_session_cache = None
+            return None
+        
+        st.session_state.active_session_cache = session
+        return session
     except Exception as e:
         safe_print(f"[ERROR] Error checking sessions: {e}")
         return None
@@ -575,28 +804,111 @@ def signal_child_ready(session_id):
         safe_print(f"[ERROR] Error sending ready signal: {e}")
         return False
 
+def reset_message_cache():
+    """Forget the cached messages and their sync cursor (new or ended session)"""
+    st.session_state.child_messages = []
+    st.session_state.child_message_ids = set()
+    st.session_state.child_message_cursor = None
+    st.session_state.messages_stale = True
+
+def remember_message(message):
+    """Show a just-written message before DynamoDB has it (write-behind); reads dedupe by message_id"""
+    if not message or message.get('message_id') in st.session_state.child_message_ids:
+        return
+    st.session_state.child_message_ids.add(message.get('message_id'))
+    st.session_state.child_messages.append(message)
+
 def load_messages(session_id):
+    """Session messages, fetching only the ones written since the last load"""
     if not session_id:
         return []
-    return st.session_state.db_handler.get_session_messages(session_id)
+    new_messages, cursor = st.session_state.db_handler.get_messages_since(
+        session_id,
+        st.session_state.child_message_cursor
+    )
+    st.session_state.child_message_cursor = cursor
+    for message in new_messages:
+        remember_message(message)
+    if new_messages:
+        # Background writes may land out of order
+        st.session_state.child_messages.sort(key=lambda m: m.get('timestamp', ''))
+    return st.session_state.child_messages
 
-def send_response(text, session_id):
-    if not session_id or not text.strip():
+def sync_messages():
+    """
+    Fetch the new messages if session_watch saw a session event
+    
+    Returns:
+        True if any arrived
+    """
+    if not st.session_state.messages_stale:
         return False
-    return st.session_state.db_handler.add_message(session_id, "user", text)
+    st.session_state.messages_stale = False
+    shown = len(st.session_state.child_messages)
+    return len(load_messages(st.session_state.active_session_id)) != shown
+
+def view_signature(session_data):
+    """What the page layout depends on: (session, child ready)"""
+    if not session_data:
+        return (None, False)
+    return (session_data.get('session_id'), bool(session_data.get('metadata', {}).get('child_ready', False)))
+
+@st.fragment(run_every=agent_settings.LIVE_PANE_REFRESH_SECONDS)
+def session_watch():
+    """
+    Invisible watcher: reruns the page only when the session or its child-ready state changed;
+    new messages are left to message_pane
+    DynamoDB is only read when a session event was pushed or the fallback interval expired
+    """
+    events = st.session_state.event_subscription.drain()
+    fallback_due = time.time() - st.session_state.last_watch_check >= agent_settings.EVENT_FALLBACK_POLL_SECONDS
+    if not events and not fallback_due:
+        return
+    st.session_state.last_watch_check = time.time()
+    # Picked up by message_pane on its next run
+    st.session_state.messages_stale = True
+    
+    if view_signature(get_active_session_data()) != st.session_state.rendered_signature:
+        st.rerun()
+
+def speaking_indicator():
+    """Playback countdown; hands the turn back to the child when the browser reports the end of audio"""
+    # Hidden; clicked by the parent-page playlist when the last clip ends
+    if st.button("Audio ended", key="audio_ended_signal"):
+        mark_audio_finished()
+        st.rerun(scope="fragment")
+    remaining = st.session_state.audio_duration - (time.time() - st.session_state.audio_start_time)
+    st.markdown(f"""
+        <div style='text-align: center; padding: 1.5rem;'>
+            <div style='font-size: 1.5em; color: #667eea;'>🔊 Speaking...</div>
+            <div style='font-size: 1em; color: #888;'>({max(remaining, 0):.0f}s)</div>
+        </div>
+    """, unsafe_allow_html=True)
+
+def mark_audio_finished():
+    """Playback ended in the browser: give the turn back to the child"""
+    safe_print("[AUDIO] Playback ended")
+    st.session_state.audio_start_time = None
+    st.session_state.audio_duration = 0
+    st.session_state.pending_clips = []
+    get_event_bus().publish(EVENT_AUDIO_STATE, st.session_state.active_session_id, playing=False)
 
 def is_audio_currently_playing():
-    """Check if audio is still playing based on start time and duration"""
+    """
+    Check if reply audio is still playing
+    Cleared by the browser's ended signal; the exact clip length plus a grace period
+    is only a fallback in case the signal never arrives
+    """
     if st.session_state.audio_start_time is None:
         return False
     
     elapsed = time.time() - st.session_state.audio_start_time
-    return elapsed < st.session_state.audio_duration
+    return elapsed < st.session_state.audio_duration + agent_settings.AUDIO_END_GRACE_SECONDS
 
 def update_emotion_for_latest_message(messages):
     """
-    FIXED: Update emotion immediately when new assistant message arrives
-    This function runs BEFORE displaying messages to ensure emotion changes instantly
+    Select the robot emotion for the latest assistant message
+    Runs once per reply: the emotion pane checks on every refresh
     """
     if not messages:
         return
@@ -611,6 +923,12 @@ def update_emotion_for_latest_message(messages):
     if not latest_assistant_msg:
         return
     
+    # Already selected for this reply
+    message_id = latest_assistant_msg.get('message_id')
+    if message_id is not None and message_id == st.session_state.emotion_message_id:
+        return
+    st.session_state.emotion_message_id = message_id
+    
     # Extract metadata
     msg_metadata = latest_assistant_msg.get('metadata', {})
     
@@ -635,6 +953,148 @@ def update_emotion_for_latest_message(messages):
     if selected_emotion != st.session_state.current_emotion:
         safe_print(f"[EMOTION] Change: {st.session_state.current_emotion} -> {selected_emotion}")
         st.session_state.current_emotion = selected_emotion
+        get_event_bus().publish(EVENT_EMOTION, st.session_state.active_session_id, emotion=selected_emotion)
+
+def turn_controls(messages):
+    """Audio input on the child's turn, otherwise the speaking/thinking state"""
+    if is_audio_currently_playing():
+        # Reply is fully queued by now: have the browser report when it ends
+        components.html(create_playback_end_signal(), height=0)
+        speaking_indicator()
+    elif messages and messages[-1]['role'] == 'assistant' and not st.session_state.waiting_for_response:
+        if agent_settings.ENABLE_SPEECH_TO_TEXT:
+            st.markdown("""
+                <div style='text-align: center; margin-bottom: 0.5rem;'>
+                    <div style='font-size: 1.3em; color: #667eea; font-weight: bold;'>🎤 Your Turn!</div>
+                </div>
+            """, unsafe_allow_html=True)
+            
+            audio_file = st.audio_input("Click to record")
+            
+            if audio_file is not None:
+                audio_bytes = audio_file.getvalue()
+                
+                audio_hash = hashlib.md5(audio_bytes).hexdigest()
+                
+                if audio_hash != st.session_state.processed_audio_hash:
+                    st.session_state.processed_audio_hash = audio_hash
+                    
+                    with st.spinner("🎧 Listening..."):
+                        answered = run_child_turn(audio_bytes)
+                    
+                    if answered:
+                        # New messages and reply players for both panes
+                        st.rerun()
+                    st.session_state.failed_audio_hash = audio_hash
+                
+                # Kept across the pane's refreshes until the child records again
+                if audio_hash == st.session_state.get('failed_audio_hash'):
+                    st.error("Try again!")
+    
+    elif st.session_state.waiting_for_response:
+        st.markdown("""
+            <div style='text-align: center; padding: 1.5rem;'>
+                <div style='font-size: 1.5em; color: #667eea;'>🤔 Thinking...</div>
+            </div>
+        """, unsafe_allow_html=True)
+
+@st.fragment(run_every=agent_settings.LIVE_PANE_REFRESH_SECONDS)
+def emotion_pane():
+    """
+    Robot emotion and the child's turn controls
+    Reruns itself when a reply that arrived since the last refresh changes the emotion
+    """
+    st.markdown("""
+        <div style='text-align: center; padding: 2rem 0;'></div>
+    """, unsafe_allow_html=True)
+    
+    rendered_emotion = st.session_state.current_emotion
+    display_emotion_in_column(rendered_emotion)
+    
+    st.markdown("---")
+    
+    # AUDIO INPUT AREA - Always visible here!
+    turn_controls(st.session_state.child_messages)
+    
+    update_emotion_for_latest_message(st.session_state.child_messages)
+    if st.session_state.current_emotion != rendered_emotion:
+        st.rerun(scope="fragment")
+
+@st.fragment(run_every=agent_settings.LIVE_PANE_REFRESH_SECONDS)
+def message_pane():
+    """
+    Message list with reply playback
+    Shows the cached messages, then fetches the new ones (see sync_messages) and reruns
+    itself only when some arrived
+    """
+    messages = st.session_state.child_messages
+    
+    with st.container(height=750, border=False):
+        # Waiting for first greeting
+        if not messages:
+            st.markdown("""
+                <div style='text-align: center; padding: 3rem;'>
+                    <div style='font-size: 2.5em; color: #667eea;'>🤖 Getting Ready...</div>
+                    <div style='font-size: 1.3em; color: #666;'>The robot is waking up!</div>
+                </div>
+            """, unsafe_allow_html=True)
+        
+        # Track audio playback (several unplayed replies are queued back-to-back)
+        newly_started_audio = False
+        
+        # Display messages
+        for idx, message in enumerate(messages):
+            avatar = "🤖" if message["role"] == "assistant" else "😊"
+            
+            with st.chat_message(message["role"], avatar=avatar):
+                st.write(message["content"])
+                
+                # Check if this message has a picture
+                if message["role"] == "assistant":
+                    msg_metadata = message.get('metadata', {})
+                    picture_path = msg_metadata.get('picture_path')
+                    
+                    if picture_path:
+                        display_picture(picture_path)
+                
+                # Auto-play TTS for new assistant messages
+                if (message["role"] == "assistant" and 
+                    idx >= st.session_state.audio_played_count and
+                    agent_settings.ENABLE_TEXT_TO_SPEECH):
+                    
+                    safe_print(f"[AUDIO] Generating audio for message {idx}")
+                    speech = st.session_state.audio_handler.synthesize(message["content"])
+                    
+                    if speech:
+                        duration = speech['duration'] or 0
+                        safe_print(f"[AUDIO] Duration: {duration:.1f} seconds")
+                        
+                        if queue_clip(speech['audio'], reset=not newly_started_audio):
+                            st.session_state.audio_played_count = idx + 1
+                            if newly_started_audio:
+                                st.session_state.audio_duration += duration
+                            else:
+                                st.session_state.audio_start_time = time.time()
+                                st.session_state.audio_duration = duration
+                            newly_started_audio = True
+                            get_event_bus().publish(
+                                EVENT_AUDIO_STATE,
+                                st.session_state.active_session_id,
+                                playing=True,
+                                duration=st.session_state.audio_duration
+                            )
+                            
+                            safe_print(f"[AUDIO] Started at {st.session_state.audio_start_time}")
+        
+        # Players of the reply still playing, kept mounted across reruns
+        render_pending_clips()
+    
+    if len(messages) > st.session_state.last_message_count:
+        st.session_state.last_message_count = len(messages)
+        st.session_state.waiting_for_response = False
+    
+    if sync_messages():
+        st.rerun(scope="fragment")
 
 def main():
     initialize_session()
@@ -649,11 +1109,15 @@ def main():
             st.session_state.last_message_count = 0
             st.session_state.audio_played_count = 0
             st.session_state.current_emotion = "neutral"
+            st.session_state.emotion_message_id = None
             st.session_state.audio_start_time = None
             st.session_state.audio_duration = 0
             st.session_state.processed_audio_hash = None
+            reset_message_cache()
         
+        st.session_state.rendered_signature = view_signature(None)
         st.markdown("<h1>Let's Talk Together! 🎈</h1>", unsafe_allow_html=True)
+        session_watch()
         
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
@@ -668,9 +1132,6 @@ def main():
                     </div>
                 </div>
             """, unsafe_allow_html=True)
-        
-        time.sleep(3)
-        st.rerun()
         return
 
     # Update local session ID
@@ -682,9 +1143,11 @@ def main():
         st.session_state.audio_played_count = 0
         st.session_state.waiting_for_response = False
         st.session_state.current_emotion = "neutral"
+        st.session_state.emotion_message_id = None
         st.session_state.audio_start_time = None
         st.session_state.audio_duration = 0
         st.session_state.processed_audio_hash = None
+        reset_message_cache()
     
     # Check if ready
     metadata = session_data.get('metadata', {})
@@ -692,7 +1155,9 @@ def main():
 
     # WAITING FOR START - Show button to start
     if not is_ready_in_db:
+        st.session_state.rendered_signature = view_signature(session_data)
         st.markdown("<h1>Let's Talk Together! 🎈</h1>", unsafe_allow_html=True)
+        session_watch()
         
         # Display emotion GIF
         display_emotion_in_column("surprise")
@@ -712,58 +1177,19 @@ def main():
         with col2:
             if st.button("🚀 CLICK TO START", use_container_width=True, key="start_button"):
                 with st.spinner("Getting ready..."):
-                    # Initialize agent for this session
-                    st.session_state.agent = LanguageScreeningAgent()
-                    st.session_state.agent.set_session_id(current_session_id)
-                    
-                    # Generate greeting immediately
-                    result = st.session_state.agent.start_conversation()
+                    # Warm agent with its greeting already generated and synthesised (see agent_pool.py)
+                    pooled = get_registry().get("agent_pool").acquire(current_session_id)
+                    st.session_state.agent = pooled['agent']
+                    result = pooled['greeting']
                     greeting = result['response']
                     robot_action = result.get('robot_action')
                     
-                    # ===== DEBUG SECTION =====
-                    print(f"\n{'='*60}")
-                    print(f"🔍 ROBOT EXECUTION CHECK:")
-                    print(f"   result keys: {result.keys()}")
-                    print(f"   robot_action value: {result.get('robot_action')}")
-                    print(f"   robot_action type: {type(result.get('robot_action'))}")
-                    print(f"   robot_controller exists: {st.session_state.robot_controller is not None}")
-                    if robot_action:
-                        print(f"   action_name: {robot_action.get('action')}")
-                        print(f"   reason: {robot_action.get('reason')}")
-                    else:
-                        print(f"   ❌ robot_action is None or empty!")
-                    print(f"{'='*60}\n")
-                    # ===== END DEBUG =====
-
-                    # Execute robot action immediately
-                    robot_action = result.get('robot_action')
-                    if robot_action and st.session_state.robot_controller:
-                        action_name = robot_action.get('action')
-                        reason = robot_action.get('reason', '')
-                        print(f"🤖 Executing robot action: {action_name} ({reason})")
-                        success = st.session_state.robot_controller.perform_action(action_name)
-                        print(f"   Execution result: {success}")
-                    # Execute robot action immediately
-                    if robot_action and st.session_state.robot_controller:
-                        action_name = robot_action.get('action')
-                        print(f"🤖 Executing greeting robot action: {action_name}")
-                        st.session_state.robot_controller.perform_action(action_name)
-                    # ===== END NEW SECTION =====
-                    
-                    # Prepare message data with TTS
-                    message_data = {
-                        "role": "assistant",
-                        "content": greeting,
-                        "robot_action": robot_action,
-                        "emotion": result.get('emotion')
-                    }
-                    
-                    # Generate TTS
-                    if agent_settings.ENABLE_TEXT_TO_SPEECH:
-                        audio_bytes = st.session_state.audio_handler.text_to_speech(greeting)
-                        if audio_bytes:
-                            message_data["audio"] = audio_bytes
+                    # Robot greets in the background; the greeting does not wait for it
+                    TurnOrchestrator(
+                        st.session_state.audio_handler,
+                        st.session_state.db_handler,
+                        st.session_state.robot_controller
+                    ).dispatch_robot_action(robot_action)
                     
                     # Save to database
                     metadata = {}
@@ -780,13 +1206,12 @@ def main():
                     )
                     
                     if success:
+                        remember_message(success)
                         # Signal child is ready
                         st.session_state.db_handler.update_session_metadata(
                             current_session_id,
                             {'child_ready': True}
                         )
-                        st.success("✅ Ready to talk!")
-                        time.sleep(0.5)
                         st.rerun()
                     else:
                         st.error("❌ Connection failed. Please try again.")
@@ -795,189 +1220,24 @@ def main():
 
     # CONVERSATION ACTIVE - TWO COLUMN LAYOUT
     st.markdown("<h1>Let's Talk Together! 🎈</h1>", unsafe_allow_html=True)
+    st.session_state.rendered_signature = view_signature(session_data)
+    session_watch()
     
-    # Load messages FIRST
-    messages = load_messages(st.session_state.active_session_id)
-    
-    # CRITICAL FIX: Update emotion BEFORE rendering anything
-    update_emotion_for_latest_message(messages)
+    # Sync before the panes render, so their own change checks find nothing new in a
+    # full-page run (Streamlit only allows fragment-scoped reruns in fragment runs)
+    sync_messages()
+    update_emotion_for_latest_message(st.session_state.child_messages)
     
     # Create two columns: emotion on left, conversation on right
     emotion_col, conversation_col = st.columns([1, 2])
     
     # LEFT COLUMN - EMOTION DISPLAY + AUDIO INPUT
     with emotion_col:
-        st.markdown("""
-            <div style='text-align: center; padding: 2rem 0;'></div>
-        """, unsafe_allow_html=True)
-        
-        # Display current emotion (already updated above)
-        display_emotion_in_column(st.session_state.current_emotion)
-        
-        st.markdown("---")
-        
-        # AUDIO INPUT AREA - Always visible here!
-        if is_audio_currently_playing():
-            remaining = st.session_state.audio_duration - (time.time() - st.session_state.audio_start_time)
-            if remaining > 0:
-                st.markdown(f"""
-                    <div style='text-align: center; padding: 1.5rem;'>
-                        <div style='font-size: 1.5em; color: #667eea;'>🔊 Speaking...</div>
-                        <div style='font-size: 1em; color: #888;'>({remaining:.0f}s)</div>
-                    </div>
-                """, unsafe_allow_html=True)
-                time.sleep(1)
-                st.rerun()
-        elif messages and messages[-1]['role'] == 'assistant' and not st.session_state.waiting_for_response:
-            if agent_settings.ENABLE_SPEECH_TO_TEXT:
-                st.markdown("""
-                    <div style='text-align: center; margin-bottom: 0.5rem;'>
-                        <div style='font-size: 1.3em; color: #667eea; font-weight: bold;'>🎤 Your Turn!</div>
-                    </div>
-                """, unsafe_allow_html=True)
-                
-                audio_file = st.audio_input("Click to record")
-                
-                if audio_file is not None:
-                    audio_bytes = audio_file.getvalue()
-                    
-                    import hashlib
-                    audio_hash = hashlib.md5(audio_bytes).hexdigest()
-                    
-                    if audio_hash != st.session_state.processed_audio_hash:
-                        st.session_state.processed_audio_hash = audio_hash
-                        
-                        with st.spinner("🎧 Listening..."):
-                            transcribed = st.session_state.audio_handler.transcribe_audio(audio_bytes)
-                            
-                            if transcribed and transcribed.strip():
-                                if send_response(transcribed, st.session_state.active_session_id):
-                                    st.session_state.waiting_for_response = True
-                                    st.success(f"✅ Got it!")
-                                    
-                                    with st.spinner("🤔 Thinking..."):
-                                        if not st.session_state.agent:
-                                            st.session_state.agent = LanguageScreeningAgent()
-                                            st.session_state.agent.set_session_id(st.session_state.active_session_id)
-                                        
-                                        result = st.session_state.agent.chat(transcribed)
-                                        
-                                        robot_action = result.get('robot_action')
-                                        if robot_action and st.session_state.robot_controller:
-                                            action_name = robot_action.get('action')
-                                            reason = robot_action.get('reason', '')
-                                            print(f"🤖 Executing robot action: {action_name} ({reason})")
-                                            st.session_state.robot_controller.perform_action(action_name)
-                                        
-                                        tts_future = None
-                                        if agent_settings.ENABLE_TEXT_TO_SPEECH:
-                                            tts_future = st.session_state.audio_handler.text_to_speech_parallel(result['response'])
-                                        
-                                        metadata = {}
-                                        if result.get('emotion'):
-                                            metadata['emotion'] = result['emotion']
-                                        if result.get('robot_action'):
-                                            metadata['robot_action'] = result['robot_action']
-                                        if result.get('picture'):
-                                            picture_info = result['picture']
-                                            metadata['picture_path'] = picture_info['filepath']
-                                            metadata['picture_filename'] = picture_info['filename']
-                                            metadata['picture_complexity'] = picture_info['complexity']
-                                        
-                                        st.session_state.db_handler.add_message(
-                                            st.session_state.active_session_id,
-                                            "assistant",
-                                            result['response'],
-                                            metadata=metadata if metadata else None
-                                        )
-                                        
-                                        st.session_state.waiting_for_response = False
-                                        time.sleep(0.5)
-                                        st.rerun()
-                            else:
-                                st.error("Try again!")
-        
-        elif st.session_state.waiting_for_response:
-            st.markdown("""
-                <div style='text-align: center; padding: 1.5rem;'>
-                    <div style='font-size: 1.5em; color: #667eea;'>🤔 Thinking...</div>
-                </div>
-            """, unsafe_allow_html=True)
-            time.sleep(2)
-            st.rerun()
-        
-        else:
-            time.sleep(1)
-            st.rerun()
+        emotion_pane()
     
     # RIGHT COLUMN - CONVERSATION ONLY
     with conversation_col:
-        # Waiting for first greeting
-        with st.container(height=750, border=False):
-            if not messages:
-                st.markdown("""
-                    <div style='text-align: center; padding: 3rem;'>
-                        <div style='font-size: 2.5em; color: #667eea;'>🤖 Getting Ready...</div>
-                        <div style='font-size: 1.3em; color: #666;'>The robot is waking up!</div>
-                    </div>
-                """, unsafe_allow_html=True)
-                time.sleep(2)
-                st.rerun()
-                return
-            
-            # Track audio playback
-            newly_started_audio = False
-            
-            # Display messages
-            for idx, message in enumerate(messages):
-                avatar = "🤖" if message["role"] == "assistant" else "😊"
-                
-                with st.chat_message(message["role"], avatar=avatar):
-                    st.write(message["content"])
-                    
-                    # Check if this message has a picture
-                    if message["role"] == "assistant":
-                        msg_metadata = message.get('metadata', {})
-                        picture_path = msg_metadata.get('picture_path')
-                        
-                        if picture_path:
-                            display_picture(picture_path)
-                    
-                    # Auto-play TTS for new assistant messages
-                    if (message["role"] == "assistant" and 
-                        idx >= st.session_state.audio_played_count and
-                        agent_settings.ENABLE_TEXT_TO_SPEECH):
-                        
-                        safe_print(f"[AUDIO] Generating audio for message {idx}")
-                        audio_bytes = st.session_state.audio_handler.text_to_speech(message["content"])
-                        
-                        if audio_bytes:
-                            duration = estimate_audio_duration(message["content"])
-                            safe_print(f"[AUDIO] Estimated duration: {duration:.1f} seconds")
-                            
-                            audio_html = create_audio_player_with_callback(audio_bytes, duration)
-                            if audio_html:
-                                components.html(audio_html, height=0)
-                                
-                                st.session_state.audio_played_count = idx + 1
-                                st.session_state.audio_start_time = time.time()
-                                st.session_state.audio_duration = duration
-                                newly_started_audio = True
-                                
-                                safe_print(f"[AUDIO] Started at {st.session_state.audio_start_time}")
-            
-            # Check for new messages
-            if len(messages) > st.session_state.last_message_count:
-                st.session_state.last_message_count = len(messages)
-                st.session_state.waiting_for_response = False
-                
-                if newly_started_audio:
-                    safe_print(f"[AUDIO] Waiting {st.session_state.audio_duration:.1f}s for completion...")
-                    time.sleep(st.session_state.audio_duration + 0.5)
-                else:
-                    time.sleep(0.5)
-                st.rerun()
-        
+        message_pane()
 
 
 if __name__ == "__main__":
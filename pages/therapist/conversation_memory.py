@@ -0,0 +1,149 @@
+"""
+Rolling conversation memory for LanguageScreeningAgent
+
+Older turns are folded into a short running summary plus structured facts (the
+child's name, interests, topics covered, pictures already described). The
+prompt then carries the summary and only the turns not yet summarised, so the
+input size stays about the same however long the session runs.
+
+Summaries are updated in the background after a turn completes: the next
+prompt uses whatever summary is ready, and the unsummarised tail simply stays
+in the history until the update lands.
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+import agent_settings
+
+# Shared by every session in the process; summaries are small and infrequent
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory")
+
+_SUMMARY_INSTRUCTIONS = """You maintain the memory of a language screening conversation between a friendly robot and a child.
+Update the memory with the new messages. Reply with JSON only:
+{{"summary": "...", "name": "...", "interests": ["..."], "topics": ["..."]}}
+
+- summary: at most {max_words} words, third person, what has happened so far and how the child is communicating
+- name: the child's name, or "" if not yet known
+- interests: things the child said they like (short phrases)
+- topics: conversation topics already covered
+Keep facts from the current memory unless the new messages contradict them."""
+
+
+class ConversationMemory:
+    """Running summary and facts for one session's older turns"""
+
+    def __init__(self, llm=None, recent_messages: int = None, batch: int = None):
+        """
+        Args:
+            llm: Chat model used for summaries (None disables summarising)
+            recent_messages: Newest messages always sent verbatim
+            batch: Older messages are summarised this many at a time
+        """
+        self.llm = llm
+        self.recent_messages = recent_messages or agent_settings.MEMORY_RECENT_MESSAGES
+        self.batch = max(1, batch or agent_settings.MEMORY_SUMMARY_BATCH)
+        self._lock = threading.Lock()
+        self._pending = None
+        self.summary = ""
+        self.facts = {'name': "", 'interests': [], 'topics': [], 'pictures_described': []}
+        # Messages before this index are covered by the summary
+        self.summarized_upto = 0
+
+    def note_picture(self, filename: str):
+        """Record a picture shown to the child (known directly, no LLM needed)"""
+        with self._lock:
+            if filename not in self.facts['pictures_described']:
+                self.facts['pictures_described'].append(filename)
+
+    def context(self) -> str:
+        """
+        Summary and facts formatted for the prompt
+
+        Returns:
+            str: Memory block, or "" if nothing is known yet
+        """
+        with self._lock:
+            summary = self.summary
+            facts = {key: (list(value) if isinstance(value, list) else value) for key, value in self.facts.items()}
+
+        lines = []
+        if facts['name']:
+            lines.append(f"Child's name: {facts['name']}")
+        if facts['interests']:
+            lines.append(f"Interests: {', '.join(facts['interests'])}")
+        if facts['topics']:
+            lines.append(f"Topics already covered: {', '.join(facts['topics'])}")
+        if facts['pictures_described']:
+            lines.append(f"Pictures already described: {', '.join(facts['pictures_described'])}")
+        if summary:
+            lines.append(f"Summary: {summary}")
+        if not lines:
+            return ""
+        return "[CONVERSATION SO FAR]\n" + "\n".join(lines)
+
+    def update_async(self, messages: list):
+        """
+        Summarise older messages in the background once a full batch is due
+
+        Args:
+            messages: The agent's complete message list (read, never modified)
+        """
+        if self.llm is None:
+            return
+        with self._lock:
+            if self._pending is not None:
+                return
+            due = len(messages) - self.recent_messages - self.summarized_upto
+            if due < self.batch:
+                return
+            start = self.summarized_upto
+            end = start + due - due % self.batch
+            chunk = [dict(msg) for msg in messages[start:end]]
+            self._pending = _executor.submit(self._summarize, chunk, end)
+
+    def _summarize(self, chunk: list, end: int):
+        try:
+            with self._lock:
+                current = {'summary': self.summary, **{k: v for k, v in self.facts.items() if k != 'pictures_described'}}
+
+            transcript = "\n".join(
+                f"{'Child' if msg['role'] == 'user' else 'Robot'}: {msg['content']}" for msg in chunk
+            )
+            response = self.llm.invoke([
+                SystemMessage(content=_SUMMARY_INSTRUCTIONS.format(max_words=agent_settings.MEMORY_SUMMARY_MAX_WORDS)),
+                HumanMessage(content=f"Current memory:\n{json.dumps(current)}\n\nNew messages:\n{transcript}")
+            ])
+            updated = _parse_json(response.content)
+            if updated is None:
+                print(f"⚠️ Memory update returned no JSON: {response.content[:100]}")
+                return
+
+            with self._lock:
+                self.summary = str(updated.get('summary') or self.summary)
+                self.facts['name'] = str(updated.get('name') or self.facts['name'])
+                for key in ('interests', 'topics'):
+                    if isinstance(updated.get(key), list):
+                        self.facts[key] = [str(item) for item in updated[key]]
+                self.summarized_upto = end
+            print(f"🧠 Memory updated: {end} message(s) summarised")
+        except Exception as e:
+            print(f"❌ Memory update failed: {e}")
+        finally:
+            with self._lock:
+                self._pending = None
+
+
+def _parse_json(text: str):
+    """First JSON object in an LLM reply (tolerates code fences), or None"""
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        return json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return None
@@ -6,46 +6,62 @@ UPDATED: Added audio completion tracking methods
 UPDATED: Added session counter per child
 """
 
-import boto3
-from boto3.dynamodb.conditions import Key, Attr
-from datetime import datetime
+from botocore.exceptions import ClientError
+from datetime import datetime, timedelta
 from decimal import Decimal
+import threading
 import uuid
 import agent_settings
+from write_behind import MessageWriteBehind
+from event_bus import (get_event_bus, EVENT_SESSION_STARTED, EVENT_SESSION_ENDED,
+                       EVENT_NEW_MESSAGE, EVENT_CHILD_READY, EVENT_AUDIO_STATE)
+from config.aws_config import get_dynamodb, get_table
+from database.indexes import query_by
+from database.pagination import parallel_scan_all
+from database.sessions import ACTIVE_POINTER_PREFIX, ACTIVE_POINTER_TYPE, SESSION_ITEMS_FILTER
+from database.users import get_user_by_id
+
+# One write-behind queue per process (each holds a lock on its own journal slot)
+_message_writer = None
+_message_writer_lock = threading.Lock()
 
 
 class DatabaseHandler:
     """Handle DynamoDB operations for screening sessions and children"""
     
-    def __init__(self):
+    def __init__(self, write_behind: bool = False):
+        """
+        Args:
+            write_behind: Queue add_message writes to a journaled background writer
+                          instead of writing them synchronously
+        """
+        # Subscribers are notified after each durable write
+        self.events = get_event_bus()
+        self.message_writer = None
+        
         try:
-            # Initialize DynamoDB client
-            self.dynamodb = boto3.resource(
-                'dynamodb',
-                aws_access_key_id=agent_settings.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=agent_settings.AWS_SECRET_ACCESS_KEY,
-                region_name=agent_settings.AWS_REGION
-            )
+            # Shared, pooled DynamoDB resource (created once per process)
+            credentials = agent_settings.AWS_CREDENTIALS
+            self.dynamodb = get_dynamodb(**credentials)
             
+            # Table handles are lazy: no DescribeTable round trip on session start
             # Sessions table
             self.sessions_table_name = agent_settings.DYNAMODB_SESSIONS_TABLE_NAME
-            self.sessions_table = self.dynamodb.Table(self.sessions_table_name)
+            self.sessions_table = get_table(self.sessions_table_name, **credentials)
             
             # Children table
             self.children_table_name = agent_settings.DYNAMODB_CHILDREN_TABLE_NAME
-            self.children_table = self.dynamodb.Table(self.children_table_name)
+            self.children_table = get_table(self.children_table_name, **credentials)
             
             # Messages table
             self.messages_table_name = agent_settings.DYNAMODB_MESSAGES_TABLE_NAME
-            self.messages_table = self.dynamodb.Table(self.messages_table_name)
+            self.messages_table = get_table(self.messages_table_name, **credentials)
             
-            self.users_table = self.dynamodb.Table('users')
-
-            # Test connection
-            self.sessions_table.load()
-            self.children_table.load()
-            self.messages_table.load()
-            print(f"✅ DynamoDB connected successfully")
+            self.users_table = get_table('users', **credentials)
+            
+            if write_behind:
+                self.message_writer = self._get_message_writer()
+            print(f"✅ DynamoDB handler ready")
             
         except Exception as e:
             print(f"X DynamoDB connection failed: {e}")
@@ -53,6 +69,37 @@ class DatabaseHandler:
             self.children_table = None
             self.messages_table = None
     
+    def _get_message_writer(self) -> MessageWriteBehind:
+        """Process-wide write-behind queue for the messages table (replays its journal on creation)"""
+        global _message_writer
+        with _message_writer_lock:
+            if _message_writer is None:
+                _message_writer = MessageWriteBehind(
+                    self.messages_table,
+                    agent_settings.MESSAGE_JOURNAL_PATH,
+                    to_item=self._python_to_dynamodb,
+                    on_flushed=self._publish_new_messages,
+                    flush_interval=agent_settings.MESSAGE_FLUSH_INTERVAL_SECONDS,
+                    max_attempts=agent_settings.MESSAGE_FLUSH_MAX_ATTEMPTS
+                )
+            return _message_writer
+    
+    def _publish_new_messages(self, messages: list):
+        for message in messages:
+            self.events.publish(
+                EVENT_NEW_MESSAGE,
+                message['session_id'],
+                message_id=message['message_id'],
+                role=message['role'],
+                timestamp=message['timestamp']
+            )
+    
+    def flush_messages(self, timeout: float = 10) -> bool:
+        """Block until queued (write-behind) messages are in DynamoDB"""
+        if not self.message_writer:
+            return True
+        return self.message_writer.flush(timeout)
+    
     def _python_to_dynamodb(self, obj):
         """Convert Python types to DynamoDB compatible types"""
         if isinstance(obj, float):
@@ -93,28 +140,13 @@ class DatabaseHandler:
                 # Filter children by TherapistID
                 print(f"🔍 Fetching children for therapist: {therapist_id}")
                 
-                # Try using GSI if available, otherwise use scan with filter
-                try:
-                    # Attempt to use GSI (if TherapistID-index exists)
-                    response = self.children_table.query(
-                        IndexName='TherapistID-index',
-                        KeyConditionExpression=Key('TherapistID').eq(therapist_id)
-                    )
-                    children = response.get('Items', [])
-                    print(f"✅ Found {len(children)} children using GSI")
-                except Exception as gsi_error:
-                    print(f"⚠️ GSI not available, using scan: {gsi_error}")
-                    # Fallback to scan with filter
-                    response = self.children_table.scan(
-                        FilterExpression=Attr('TherapistID').eq(therapist_id)
-                    )
-                    children = response.get('Items', [])
-                    print(f"✅ Found {len(children)} children using scan")
+                # TherapistID-index GSI (falls back to a scan if the index is missing)
+                children = query_by(self.children_table, 'TherapistID', therapist_id)
+                print(f"✅ Found {len(children)} children")
             else:
                 # Get all children (admin view)
                 print(f"🔍 Fetching all children")
-                response = self.children_table.scan()
-                children = response.get('Items', [])
+                children = parallel_scan_all(self.children_table)
             
             # Sort by name
             children.sort(key=lambda x: x.get('Name', x.get('name', '')))
@@ -174,22 +206,13 @@ class DatabaseHandler:
             return 1
         
         try:
-            # Try to query using GSI if available
-            try:
-                response = self.sessions_table.query(
-                    IndexName='child_id-created_at-index',
-                    KeyConditionExpression=Key('child_id').eq(child_id),
-                    ScanIndexForward=False,  # Sort descending
-                    Limit=1
-                )
-                items = response.get('Items', [])
-            except Exception as gsi_error:
-                print(f"⚠️ GSI not available for session count, using scan: {gsi_error}")
-                # Fallback to scan
-                response = self.sessions_table.scan(
-                    FilterExpression=Attr('child_id').eq(child_id)
-                )
-                items = response.get('Items', [])
+            # Most recent session via child_id-created_at-index
+            items = query_by(
+                self.sessions_table, 'child_id', child_id,
+                scan_forward=False,  # Sort descending
+                max_items=1,
+                Limit=1
+            )
             
             if not items:
                 # First session for this child
@@ -258,6 +281,10 @@ class DatabaseHandler:
             item = self._python_to_dynamodb(item)
             self.sessions_table.put_item(Item=item)
             
+            # Point this room's child screen at the new session
+            self.set_active_session(session_id)
+            self.events.publish(EVENT_SESSION_STARTED, session_id, child_id=child_id)
+            
             print(f"✅ Session created: {session_id}")
             print(f"   Child: {child_name} ({child_id})")
             print(f"   Session Number: #{session_number}")
@@ -308,6 +335,11 @@ class DatabaseHandler:
                 }
             )
             
+            if 'child_ready' in metadata_updates:
+                self.events.publish(EVENT_CHILD_READY, session_id, ready=bool(metadata_updates['child_ready']))
+            if 'audio_playing' in metadata_updates:
+                self.events.publish(EVENT_AUDIO_STATE, session_id, playing=bool(metadata_updates['audio_playing']))
+            
             print(f"✅ Session metadata updated: {session_id}")
             print(f"   Updates: {metadata_updates}")
             return True
@@ -357,6 +389,9 @@ class DatabaseHandler:
                 }
             )
             
+            self.clear_active_session(session_id)
+            self.events.publish(EVENT_SESSION_ENDED, session_id)
+            
             print(f"✅ Session ended: {session_id} at {timestamp}")
             return True
             
@@ -366,6 +401,21 @@ class DatabaseHandler:
             traceback.print_exc()
             return False
     
+    def get_session_item(self, session_id: str):
+        """Retrieve a session record only (no messages)"""
+        if not self.sessions_table:
+            return None
+        
+        try:
+            response = self.sessions_table.get_item(Key={'session_id': session_id})
+            if 'Item' in response:
+                return self._dynamodb_to_python(response['Item'])
+            return None
+            
+        except Exception as e:
+            print(f"Error retrieving session: {e}")
+            return None
+    
     def get_session(self, session_id: str):
         """Retrieve a session with its messages"""
         if not self.sessions_table:
@@ -394,8 +444,12 @@ class DatabaseHandler:
             return []
         
         try:
-            response = self.sessions_table.scan(Limit=limit)
-            items = response.get('Items', [])
+            # Room pointer items share the table; the filter keeps them out of the page counts too
+            items = parallel_scan_all(
+                self.sessions_table,
+                max_items=limit,
+                FilterExpression=SESSION_ITEMS_FILTER
+            )
             
             items = [self._dynamodb_to_python(item) for item in items]
             items.sort(key=lambda x: x.get('created_at', ''), reverse=True)
@@ -406,12 +460,103 @@ class DatabaseHandler:
             print(f"Error retrieving sessions: {e}")
             return []
     
+    # ==================== ACTIVE SESSION POINTER ====================
+    # One small item per room in the sessions table, keyed 'active#<room>',
+    # holding the ID of the session the room's child screen should join.
+    # Child screens poll it with a single keyed read instead of scanning sessions.
+    # Every scan of the sessions table filters these out (SESSION_ITEMS_FILTER).
+    
+    def _active_pointer_key(self, room_id: str = None) -> dict:
+        return {'session_id': f"{ACTIVE_POINTER_PREFIX}{room_id or agent_settings.CHILD_ROOM_ID}"}
+    
+    def set_active_session(self, session_id: str, room_id: str = None):
+        """
+        Point the room at session_id
+        
+        Returns:
+            The session ID the room pointed at before (None if there was none)
+        """
+        if not self.sessions_table:
+            return None
+        
+        try:
+            response = self.sessions_table.put_item(
+                Item={
+                    **self._active_pointer_key(room_id),
+                    'item_type': ACTIVE_POINTER_TYPE,
+                    'active_session_id': session_id,
+                    'updated_at': datetime.utcnow().isoformat()
+                },
+                ReturnValues='ALL_OLD'
+            )
+            previous = response.get('Attributes', {}).get('active_session_id')
+            print(f"📍 Active session for room set: {session_id}")
+            return previous
+            
+        except Exception as e:
+            print(f"❌ Error setting active session: {e}")
+            return None
+    
+    def get_active_session_id(self, room_id: str = None):
+        """Return the room's active session ID with one keyed read (None if idle)"""
+        if not self.sessions_table:
+            return None
+        
+        try:
+            response = self.sessions_table.get_item(
+                Key=self._active_pointer_key(room_id),
+                ProjectionExpression='active_session_id',
+                ConsistentRead=True
+            )
+            return response.get('Item', {}).get('active_session_id')
+            
+        except Exception as e:
+            print(f"❌ Error reading active session: {e}")
+            return None
+    
+    def get_active_session(self, room_id: str = None):
+        """Return the room's active session record (without messages), or None"""
+        session_id = self.get_active_session_id(room_id)
+        if not session_id:
+            return None
+        
+        session = self.get_session_item(session_id)
+        if not session or session.get('status') != 'active':
+            return None
+        return session
+    
+    def clear_active_session(self, session_id: str, room_id: str = None) -> bool:
+        """Remove the room's pointer, but only if it still points at session_id"""
+        if not self.sessions_table:
+            return False
+        
+        try:
+            self.sessions_table.delete_item(
+                Key=self._active_pointer_key(room_id),
+                ConditionExpression='active_session_id = :sid',
+                ExpressionAttributeValues={':sid': session_id}
+            )
+            return True
+            
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                # A newer session already owns the room
+                return False
+            print(f"❌ Error clearing active session: {e}")
+            return False
+    
     # ==================== MESSAGE OPERATIONS ====================
     
     def add_message(self, session_id: str, role: str, content: str, metadata: dict = None):
         """
         Add a message to the messages table
         IMPROVED: Preserves all emotion and context metadata INCLUDING robot_action
+        
+        With write-behind enabled the message is journaled locally and written in the
+        background, so this returns without waiting on DynamoDB.
+        
+        Returns:
+            The stored message (dict) if successful, False otherwise
         """
         if not self.messages_table:
             print("❌ Messages table not initialized")
@@ -442,75 +587,23 @@ class DatabaseHandler:
                 
                 if filtered_metadata:
                     message['metadata'] = filtered_metadata
-                    
-                    print(f"📦 Storing metadata: {list(filtered_metadata.keys())}")
-                    
-                    # Log important fields
-                    if 'detected_emotion' in filtered_metadata:
-                        print(f"   👶 Child emotion: {filtered_metadata['detected_emotion']}")
-                    if 'robot_action' in filtered_metadata:
-                        action = filtered_metadata['robot_action']
-                        if isinstance(action, dict):
-                            print(f"   🤖 Robot action: {action.get('action', 'N/A')}")
-                        else:
-                            print(f"   🤖 Robot action (raw): {action}")
-                    if 'emotion' in filtered_metadata:
-                        print(f"   🎭 Selected emotion: {filtered_metadata['emotion']}")
-            
-            message = self._python_to_dynamodb(message)
-            
-            print(f"💾 Saving message to DynamoDB:")
-            print(f"   Session: {session_id}")
-            print(f"   Role: {role}")
-            print(f"   Content: {content[:50]}...")
-            
-            self.messages_table.put_item(Item=message)
-            
-            print(f"✅ Message saved successfully: {message_id}")
-            return True
+            
+            if self.message_writer:
+                self.message_writer.enqueue(message)
+                print(f"📝 Message queued: {message_id} [{role}] {content[:40]}...")
+                return message
+            
+            self.messages_table.put_item(Item=self._python_to_dynamodb(message))
+            self.events.publish(EVENT_NEW_MESSAGE, session_id, message_id=message_id, role=role, timestamp=timestamp)
+            
+            print(f"✅ Message saved: {message_id} [{role}] {content[:40]}...")
+            return message
             
         except Exception as e:
             print(f"❌ Error adding message: {e}")
             import traceback
             traceback.print_exc()
             return False
-            
-            try:
-                # Generate unique message_id
-                message_id = str(uuid.uuid4())
-                timestamp = datetime.utcnow().isoformat()
-                
-                message = {
-                    'message_id': message_id,
-                    'session_id': session_id,
-                    'timestamp': timestamp,
-                    'role': role,
-                    'content': content
-                }
-                
-                # Only store non-robot-action metadata
-                if metadata:
-                    filtered_metadata = {k: v for k, v in metadata.items() if k != 'robot_action'}
-                    if filtered_metadata:
-                        message['metadata'] = filtered_metadata
-                
-                message = self._python_to_dynamodb(message)
-                
-                print(f"💾 Saving message to DynamoDB:")
-                print(f"   Session: {session_id}")
-                print(f"   Role: {role}")
-                print(f"   Content: {content[:50]}...")
-                
-                self.messages_table.put_item(Item=message)
-                
-                print(f"✅ Message saved successfully: {message_id}")
-                return True
-                
-            except Exception as e:
-                print(f"❌ Error adding message: {e}")
-                import traceback
-                traceback.print_exc()
-                return False
     
     def get_session_messages(self, session_id: str):
         """Get all messages for a session"""
@@ -521,27 +614,9 @@ class DatabaseHandler:
         try:
             print(f"🔍 Querying messages for session: {session_id}")
             
-            # Try using GSI first
-            try:
-                response = self.messages_table.query(
-                    IndexName='session_id-timestamp-index',
-                    KeyConditionExpression=Key('session_id').eq(session_id)
-                )
-                messages = response.get('Items', [])
-                print(f"✅ Found {len(messages)} messages using GSI for session {session_id}")
-            except Exception as gsi_error:
-                print(f"⚠️ GSI query failed (index may not exist): {gsi_error}")
-                print(f"   Falling back to scan...")
-                
-                # Fallback to scan if GSI doesn't exist
-                response = self.messages_table.scan(
-                    FilterExpression=Attr('session_id').eq(session_id)
-                )
-                messages = response.get('Items', [])
-                print(f"✅ Found {len(messages)} messages using scan for session {session_id}")
-                
-                # Sort manually by timestamp
-                messages.sort(key=lambda x: x.get('timestamp', ''))
+            # session_id-timestamp-index, ordered by timestamp
+            messages = query_by(self.messages_table, 'session_id', session_id)
+            print(f"✅ Found {len(messages)} messages for session {session_id}")
             
             result = [self._dynamodb_to_python(msg) for msg in messages]
             
@@ -560,6 +635,42 @@ class DatabaseHandler:
             traceback.print_exc()
             return []
     
+    def get_messages_since(self, session_id: str, cursor: str = None):
+        """
+        Get only the messages written since the last poll
+        
+        Args:
+            session_id: Session ID
+            cursor: Timestamp cursor returned by the previous call (None for the first poll)
+        
+        Returns:
+            (messages, cursor) - messages ordered by timestamp, and the cursor for the next call.
+            Messages from a short window before the cursor are returned again (batched
+            writes and GSI propagation can land out of order), so callers deduplicate
+            by message_id.
+        """
+        if not self.messages_table:
+            print("❌ Messages table not initialized")
+            return [], cursor
+        
+        try:
+            range_from = cursor
+            if cursor:
+                lookback = timedelta(seconds=agent_settings.MESSAGE_SYNC_LOOKBACK_SECONDS)
+                range_from = (datetime.fromisoformat(cursor) - lookback).isoformat()
+            
+            # Range condition on the session_id-timestamp-index sort key
+            items = query_by(self.messages_table, 'session_id', session_id, range_from=range_from)
+            messages = [self._dynamodb_to_python(msg) for msg in items]
+            
+            if messages:
+                cursor = max(cursor or '', messages[-1].get('timestamp', ''))
+            return messages, cursor
+            
+        except Exception as e:
+            print(f"❌ Error getting new messages: {e}")
+            return [], cursor
+    
     # ==================== CLINICIAN NOTES ====================
     
     def add_clinician_note(self, session_id: str, note: str):
@@ -603,11 +714,11 @@ class DatabaseHandler:
             return "Unknown"
         
         try:
-            # Assuming UserID is the Primary Key in 'users' table
-            response = self.users_table.get_item(Key={'UserID': parent_id})
+            # Keyed read through the cached user directory (this runs on every monitor rerun)
+            parent = get_user_by_id(parent_id)
             
-            if 'Item' in response:
-                return response['Item'].get('FullName', 'Unknown')
+            if parent:
+                return parent.get('FullName', 'Unknown')
             return "Unknown"
         except Exception as e:
             print(f"Error fetching parent name: {e}")
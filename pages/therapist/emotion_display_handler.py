@@ -7,7 +7,17 @@ IMPROVED: Better emotion detection with proper priority and context analysis
 import os
 from pathlib import Path
 import base64
-import re
+
+import agent_settings
+from asset_server import file_asset_url
+from text_classifier import RESPONSE_EMOTION_PATTERNS, has_response_emotion
+
+
+def _trace(message: str):
+    """Per-call selection tracing, only with VERBOSE_TRACE (runs on every child-view rerun)"""
+    if agent_settings.VERBOSE_TRACE:
+        print(message)
+
 
 class EmotionDisplayHandler:
     """Manages robot emotion display selection and delivery"""
@@ -20,53 +30,8 @@ class EmotionDisplayHandler:
         'neutral': 'neutral.gif'
     }
     
-    # Emotion keyword patterns (ordered by priority)
-    EMOTION_PATTERNS = {
-        'mad': {
-            'keywords': [
-                'no no', 'stop that', 'don\'t do that', 'that\'s not right',
-                'you must', 'frustrated', 'be careful', 'wait', 'hold on',
-                'that\'s wrong', 'incorrect', 'not allowed', 'dangerous'
-            ],
-            'patterns': [
-                r'\bno\s+no\b',
-                r'\bstop\b.*\bthat\b',
-                r'\bdon\'t\b',
-                r'\bcan\'t\b.*\bthat\b'
-            ]
-        },
-        'sad': {
-            'keywords': [
-                'sorry', 'sad', 'unfortunate', 'that\'s tough', 'difficult',
-                'hard time', 'struggle', 'miss', 'lost', 'hurt',
-                'don\'t worry', 'it\'s okay', 'understandable',
-                'i understand', 'that must be', 'feel bad', 'upset',
-                'crying', 'tears', 'lonely', 'scared'
-            ],
-            'patterns': [
-                r'\bso\s+sorry\b',
-                r'\bfeel\s+(?:sad|bad|upset)\b',
-                r'\bmust\s+be\s+(?:hard|tough|difficult)\b',
-                r'\bthat\'s\s+(?:tough|hard|sad)\b'
-            ]
-        },
-        'surprise': {
-            'keywords': [
-                'great', 'awesome', 'wonderful', 'amazing', 'wow', 'love',
-                'yay', 'hooray', 'excellent', 'fantastic', 'good job',
-                'well done', 'perfect', 'brilliant', 'nice', 'cool',
-                'really', 'whoa', 'oh my', 'incredible', 'super', 'terrific',
-                'exciting', 'fun', 'happy', 'joy', 'beautiful', 'lovely',
-                'impressive', 'outstanding', 'marvelous', 'splendid'
-            ],
-            'patterns': [
-                r'\b(?:great|awesome|amazing|wonderful)\b.*!',
-                r'\bgood\s+job\b',
-                r'\bwell\s+done\b',
-                r'\bthat\'s\s+(?:great|amazing|awesome)\b'
-            ]
-        }
-    }
+    # Emotion keyword patterns (ordered by priority), compiled in text_classifier
+    EMOTION_PATTERNS = RESPONSE_EMOTION_PATTERNS
     
     # Map child emotions to robot empathy emotions
     CHILD_EMOTION_MAP = {
@@ -168,21 +133,7 @@ class EmotionDisplayHandler:
         """
         if emotion not in self.EMOTION_PATTERNS:
             return False
-        
-        text_lower = text.lower()
-        patterns = self.EMOTION_PATTERNS[emotion]
-        
-        # Check keywords
-        for keyword in patterns['keywords']:
-            if keyword in text_lower:
-                return True
-        
-        # Check regex patterns
-        for pattern in patterns['patterns']:
-            if re.search(pattern, text_lower):
-                return True
-        
-        return False
+        return has_response_emotion(text, emotion)
     
     def _count_exclamations(self, text: str) -> int:
         """Count exclamation marks in text"""
@@ -214,12 +165,9 @@ class EmotionDisplayHandler:
         Returns:
             Emotion name (surprise, sad, mad, neutral)
         """
-        print(f"\n🎭 === EMOTION SELECTION START ===")
-        print(f"Response: {agent_response[:100]}...")
-        print(f"Context: {context}")
-        
-        # Initialize variables
-        response_lower = agent_response.lower()
+        _trace(f"\n🎭 === EMOTION SELECTION START ===")
+        _trace(f"Response: {agent_response[:100]}...")
+        _trace(f"Context: {context}")
         
         # PRIORITY 1: Child's Emotion (Empathy Response)
         if context:
@@ -227,21 +175,21 @@ class EmotionDisplayHandler:
             
             if child_emotion:
                 normalized_emotion = self._normalize_emotion(child_emotion)
-                print(f"👶 Child emotion detected: '{child_emotion}' → '{normalized_emotion}'")
+                _trace(f"👶 Child emotion detected: '{child_emotion}' → '{normalized_emotion}'")
                 
                 # Strong emotions get immediate empathy response
                 if child_emotion in ['sad', 'crying', 'upset', 'frustrated', 'angry', 'mad']:
-                    print(f"💙 EMPATHY: Mirroring child's {child_emotion} emotion")
+                    _trace(f"💙 EMPATHY: Mirroring child's {child_emotion} emotion")
                     return normalized_emotion
                 
                 # Positive emotions get enthusiastic response
                 if child_emotion in ['happy', 'excited', 'joyful']:
-                    print(f"😊 JOY: Responding to child's {child_emotion} with surprise")
+                    _trace(f"😊 JOY: Responding to child's {child_emotion} with surprise")
                     return 'surprise'
         
         # PRIORITY 2: Safety/Correction Indicators (MAD)
-        if self._check_emotion_patterns(response_lower, 'mad'):
-            print(f"⚠️ CORRECTION: Mad emotion indicators found")
+        if self._check_emotion_patterns(agent_response, 'mad'):
+            _trace(f"⚠️ CORRECTION: Mad emotion indicators found")
             return 'mad'
         
         # PRIORITY 3: Robot Action
@@ -257,7 +205,7 @@ class EmotionDisplayHandler:
             
             if action_name and action_name in self.ACTION_EMOTION_MAP:
                 action_emotion = self.ACTION_EMOTION_MAP[action_name]
-                print(f"🤖 ACTION: '{action_name}' → '{action_emotion}'")
+                _trace(f"🤖 ACTION: '{action_name}' → '{action_emotion}'")
                 
                 # Don't override sad/mad with neutral actions
                 # But do use excited actions
@@ -268,13 +216,13 @@ class EmotionDisplayHandler:
         # Check in order: sad → surprise (mad already checked above)
         
         # Check for sadness/sympathy
-        if self._check_emotion_patterns(response_lower, 'sad'):
-            print(f"😢 TEXT: Sad emotion patterns found")
+        if self._check_emotion_patterns(agent_response, 'sad'):
+            _trace(f"😢 TEXT: Sad emotion patterns found")
             return 'sad'
         
         # Check for excitement/positive
-        if self._check_emotion_patterns(response_lower, 'surprise'):
-            print(f"😃 TEXT: Positive emotion patterns found")
+        if self._check_emotion_patterns(agent_response, 'surprise'):
+            _trace(f"😃 TEXT: Positive emotion patterns found")
             return 'surprise'
         
         # PRIORITY 5: Punctuation Analysis
@@ -283,16 +231,16 @@ class EmotionDisplayHandler:
         
         # Multiple exclamations = excitement
         if exclamations >= 2:
-            print(f"❗ PUNCTUATION: {exclamations} exclamations → surprise")
+            _trace(f"❗ PUNCTUATION: {exclamations} exclamations → surprise")
             return 'surprise'
         
         # Single exclamation with positive context
         if exclamations == 1 and len(agent_response.split()) < 10:
-            print(f"❗ PUNCTUATION: Short excited response → surprise")
+            _trace(f"❗ PUNCTUATION: Short excited response → surprise")
             return 'surprise'
         
         # PRIORITY 6: Default
-        print(f"😐 DEFAULT: No specific emotion detected → neutral")
+        _trace(f"😐 DEFAULT: No specific emotion detected → neutral")
         return 'neutral'
     
     def get_emotion_path(self, emotion: str) -> Path:
@@ -342,16 +290,19 @@ class EmotionDisplayHandler:
             height: Display height in pixels
             
         Returns:
-            HTML string with embedded GIF
+            HTML string referencing the GIF by content-hash URL (downloaded once per browser)
         """
-        base64_data = self.get_emotion_base64(emotion)
+        gif_url = file_asset_url(str(self.get_emotion_path(emotion)), 'image/gif')
+        if not gif_url:
+            # Fall back to neutral
+            gif_url = file_asset_url(str(self.emotion_folder / self.EMOTIONS['neutral']), 'image/gif')
         
-        if not base64_data:
+        if not gif_url:
             return ""
         
         return f"""
         <div style="text-align: center; margin: 20px 0;">
-            <img src="data:image/gif;base64,{base64_data}" 
+            <img src="{gif_url}" 
                  width="{width}" 
                  height="{height}"
                  style="border-radius: 15px; box-shadow: 0 4px 15px rgba(0,0,0,0.2);"
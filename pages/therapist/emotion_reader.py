@@ -3,9 +3,10 @@ Emotion Reader - Fetch real-time child emotions from DynamoDB
 Integrates with EmotiBit system
 """
 
-import boto3
+from boto3.dynamodb.conditions import Key
 from datetime import datetime, timedelta
 import agent_settings
+from config.aws_config import get_table
 
 
 class EmotionReader:
@@ -13,19 +14,10 @@ class EmotionReader:
     
     def __init__(self):
         try:
-            self.dynamodb = boto3.resource(
-                'dynamodb',
-                aws_access_key_id=agent_settings.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=agent_settings.AWS_SECRET_ACCESS_KEY,
-                region_name=agent_settings.AWS_REGION
-            )
-            
             self.emotion_table_name = agent_settings.DYNAMODB_EMOTION_TABLE_NAME
-            self.emotion_table = self.dynamodb.Table(self.emotion_table_name)
-            
-            # Test connection
-            self.emotion_table.load()
-            print(f"✅ Emotion table connected: {self.emotion_table_name}")
+            # Lazy handle on the shared resource; no DescribeTable round trip
+            self.emotion_table = get_table(self.emotion_table_name, **agent_settings.AWS_CREDENTIALS)
+            print(f"✅ Emotion table ready: {self.emotion_table_name}")
             
         except Exception as e:
             print(f"❌ Emotion table connection failed: {e}")
@@ -55,7 +47,7 @@ class EmotionReader:
             
             # Query emotions for this session
             response = self.emotion_table.query(
-                KeyConditionExpression=boto3.dynamodb.conditions.Key('session_id').eq(session_id),
+                KeyConditionExpression=Key('session_id').eq(session_id),
                 ScanIndexForward=False,  # Get most recent first
                 Limit=10  # Get last 10 emotions
             )
@@ -110,7 +102,7 @@ class EmotionReader:
         
         try:
             response = self.emotion_table.query(
-                KeyConditionExpression=boto3.dynamodb.conditions.Key('session_id').eq(session_id),
+                KeyConditionExpression=Key('session_id').eq(session_id),
                 ScanIndexForward=False,  # Newest first
                 Limit=limit
             )
@@ -0,0 +1,363 @@
+"""
+Session event bus between the child view, the AI agent and the therapist monitor
+
+Writers publish an event right after the durable DynamoDB write; readers block on
+their subscription instead of sleeping, and reread DynamoDB only when woken
+(or when the fallback timeout expires, so a lost event only costs latency).
+
+Backends (agent_settings.EVENT_BUS_BACKEND):
+- "memory": in-process fan-out only
+- "socket": local TCP broker speaking newline-delimited JSON, shared by the Streamlit
+  processes on this host (clinician app and child view).
+
+The broker listens on EVENT_BUS_HOST:EVENT_BUS_PORT (127.0.0.1:8765 by default). With
+EVENT_BUS_START_BROKER (the default), the first process that cannot reach it hosts
+it in a daemon thread and the others connect; pick another port if 8765 is taken
+on the machine. With EVENT_BUS_START_BROKER=False a process never hosts the broker:
+if none is running, events stay in-process and the pages fall back to rereading
+DynamoDB every EVENT_FALLBACK_POLL_SECONDS.
+
+Each browser session holds one subscription. Streamlit gives no signal when a tab
+goes away, so subscriptions nobody has read for EVENT_SUBSCRIPTION_IDLE_SECONDS
+are dropped on the next publish; a page that comes back rejoins on its next read
+(and its fallback reread covers the events it missed).
+"""
+
+import json
+import queue
+import socket
+import socketserver
+import threading
+import time
+from collections import defaultdict
+
+import agent_settings
+
+# Event types
+EVENT_SESSION_STARTED = "session_started"
+EVENT_SESSION_ENDED = "session_ended"
+EVENT_NEW_MESSAGE = "new_message"
+EVENT_CHILD_READY = "child_ready"
+EVENT_AUDIO_STATE = "audio_state"
+EVENT_EMOTION = "emotion"
+EVENT_PREWARM_AGENTS = "prewarm_agents"
+
+_SUBSCRIPTION_QUEUE_SIZE = 256
+_RECONNECT_INTERVAL_SECONDS = 2.0
+
+
+class Subscription:
+    """Bounded queue of events for one topic; the oldest event is dropped when full"""
+
+    def __init__(self, backend, topic: str):
+        self.backend = backend
+        self.topic = topic
+        self._queue = queue.Queue(maxsize=_SUBSCRIPTION_QUEUE_SIZE)
+        self.active = True
+        self.last_used = time.time()
+        self.waiters = 0
+
+    def deliver(self, event: dict):
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def wait(self, timeout: float = None) -> list:
+        """
+        Block until at least one event arrives or timeout expires
+
+        Returns:
+            All pending events (empty list on timeout)
+        """
+        self.waiters += 1  # Never reaped while blocked here
+        self._touch()
+        try:
+            events = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        finally:
+            self.waiters -= 1
+        return events + self.drain()
+
+    def drain(self) -> list:
+        """Return pending events without blocking"""
+        self._touch()
+        return self._take_all()
+
+    def _take_all(self) -> list:
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _touch(self):
+        self.last_used = time.time()
+        if not self.active:
+            # Dropped while idle: rejoin the topic
+            self.backend.resubscribe(self)
+
+    def is_idle(self, now: float) -> bool:
+        return not self.waiters and now - self.last_used > agent_settings.EVENT_SUBSCRIPTION_IDLE_SECONDS
+
+    def close(self):
+        self.backend.unsubscribe(self)
+        self._take_all()
+
+
+class InMemoryBackend:
+    """Fan-out to subscriptions in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, topic: str) -> Subscription:
+        subscription = Subscription(self, topic)
+        self.resubscribe(subscription)
+        return subscription
+
+    def resubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscription.active = True
+            self._subscriptions[subscription.topic].add(subscription)
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscription.active = False
+            self._subscriptions[subscription.topic].discard(subscription)
+
+    def publish(self, topic: str, event: dict):
+        self._dispatch(topic, event)
+
+    def _dispatch(self, topic: str, event: dict):
+        now = time.time()
+        with self._lock:
+            subscriptions = self._subscriptions.get(topic, set())
+            # Sessions whose browser tab went away stop reading; drop them here
+            idle = [subscription for subscription in subscriptions if subscription.is_idle(now)]
+            for subscription in idle:
+                subscription.active = False
+                subscriptions.discard(subscription)
+            subscriptions = list(subscriptions)
+        for subscription in idle:
+            subscription._take_all()
+        if idle:
+            print(f"🧹 Dropped {len(idle)} idle event subscription(s) on '{topic}'")
+        for subscription in subscriptions:
+            subscription.deliver(event)
+
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    """One connected process: {"op": "sub"|"pub", "topic": ..., "event": ...} per line"""
+
+    def handle(self):
+        broker = self.server
+        topics = set()
+        self.send_lock = threading.Lock()
+        with broker.lock:
+            broker.clients[self] = topics
+        try:
+            for line in self.rfile:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                op = message.get("op")
+                if op == "sub":
+                    topics.add(message.get("topic"))
+                elif op == "pub":
+                    broker.fan_out(message.get("topic"), line)
+        except OSError:
+            pass
+        finally:
+            with broker.lock:
+                broker.clients.pop(self, None)
+
+    def send(self, line: bytes):
+        try:
+            with self.send_lock:
+                self.wfile.write(line)
+                self.wfile.flush()
+        except OSError:
+            pass
+
+
+class _Broker(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, _BrokerHandler)
+        self.lock = threading.Lock()
+        self.clients = {}
+
+    def fan_out(self, topic: str, line: bytes):
+        if not line.endswith(b"\n"):
+            line += b"\n"
+        with self.lock:
+            targets = [client for client, topics in self.clients.items() if topic in topics]
+        for client in targets:
+            client.send(line)
+
+
+class SocketBackend(InMemoryBackend):
+    """
+    Cross-process fan-out through a local broker. Local subscriptions are fed
+    from the broker connection (the broker echoes our own publishes back), and
+    fall back to in-process delivery while the broker is unreachable.
+    """
+
+    def __init__(self, host: str, port: int, start_broker: bool = True):
+        """
+        Args:
+            host, port: Broker address
+            start_broker: Host the broker in this process if none is reachable
+        """
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.start_broker = start_broker
+        self._sock = None
+        self._send_lock = threading.Lock()
+        self._last_attempt = 0.0
+        self._broker = None
+        if not self._connect():
+            print(f"⚠️ No event broker on {self.host}:{self.port} - events stay in this process, "
+                  f"other pages reread DynamoDB every {agent_settings.EVENT_FALLBACK_POLL_SECONDS:.0f}s")
+
+    def _start_broker(self):
+        try:
+            self._broker = _Broker((self.host, self.port))
+        except OSError:
+            return False  # Another process owns the port
+        threading.Thread(target=self._broker.serve_forever, name="event-broker", daemon=True).start()
+        print(f"📡 Event broker listening on {self.host}:{self.port}")
+        return True
+
+    def _connect(self) -> bool:
+        self._last_attempt = time.time()
+        for attempt in range(2):
+            try:
+                sock = socket.create_connection((self.host, self.port), timeout=1)
+                break
+            except OSError:
+                if attempt or not self.start_broker or not self._start_broker():
+                    return False
+        sock.settimeout(None)
+        with self._lock:
+            topics = [topic for topic, subs in self._subscriptions.items() if subs]
+        self._sock = sock
+        for topic in topics:
+            self._send({"op": "sub", "topic": topic})
+        threading.Thread(target=self._read_loop, args=(sock,), name="event-bus-reader", daemon=True).start()
+        return True
+
+    def _ensure_connected(self) -> bool:
+        if self._sock:
+            return True
+        if time.time() - self._last_attempt < _RECONNECT_INTERVAL_SECONDS:
+            return False
+        return self._connect()
+
+    def _send(self, message: dict) -> bool:
+        sock = self._sock
+        if not sock:
+            return False
+        line = (json.dumps(message, default=str) + "\n").encode("utf-8")
+        try:
+            with self._send_lock:
+                sock.sendall(line)
+            return True
+        except OSError:
+            self._drop(sock)
+            return False
+
+    def _drop(self, sock):
+        if self._sock is sock:
+            self._sock = None
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+    def _read_loop(self, sock):
+        try:
+            for line in sock.makefile("rb"):
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                self._dispatch(message.get("topic"), message.get("event", {}))
+        except OSError:
+            pass
+        finally:
+            print("⚠️ Event broker connection lost")
+            self._drop(sock)
+
+    def subscribe(self, topic: str) -> Subscription:
+        subscription = super().subscribe(topic)
+        if self._ensure_connected():
+            self._send({"op": "sub", "topic": topic})
+        return subscription
+
+    def publish(self, topic: str, event: dict):
+        if self._ensure_connected() and self._send({"op": "pub", "topic": topic, "event": event}):
+            return
+        self._dispatch(topic, event)
+
+
+class EventBus:
+    """Publish/subscribe session events by room topic"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def publish(self, event_type: str, session_id: str = None, room_id: str = None, **data):
+        """
+        Push an event to every subscriber of the room
+
+        Args:
+            event_type: One of the EVENT_* constants
+            session_id: Session the event belongs to
+            room_id: Room topic (defaults to agent_settings.CHILD_ROOM_ID)
+            **data: JSON-serialisable payload
+        """
+        event = {"type": event_type, "session_id": session_id, "ts": time.time(), **data}
+        try:
+            self.backend.publish(room_id or agent_settings.CHILD_ROOM_ID, event)
+        except Exception as e:
+            # Events are best-effort; DynamoDB already holds the data
+            print(f"⚠️ Event publish failed: {e}")
+
+    def subscribe(self, room_id: str = None) -> Subscription:
+        return self.backend.subscribe(room_id or agent_settings.CHILD_ROOM_ID)
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> EventBus:
+    """Process-wide event bus for the configured backend"""
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                if agent_settings.EVENT_BUS_BACKEND == "socket":
+                    backend = SocketBackend(
+                        agent_settings.EVENT_BUS_HOST,
+                        agent_settings.EVENT_BUS_PORT,
+                        start_broker=agent_settings.EVENT_BUS_START_BROKER
+                    )
+                else:
+                    backend = InMemoryBackend()
+                _bus = EventBus(backend)
+    return _bus
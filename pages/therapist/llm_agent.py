@@ -3,22 +3,24 @@ Language Screening Agent with Picture Description Support
 UPDATED: Includes picture prompt feature for eliciting descriptive language
 """
 
-from langchain.chat_models import ChatOpenAI
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_openai import ChatOpenAI
 import agent_settings
 import time
 import json
-from emotion_display_handler import EmotionDisplayHandler
-from emotion_reader import EmotionReader
 from picture_handler import PictureHandler
+from conversation_memory import ConversationMemory
+from resources import get_resource
+from sentence_stream import SpeechChunker
+from turn_output import bind_structured, parse_turn, VALID_ROBOT_ACTIONS
+from text_classifier import detect_command, child_emotion, question_type
 
 class LanguageScreeningAgent:
     """Conversational agent for language screening with clinical tracking, robot actions, and emotion display"""
     
     def __init__(self):
-        # Load system prompt
-        with open(agent_settings.SYSTEM_PROMPT_PATH, "r", encoding="utf-8") as f:
-            self.system_prompt = f.read()
+        # System prompt (read once per process) and the shared prompt layout built on it
+        self.system_prompt = get_resource("system_prompt")
+        self.prompt_assembler = get_resource("prompt_assembler")
         
         # Initialize LLM
         self.llm = ChatOpenAI(
@@ -26,22 +28,25 @@ class LanguageScreeningAgent:
             model=agent_settings.OPENAI_MODEL,
             temperature=agent_settings.TEMPERATURE
         )
-        
-        # Initialize emotion display handler
-        try:
-            self.emotion_handler = EmotionDisplayHandler()
-        except Exception as e:
-            print(f"⚠️ Warning: Could not initialize emotion handler: {e}")
-            self.emotion_handler = None
-        
-        # Initialize emotion reader for database
-        self.emotion_reader = EmotionReader()
+        # Replies as TurnOutput function calls (None = legacy ROBOT_ACTION text)
+        self.structured_llm = None
+        if agent_settings.STRUCTURED_TURN_OUTPUT:
+            try:
+                self.structured_llm = bind_structured(self.llm)
+            except Exception as e:
+                print(f"⚠️ Structured turn output unavailable, using ROBOT_ACTION text replies: {e}")
+        
+        # Shared emotion display handler and emotion table reader (stateless, one per process)
+        self.emotion_handler = get_resource("emotion_display")
+        self.emotion_reader = get_resource("emotion_reader")
 
-        # NEW: Initialize picture handler
+        # Picture handler tracks pictures shown in this session, so each agent has its own
         self.picture_handler = PictureHandler()
         
         # Conversation tracking
         self.messages = []
+        # Older turns are summarised in the background; prompts carry summary + recent turns
+        self.memory = ConversationMemory(get_resource("summary_llm") if agent_settings.MEMORY_ENABLED else None)
         self.child_responses = []  # Track child responses for picture timing
         self.last_response_time = None
         self.conversation_turn = 0
@@ -83,36 +88,15 @@ class LanguageScreeningAgent:
         Returns:
             dict with 'is_command', 'action', 'original_text'
         """
-        user_lower = user_input.lower().strip()
-        
-        # Define command patterns
-        command_patterns = {
-            'bow': ['bow', 'take a bow'],
-            'handshake': ['handshake', 'shake hands', 'shake hand', 'give me five', 'high five'],
-            'wave': ['wave', 'say hi', 'say hello', 'wave hello'],
-            'jump': ['jump', 'jump up'],
-            'jump_forward': ['jump forward', 'hop forward'],
-            'jump_backward': ['jump backward', 'jump back', 'hop back'],
-            'twist': ['twist', 'dance', 'wiggle'],
-            'sit': ['sit', 'sit down'],
-            'stay_low': ['stay low', 'crouch', 'get low', 'go down'],
-            'push_up': ['push up', 'pushup', 'do pushups', 'exercise'],
-            'dig': ['dig', 'scratch'],
-            'scared': ['be scared', 'act scared', 'shiver'],
-            'sleep': ['sleep', 'go to sleep', 'take a nap'],
-            'steady': ['stand up', 'steady', 'balance']
-        }
-        
-        # Check if input matches any command
-        for action, patterns in command_patterns.items():
-            for pattern in patterns:
-                if pattern in user_lower:
-                    print(f"🎯 Child command detected: '{user_input}' → {action}")
-                    return {
-                        'is_command': True,
-                        'action': action,
-                        'original_text': user_input
-                    }
+        action = detect_command(user_input)
+        if action:
+            if agent_settings.VERBOSE_TRACE:
+                print(f"🎯 Child command detected: '{user_input}' → {action}")
+            return {
+                'is_command': True,
+                'action': action,
+                'original_text': user_input
+            }
         
         return {
             'is_command': False,
@@ -191,62 +175,26 @@ IMPORTANT: Adapt your response based on the child's emotional state. Be empathet
         # Get emotion context from database
         emotion_context = self.get_current_emotion_context()
         
-        # ===== STRENGTHEN THE PROMPT =====
-        greeting_prompt = """Start the screening conversation. Greet the child warmly and ask their name.
-
-    CRITICAL: You MUST include a robot action using ONLY these valid actions:
-    bow, handshake, wave, jump, jump_forward, jump_backward, twist, sit, stay_low, push_up, dig, scared, sleep, steady
-
-    For the greeting, use 'wave' or 'bow'.
-
-    DO NOT use: smile, nod, laugh, clap - these actions DO NOT EXIST in the robot.
-
-    Format:
-    Your greeting text.
-
-    ROBOT_ACTION: {"action": "wave", "reason": "greeting the child"}
-
-    This is MANDATORY."""
-        # ===== END STRENGTHENED PROMPT =====
-        
-        # Add emotion context if available
-        if emotion_context:
-            greeting_prompt += emotion_context
-        
-        response = self.llm.invoke([
-            SystemMessage(content=self.system_prompt),
-            HumanMessage(content=greeting_prompt)
-        ])
-        
-        greeting = response.content
-        
-        print(f"🤖 LLM Response (raw): {greeting[:200]}...")
+        # Action list and format are in the standing rules of the system prefix
+        greeting_prompt = ("Start the screening conversation. Greet the child warmly and ask their name. "
+                           "For the greeting, use the 'wave' or 'bow' robot action.")
         
-        # Extract robot action if present
-        robot_action = self._extract_robot_action(greeting)
-        clean_text = self._clean_robot_action_from_text(greeting)
+        llm_messages, _ = self.prompt_assembler.assemble([], [greeting_prompt, emotion_context])
         
-        print(f"🧹 Cleaned text: {clean_text[:100]}...")
-        print(f"🎯 Robot action: {robot_action}")
-        
-        # MANDATORY: Ensure we have a greeting action
-        if not robot_action:
-            print(f"⚠️ WARNING: LLM did not provide robot action. Using default 'wave'")
-            robot_action = {
+        turn_output = self._invoke_structured(llm_messages)
+        if turn_output:
+            clean_text = turn_output.text.strip()
+            robot_action = {"action": turn_output.action, "reason": turn_output.reason}
+        else:
+            greeting = self.llm.invoke(llm_messages).content
+            print(f"🤖 LLM Response (raw): {greeting[:200]}...")
+            clean_text, robot_action = self._parse_text_reply(greeting, {
                 "action": "wave",
                 "reason": "greeting the child for first time (fallback)"
-            }
+            })
         
-        # Validate that clean_text is not empty
-        if not clean_text or clean_text.strip() == "":
-            print(f"⚠️ WARNING: Cleaned text is empty! Using raw response.")
-            clean_text = greeting.replace("ROBOT_ACTION:", "").strip()
-            if "{" in clean_text:
-                json_start = clean_text.find("{")
-                json_end = clean_text.find("}", json_start)
-                if json_end != -1:
-                    clean_text = clean_text[:json_start].strip() + " " + clean_text[json_end+1:].strip()
-            clean_text = clean_text.strip()
+        print(f"🧹 Cleaned text: {clean_text[:100]}...")
+        print(f"🎯 Robot action: {robot_action}")
         
         # Select emotion display
         emotion = self._select_emotion_display(clean_text, robot_action, None)
@@ -262,7 +210,7 @@ IMPORTANT: Adapt your response based on the child's emotional state. Be empathet
             "picture": None
         }
     
-    def chat(self, user_input: str, response_time: float = None) -> dict:
+    def chat(self, user_input: str, response_time: float = None, emotion_context: str = None) -> dict:
         """
         Process user input and return agent response with robot action and emotion
         UPDATED: Includes emotion context from database
@@ -270,10 +218,114 @@ IMPORTANT: Adapt your response based on the child's emotional state. Be empathet
         Args:
             user_input: Child's response
             response_time: Time taken for child to respond (seconds)
+            emotion_context: Prefetched get_current_emotion_context() result (fetched here if None)
             
         Returns:
             dict with 'response', 'response_time', 'robot_action', 'detected_emotion', 'emotion', 'is_child_command'
         """
+        turn = self._prepare_turn(user_input, response_time, emotion_context)
+        if 'result' in turn:
+            return turn['result']
+        
+        turn_output = self._invoke_structured(turn['llm_messages'])
+        if turn_output:
+            return self._complete_turn(None, turn, turn_output=turn_output)
+        
+        # Legacy free-text reply (or structured call failed)
+        response = self.llm.invoke(turn['llm_messages'])
+        return self._complete_turn(response.content, turn)
+    
+    def chat_stream(self, user_input: str, response_time: float = None,
+                    on_sentence=None, on_robot_action=None, emotion_context: str = None) -> dict:
+        """
+        Streaming variant of chat(): consumes LLM tokens as they arrive
+        
+        Args:
+            user_input: Child's response
+            response_time: Time taken for child to respond (seconds)
+            on_sentence: Called with each speakable sentence as soon as it is complete
+                         (ROBOT_ACTION JSON stripped), while later tokens are still generating
+            on_robot_action: Called with the robot action dict as soon as its JSON has streamed
+            emotion_context: Prefetched get_current_emotion_context() result (fetched here if None)
+            
+        Returns:
+            Same dict as chat(); 'response' is exactly the text passed to on_sentence
+        """
+        turn = self._prepare_turn(user_input, response_time, emotion_context)
+        if 'result' in turn:
+            result = turn['result']
+            if on_sentence:
+                on_sentence(result['response'])
+            if on_robot_action:
+                on_robot_action(result['robot_action'])
+            return result
+        
+        chunker = SpeechChunker()
+        spoken = []
+        
+        def _emit(sentences):
+            for sentence in sentences:
+                spoken.append(sentence)
+                if on_sentence:
+                    on_sentence(sentence)
+        
+        if self.structured_llm:
+            turn_output = None
+            partial = None
+            spoken_chars = 0
+            action_sent = False
+            try:
+                # Each item is the function arguments parsed so far; 'text' only ever grows
+                for partial in self.structured_llm.stream(turn['llm_messages']):
+                    if not isinstance(partial, dict):
+                        continue
+                    # Keys arrive in generation order (any order): a value is final
+                    # once a later key has started ("jump" may still become "jump_forward")
+                    complete = set(list(partial)[:-1])
+                    if not action_sent and {'action', 'reason'} <= complete:
+                        action_sent = True
+                        if on_robot_action and partial['action'] in VALID_ROBOT_ACTIONS:
+                            on_robot_action({"action": partial['action'], "reason": partial['reason']})
+                    text = partial.get('text') or ""
+                    if len(text) > spoken_chars:
+                        _emit(chunker.feed(text[spoken_chars:]))
+                        spoken_chars = len(text)
+                turn_output = parse_turn(partial)
+                # Action or reason generated last: send it now that the stream is complete
+                if not action_sent and turn_output:
+                    action_sent = True
+                    if on_robot_action:
+                        on_robot_action({"action": turn_output.action, "reason": turn_output.reason})
+            except Exception as e:
+                print(f"❌ Structured streaming failed: {e}")
+            _emit(chunker.close())
+            
+            if turn_output:
+                return self._complete_turn(None, turn, spoken_text=" ".join(spoken), turn_output=turn_output)
+            if spoken:
+                return self._complete_turn(chunker.raw_text, turn, spoken_text=" ".join(spoken))
+            chunker = SpeechChunker()  # Nothing spoken yet: retry as a legacy free-text reply
+        
+        for chunk in self.llm.stream(turn['llm_messages']):
+            _emit(chunker.feed(chunk.content or ""))
+            
+            action_text = chunker.pop_action()
+            if action_text and on_robot_action:
+                robot_action = self._extract_robot_action(action_text)
+                if robot_action:
+                    on_robot_action(robot_action)
+        _emit(chunker.close())
+        
+        return self._complete_turn(chunker.raw_text, turn, spoken_text=" ".join(spoken))
+    
+    def _prepare_turn(self, user_input: str, response_time: float = None, emotion_context: str = None) -> dict:
+        """
+        Everything before the LLM call: command detection, history, picture and instructions
+        
+        Returns:
+            {'result': ...} for a direct robot command (no LLM call needed),
+            otherwise the LLM messages and per-turn context for _complete_turn
+        """
         # FIRST: Check if child is giving a robot command
         command_result = self.detect_child_robot_command(user_input)
         
@@ -316,7 +368,7 @@ IMPORTANT: Adapt your response based on the child's emotional state. Be empathet
             # Select emotion (excited/happy for commands)
             emotion = "surprise"  # Robot is excited to perform
             
-            return {
+            return {"result": {
                 "response": response_text,
                 "response_time": response_time,
                 "robot_action": robot_action,
@@ -324,7 +376,7 @@ IMPORTANT: Adapt your response based on the child's emotional state. Be empathet
                 "emotion": emotion,
                 "picture": None,
                 "is_child_command": True
-            }
+            }}
         
         # NORMAL CONVERSATION FLOW (not a command)
         # Detect emotion from response
@@ -357,19 +409,13 @@ IMPORTANT: Adapt your response based on the child's emotional state. Be empathet
                 picture_to_show = picture_info
                 self.current_picture_active = True
                 self.picture_followups_count = 0
+                self.memory.note_picture(picture_info['filename'])
                 print(f"🖼️ Showing picture: {picture_info['filename']}")
         else:
             print(f"   ❌ Not showing picture yet")
         
-        # Build conversation context
-        llm_messages = [SystemMessage(content=self.system_prompt)]
-        
-        # Add conversation history (last 20 messages)
-        for msg in self.messages[-20:]:
-            if msg["role"] == "user":
-                llm_messages.append(HumanMessage(content=msg["content"]))
-            else:
-                llm_messages.append(AIMessage(content=msg["content"]))
+        # Per-turn notes; the assembler sends them as one message after the history
+        notes = []
 
         # Add picture context if showing one
         if picture_to_show:
@@ -385,7 +431,7 @@ Introduce the picture naturally and ask the child to describe what they see. Use
 
 Your response should be something like: "{picture_prompt}"
 """
-            llm_messages.append(HumanMessage(content=picture_instruction))
+            notes.append(picture_instruction)
             self.question_types_used['picture'] += 1
         
         # Handle follow-ups for active picture
@@ -400,87 +446,77 @@ Some suggestions: {', '.join(followup_prompts[:3])}
 
 This is follow-up #{self.picture_followups_count}. After 2-3 exchanges, transition to a new topic.
 """
-                llm_messages.append(HumanMessage(content=followup_instruction))
+                notes.append(followup_instruction)
             else:
                 # End picture task
                 self.current_picture_active = False
                 transition_instruction = "The child has described the picture well. Praise them and smoothly transition to a new conversational topic. The picture will be removed."
-                llm_messages.append(HumanMessage(content=transition_instruction))
+                notes.append(transition_instruction)
         
         
         # Add instruction for question variety
         instruction = self._get_next_question_instruction()
         if instruction and not picture_to_show:
-            llm_messages.append(HumanMessage(content=instruction))
+            notes.append(instruction)
         
         # Add detected emotion from child's speech
         if detected_emotion != 'neutral':
             emotion_instruction = f"Note: The child seems {detected_emotion}. Adjust your response accordingly."
-            llm_messages.append(HumanMessage(content=emotion_instruction))
+            notes.append(emotion_instruction)
         
-        # NEW: Add real-time emotion context from database
-        emotion_context = self.get_current_emotion_context()
+        # NEW: Add real-time emotion context from database (unless prefetched by the caller)
+        if emotion_context is None:
+            emotion_context = self.get_current_emotion_context()
         if emotion_context:
-            llm_messages.append(HumanMessage(content=emotion_context))
+            notes.append(emotion_context)
         
-        # Prevent repetitive robot actions
+        # Prevent repetitive robot actions (the valid list is in the standing rules)
         if self.last_robot_action:
             last_action_name = self.last_robot_action.get('action')
-            # ===== STRENGTHEN THIS SECTION =====
-            repetition_warning = f"""CRITICAL REQUIREMENT: 
-
-        You just used '{last_action_name}'. Choose a DIFFERENT action from this list:
-        bow, handshake, wave, jump, jump_forward, jump_backward, twist, sit, stay_low, push_up, dig, scared, sleep, steady
-
-        DO NOT use: smile, nod, laugh, clap, turn, look - THESE DO NOT EXIST!
-
-        Format:
-        Your response text.
-
-        ROBOT_ACTION: {{"action": "different_valid_action", "reason": "explanation"}}"""
-            # ===== END STRENGTHENED SECTION =====
-            llm_messages.append(HumanMessage(content=repetition_warning))
-        else:
-            # ===== ADD VALIDATION HERE TOO =====
-            mandatory_action = """CRITICAL: Include a robot action from this list ONLY:
-        bow, handshake, wave, jump, jump_forward, jump_backward, twist, sit, stay_low, push_up, dig, scared, sleep, steady
-
-        DO NOT invent actions like "smile" or "nod" - they don't exist!
-
-        Format: ROBOT_ACTION: {"action": "valid_action", "reason": "reason"}"""
-            # ===== END VALIDATION =====
-            # Emphasize mandatory robot action
-            llm_messages.append(HumanMessage(content="MANDATORY: Include a robot action in your response."))
+            notes.append(f"You just used the '{last_action_name}' robot action. Choose a DIFFERENT valid action.")
         
-        # Get response
-        response = self.llm.invoke(llm_messages)
-        agent_response = response.content
-        
-        # Track question type
-        self._track_question_type(agent_response)
+        # Read the offset before the summary: a summary landing in between only repeats turns
+        summarized_upto = self.memory.summarized_upto
+        llm_messages, _ = self.prompt_assembler.assemble(
+            self.messages, notes, memory=self.memory.context(), start=summarized_upto
+        )
         
-        # Extract robot action
-        robot_action = self._extract_robot_action(agent_response)
-        clean_text = self._clean_robot_action_from_text(agent_response)
+        return {
+            "llm_messages": llm_messages,
+            "response_time": response_time,
+            "detected_emotion": detected_emotion,
+            "picture": picture_to_show
+        }
+    
+    def _complete_turn(self, agent_response: str, turn: dict, spoken_text: str = None, turn_output=None) -> dict:
+        """
+        Everything after the LLM call: robot action, cleanup, emotion and history
         
-        # MANDATORY: Ensure robot action exists
-        if not robot_action:
-            print(f"⚠️ WARNING: LLM did not provide robot action. Using fallback 'steady'")
-            robot_action = {
+        Args:
+            agent_response: Raw LLM output (including the ROBOT_ACTION block); unused with turn_output
+            turn: Context returned by _prepare_turn
+            spoken_text: Text already spoken in streaming mode (used as the response)
+            turn_output: Structured reply (TurnOutput) in structured mode
+        """
+        response_time = turn['response_time']
+        detected_emotion = turn['detected_emotion']
+        picture_to_show = turn['picture']
+        
+        if turn_output:
+            clean_text = turn_output.text.strip()
+            robot_action = {"action": turn_output.action, "reason": turn_output.reason}
+            if turn_output.question_type in self.question_types_used:
+                self.question_types_used[turn_output.question_type] += 1
+        else:
+            self._track_question_type(agent_response)
+            clean_text, robot_action = self._parse_text_reply(agent_response, {
                 "action": "steady",
                 "reason": "maintaining engagement (fallback)"
-            }
+            })
         
-        # Validate clean_text is not empty
-        if not clean_text or clean_text.strip() == "":
-            print(f"⚠️ WARNING: Cleaned text is empty in chat! Using raw response.")
-            clean_text = agent_response.replace("ROBOT_ACTION:", "").strip()
-            if "{" in clean_text:
-                json_start = clean_text.find("{")
-                json_end = clean_text.find("}", json_start)
-                if json_end != -1:
-                    clean_text = clean_text[:json_start].strip() + " " + clean_text[json_end+1:].strip()
-            clean_text = clean_text.strip()
+        # In streaming mode the child already heard the sentences; keep history identical
+        if spoken_text and spoken_text.strip():
+            clean_text = spoken_text.strip()
         
         # Select emotion display
         emotion = self._select_emotion_display(clean_text, robot_action, detected_emotion)
@@ -498,6 +534,7 @@ This is follow-up #{self.picture_followups_count}. After 2-3 exchanges, transiti
         self.messages.append({"role": "assistant", "content": clean_text})
         self.last_response_time = time.time()
         self.conversation_turn += 1 
+        self.memory.update_async(self.messages)
         return {
             "response": clean_text,
             "response_time": response_time,
@@ -543,33 +580,54 @@ This is follow-up #{self.picture_followups_count}. After 2-3 exchanges, transiti
         Returns:
             Detected emotion string
         """
-        text_lower = text.lower()
-        
-        # Happy indicators
-        if any(word in text_lower for word in ['yay', 'happy', 'love', 'fun', 'great', 'awesome', 'cool', 'yes!', 'yeah!']):
-            return 'happy'
-        
-        # Excited indicators
-        if any(word in text_lower for word in ['wow', 'amazing', 'exciting']) or text.count('!') >= 2:
-            return 'excited'
+        return child_emotion(text)
+    
+    def _invoke_structured(self, llm_messages: list):
+        """
+        One structured LLM call
         
-        # Sad indicators
-        if any(word in text_lower for word in ['sad', 'cry', 'bad', 'don\'t like', 'hate', 'no']):
-            return 'sad'
+        Returns:
+            TurnOutput, or None in legacy mode or if the call or validation failed
+        """
+        if not self.structured_llm:
+            return None
+        try:
+            return parse_turn(self.structured_llm.invoke(llm_messages))
+        except Exception as e:
+            print(f"❌ Structured LLM call failed, using text reply: {e}")
+            return None
+    
+    def _parse_text_reply(self, text: str, fallback_action: dict) -> tuple:
+        """
+        Split a legacy free-text reply into spoken text and its ROBOT_ACTION
         
-        # Shy/uncertain indicators
-        if any(word in text_lower for word in ['maybe', 'i don\'t know', 'um', 'uh', 'dunno']):
-            return 'shy'
+        Args:
+            text: Raw LLM output
+            fallback_action: Used when the reply has no valid robot action
+            
+        Returns:
+            (clean_text, robot_action)
+        """
+        robot_action = self._extract_robot_action(text)
+        clean_text = self._clean_robot_action_from_text(text)
         
-        # Engaged/thoughtful
-        if len(text.split()) > 10:
-            return 'engaged'
+        # MANDATORY: Ensure robot action exists
+        if not robot_action:
+            print(f"⚠️ WARNING: LLM did not provide robot action. Using fallback '{fallback_action['action']}'")
+            robot_action = fallback_action
         
-        # Short responses might indicate disengagement
-        if len(text.split()) <= 2:
-            return 'disengaged'
+        # Validate clean_text is not empty
+        if not clean_text or clean_text.strip() == "":
+            print(f"⚠️ WARNING: Cleaned text is empty! Using raw response.")
+            clean_text = text.replace("ROBOT_ACTION:", "").strip()
+            if "{" in clean_text:
+                json_start = clean_text.find("{")
+                json_end = clean_text.find("}", json_start)
+                if json_end != -1:
+                    clean_text = clean_text[:json_start].strip() + " " + clean_text[json_end+1:].strip()
+            clean_text = clean_text.strip()
         
-        return 'neutral'
+        return clean_text, robot_action
     
     def _extract_robot_action(self, text: str) -> dict:
         try:
@@ -638,13 +696,6 @@ This is follow-up #{self.picture_followups_count}. After 2-3 exchanges, transiti
     
     def _track_question_type(self, response: str):
         """Simple heuristic to track question variety"""
-        lower = response.lower()
-        
-        if any(word in lower for word in ['what', 'how', 'why', 'tell me']):
-            self.question_types_used['open'] += 1
-        elif ' or ' in lower and '?' in response:
-            self.question_types_used['choice'] += 1
-        elif any(word in lower for word in ['describe', 'explain', 'what does', 'look like']):
-            self.question_types_used['descriptive'] += 1
-        elif '?' in response:
-            self.question_types_used['closed'] += 1
\ No newline at end of file
+        kind = question_type(response)
+        if kind:
+            self.question_types_used[kind] += 1
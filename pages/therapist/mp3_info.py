@@ -0,0 +1,126 @@
+"""
+Exact MP3 duration from frame headers (no decoding, no external tools)
+
+Reads the frame count from the Xing/Info header when present (VBR), otherwise
+walks every frame and sums its samples, so the result is exact for CBR and VBR
+streams alike. The Xing/Info frame itself is silent metadata and is never counted.
+"""
+
+# Bitrates in kbps by [version group][layer]
+_BITRATES = {
+    ('1', 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    ('1', 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    ('1', 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    ('2', 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    ('2', 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    ('2', 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG-1
+    2: (22050, 24000, 16000),  # MPEG-2
+    0: (11025, 12000, 8000),   # MPEG-2.5
+}
+_LAYERS = {3: 1, 2: 2, 1: 3}   # header bits -> layer number
+
+
+def _parse_header(data: bytes, offset: int):
+    """
+    Decode the 4-byte frame header at offset
+
+    Returns:
+        (frame_length, samples_per_frame, sample_rate, version_bits, mono), or None if invalid
+    """
+    if offset + 4 > len(data) or data[offset] != 0xFF or (data[offset + 1] & 0xE0) != 0xE0:
+        return None
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    version_bits = (b1 >> 3) & 0x03
+    layer = _LAYERS.get((b1 >> 1) & 0x03)
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0x03
+    if version_bits == 1 or layer is None or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    group = '1' if version_bits == 3 else '2'
+    bitrate = _BITRATES[(group, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version_bits][rate_index]
+    padding = (b2 >> 1) & 0x01
+
+    if layer == 1:
+        samples = 384
+        frame_length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 1152 if (layer == 2 or group == '1') else 576
+        frame_length = samples // 8 * bitrate // sample_rate + padding
+    return frame_length, samples, sample_rate, version_bits, (b3 >> 6) == 3
+
+
+def _skip_id3(data: bytes) -> int:
+    if len(data) >= 10 and data[:3] == b"ID3":
+        size = (data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F)
+        footer = 10 if data[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+
+def _xing_tag(data: bytes, offset: int, version_bits: int, mono: bool):
+    """
+    Look for a Xing/Info header in the first frame
+
+    Returns:
+        (is_tag_frame, audio frame count or None if the header does not carry one)
+    """
+    if version_bits == 3:
+        side_info = 17 if mono else 32
+    else:
+        side_info = 9 if mono else 17
+    tag = offset + 4 + side_info
+    if data[tag:tag + 4] not in (b"Xing", b"Info"):
+        return False, None
+    if len(data) < tag + 12:
+        return True, None
+    flags = int.from_bytes(data[tag + 4:tag + 8], "big")
+    if not flags & 0x01:
+        return True, None
+    return True, int.from_bytes(data[tag + 8:tag + 12], "big")
+
+
+def mp3_duration(data: bytes) -> float:
+    """
+    Playback length of an MP3 stream in seconds
+
+    Args:
+        data: Complete MP3 file contents
+
+    Returns:
+        Duration in seconds (0.0 if no valid frame is found)
+    """
+    if not data:
+        return 0.0
+
+    offset = _skip_id3(data)
+    # Find the first frame (tolerate junk before it)
+    while offset < len(data) - 4 and _parse_header(data, offset) is None:
+        offset += 1
+    first = _parse_header(data, offset)
+    if first is None:
+        return 0.0
+
+    frame_length, samples, sample_rate, version_bits, mono = first
+    is_tag_frame, frames = _xing_tag(data, offset, version_bits, mono)
+    if frames is not None:
+        return frames * samples / sample_rate
+    if is_tag_frame:
+        # Info frame without a frame count (common for CBR): skip it and count the audio frames
+        offset += frame_length
+
+    total_seconds = 0.0
+    while True:
+        header = _parse_header(data, offset)
+        if header is None:
+            break
+        frame_length, samples, sample_rate = header[:3]
+        if frame_length <= 0 or offset + frame_length > len(data):
+            break
+        total_seconds += samples / sample_rate
+        offset += frame_length
+    return total_seconds
@@ -0,0 +1,215 @@
+"""
+Token-budgeted prompt assembly for LanguageScreeningAgent
+
+Every LLM call is laid out the same way:
+
+    1. System prefix   - system prompt + the standing robot-action rules (fixed per process)
+    2. Memory          - running summary and facts of older turns (conversation_memory.py)
+    3. History         - turns not yet summarised, trimmed from the front in blocks when over budget
+    4. Turn context    - one message with this turn's notes (picture, variety, emotion, ...)
+
+Parts of system-prompt.txt between <!-- LEGACY FORMAT --> and <!-- END LEGACY FORMAT -->
+describe the ROBOT_ACTION text format and its warnings; they are dropped in
+structured mode, where the TurnOutput schema replaces them (the markers
+themselves are always removed).
+
+The prefix is byte-identical across turns and sessions and history only grows at
+the end, so provider-side prompt caching can reuse everything up to the previous
+turn. Rules that used to be re-sent as a multi-line reminder on every turn live
+once in the prefix. Tokens are counted with tiktoken (a chars/4 estimate when it
+is unavailable) and each call logs what it saved against the old layout.
+"""
+
+import re
+import threading
+from functools import lru_cache
+
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+
+import agent_settings
+from turn_output import VALID_ROBOT_ACTIONS
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Chat format overhead per message, and for priming the reply (OpenAI cookbook)
+_TOKENS_PER_MESSAGE = 4
+_TOKENS_PER_REPLY = 3
+
+STANDING_RULES = f"""# STANDING RULES (apply to every response)
+- End EVERY response with exactly one robot action on its own line, after your message text:
+  ROBOT_ACTION: {{"action": "valid_action", "reason": "brief reason"}}
+- Valid actions (NO others exist): {', '.join(VALID_ROBOT_ACTIONS)}
+- DO NOT invent actions like smile, nod, laugh, clap, turn or look - they do not exist.
+- Never use the same action twice in a row; the turn context names the last one.
+- Follow any [TURN CONTEXT] message: it describes the current moment of the session."""
+
+# Structured mode (turn_output.py): the schema already constrains the action names
+STRUCTURED_RULES = """# STANDING RULES (apply to every response)
+- Answer ONLY by calling the TurnOutput function.
+- text: only the words spoken to the child; action: the robot action performed while speaking.
+- Never use the same action twice in a row; the turn context names the last one.
+- Follow any [TURN CONTEXT] message: it describes the current moment of the session."""
+
+_LEGACY_FORMAT_BLOCK = re.compile(r"<!-- LEGACY FORMAT -->\n.*?<!-- END LEGACY FORMAT -->\n?", re.S)
+_LEGACY_FORMAT_MARKER = re.compile(r"<!-- (?:END )?LEGACY FORMAT -->\n?")
+
+
+def prompt_for_mode(system_prompt: str, structured: bool) -> str:
+    """
+    System prompt for the reply format in use
+
+    Args:
+        system_prompt: Contents of system-prompt.txt
+        structured: Drop the ROBOT_ACTION format sections (TurnOutput replaces them)
+
+    Returns:
+        The prompt without the legacy-format markers
+    """
+    if structured:
+        system_prompt = _LEGACY_FORMAT_BLOCK.sub("", system_prompt)
+    return _LEGACY_FORMAT_MARKER.sub("", system_prompt)
+
+
+_encoding = None
+_encoding_lock = threading.Lock()
+_encoding_failed = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed and tiktoken is not None:
+        with _encoding_lock:
+            if _encoding is None and not _encoding_failed:
+                try:
+                    try:
+                        _encoding = tiktoken.encoding_for_model(agent_settings.OPENAI_MODEL)
+                    except KeyError:
+                        _encoding = tiktoken.get_encoding("o200k_base")
+                except Exception as e:
+                    # The BPE file is downloaded on first use; offline we estimate instead
+                    print(f"⚠️ tiktoken unavailable, estimating tokens: {e}")
+                    _encoding_failed = True
+    return _encoding
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """
+    Tokens in text for the configured model
+
+    Args:
+        text: Message content
+
+    Returns:
+        Token count (len/4 estimate if tiktoken cannot be used)
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _message_tokens(content: str) -> int:
+    return count_tokens(content) + _TOKENS_PER_MESSAGE
+
+
+class PromptAssembler:
+    """Builds LLM message lists with a stable prefix and a per-turn token budget"""
+
+    def __init__(self, system_prompt: str, structured: bool = False, budget: int = None,
+                 max_history: int = None, trim_step: int = None):
+        """
+        Args:
+            system_prompt: Contents of system-prompt.txt
+            structured: Replies come through the TurnOutput function instead of ROBOT_ACTION lines
+            budget: Maximum input tokens per call
+            max_history: Most history messages sent, before the budget applies
+            trim_step: History is dropped from the front in blocks of this many
+                       messages, so the cached prefix survives several turns
+        """
+        rules = STRUCTURED_RULES if structured else STANDING_RULES
+        self.prefix = f"{prompt_for_mode(system_prompt, structured).rstrip()}\n\n{rules}"
+        self.budget = budget or agent_settings.PROMPT_TOKEN_BUDGET
+        self.max_history = max_history or agent_settings.PROMPT_HISTORY_MAX_MESSAGES
+        self.trim_step = max(1, trim_step or agent_settings.PROMPT_HISTORY_TRIM_STEP)
+        self.prefix_tokens = _message_tokens(self.prefix)
+        # The old layout sent the bare system prompt and re-sent the action rules
+        # as an extra message on every turn
+        self._legacy_fixed_tokens = (_message_tokens(prompt_for_mode(system_prompt, False))
+                                     + _message_tokens(STANDING_RULES))
+
+    def _history_start(self, history: list, fixed_tokens: int) -> int:
+        """First history index to send (always keeps the latest message)"""
+        count = len(history)
+        if count == 0:
+            return 0
+        start = 0
+        if count > self.max_history:
+            overflow = count - self.max_history
+            start = -(-overflow // self.trim_step) * self.trim_step
+
+        tokens = fixed_tokens + sum(_message_tokens(m["content"]) for m in history[start:])
+        while tokens > self.budget and start < count - 1:
+            end = min(start + self.trim_step, count - 1)
+            tokens -= sum(_message_tokens(m["content"]) for m in history[start:end])
+            start = end
+        return min(start, count - 1)
+
+    def assemble(self, history: list, notes: list = None, memory: str = None, start: int = 0) -> tuple:
+        """
+        Build the messages for one LLM call
+
+        Args:
+            history: Agent messages ({'role': 'user'|'assistant', 'content': ...}), oldest first
+            notes: Per-turn instructions, sent together after the history
+            memory: Summary of the messages before start (ConversationMemory.context())
+            start: First history index not covered by memory
+
+        Returns:
+            (llm_messages, stats) where stats has 'tokens', 'prefix_tokens',
+            'history_sent', 'history_dropped' and 'saved_tokens'
+        """
+        notes = [note.strip() for note in (notes or []) if note and note.strip()]
+        context = "[TURN CONTEXT]\n" + "\n\n".join(notes) if notes else None
+        context_tokens = _message_tokens(context) if context else 0
+
+        memory_tokens = _message_tokens(memory) if memory else 0
+
+        fixed_tokens = self.prefix_tokens + memory_tokens + context_tokens + _TOKENS_PER_REPLY
+        start = min(start, max(len(history) - 1, 0))
+        start += self._history_start(history[start:], fixed_tokens)
+        window = history[start:]
+
+        llm_messages = [SystemMessage(content=self.prefix)]
+        if memory:
+            llm_messages.append(SystemMessage(content=memory))
+        for msg in window:
+            if msg["role"] == "user":
+                llm_messages.append(HumanMessage(content=msg["content"]))
+            else:
+                llm_messages.append(AIMessage(content=msg["content"]))
+        if context:
+            llm_messages.append(HumanMessage(content=context))
+
+        tokens = fixed_tokens + sum(_message_tokens(m["content"]) for m in window)
+
+        # Old layout: last 20 messages, one message per note, plus the repeated rule reminder
+        legacy_history = sum(_message_tokens(m["content"]) for m in history[-20:])
+        legacy_notes = sum(_message_tokens(note) for note in notes)
+        legacy_tokens = self._legacy_fixed_tokens + legacy_history + legacy_notes + _TOKENS_PER_REPLY
+
+        stats = {
+            'tokens': tokens,
+            'prefix_tokens': self.prefix_tokens,
+            'history_sent': len(window),
+            'history_dropped': start,
+            'saved_tokens': legacy_tokens - tokens
+        }
+        print(f"🧮 Prompt: {tokens} tokens ({self.prefix_tokens} cacheable prefix), "
+              f"{len(window)} history message(s), saved {stats['saved_tokens']} vs. old layout")
+        return llm_messages, stats
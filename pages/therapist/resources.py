@@ -0,0 +1,255 @@
+"""
+Process-wide service registry
+
+Heavy, thread-safe services (OpenAI audio client and TTS pool, DynamoDB handlers,
+robot controller, emotion handlers, the system prompt) are created once per
+process on first use and shared by every browser session. Sessions keep only
+references and their own lightweight state in st.session_state, so opening a
+tab is near-instant and memory stays flat as more therapists log in.
+
+Each service can have a health check (cached for HEALTH_CHECK_TTL_SECONDS) and a
+close hook; reset(name) closes a service so the next get() rebuilds it.
+"""
+
+import atexit
+import threading
+import time
+
+import agent_settings
+
+
+class _Service:
+    def __init__(self, name, factory, health_check=None, close=None):
+        self.name = name
+        self.factory = factory
+        self.health_check = health_check
+        self.close = close
+        self.lock = threading.Lock()
+        self.instance = None
+        self.created = False
+        self.created_at = None
+        self.last_health = None
+
+
+class ResourceRegistry:
+    """Lazily created, shared services with lifecycle and health checks"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._services = {}
+        atexit.register(self.close_all)
+
+    def register(self, name: str, factory, health_check=None, close=None):
+        """
+        Declare a service (nothing is built until the first get)
+
+        Args:
+            name: Service name
+            factory: Builds the instance
+            health_check: Callable(instance) -> (ok, detail); exceptions count as unhealthy
+            close: Callable(instance) run on reset/shutdown
+        """
+        with self._lock:
+            self._services[name] = _Service(name, factory, health_check, close)
+
+    def get(self, name: str):
+        """Shared instance of a service, built on first use"""
+        service = self._services[name]
+        if not service.created:
+            with service.lock:
+                if not service.created:
+                    start = time.time()
+                    service.instance = service.factory()
+                    service.created = True
+                    service.created_at = time.time()
+                    print(f"🧩 Resource '{name}' ready in {service.created_at - start:.2f}s")
+        return service.instance
+
+    def reset(self, name: str):
+        """Close a service; the next get() builds a fresh one"""
+        service = self._services[name]
+        with service.lock:
+            if service.created and service.close and service.instance is not None:
+                try:
+                    service.close(service.instance)
+                except Exception as e:
+                    print(f"⚠️ Closing resource '{name}' failed: {e}")
+            service.instance = None
+            service.created = False
+            service.last_health = None
+
+    def close_all(self):
+        for name in list(self._services):
+            self.reset(name)
+
+    def health(self, refresh: bool = False) -> dict:
+        """
+        Health of every service that has been built
+
+        Returns:
+            {name: {'ok': bool, 'detail': str, 'checked_at': float}}
+        """
+        report = {}
+        for name, service in list(self._services.items()):
+            if not service.created:
+                continue
+            cached = service.last_health
+            if cached and not refresh and time.time() - cached['checked_at'] < agent_settings.HEALTH_CHECK_TTL_SECONDS:
+                report[name] = cached
+                continue
+
+            ok, detail = True, "running"
+            if service.instance is None:
+                ok, detail = False, "disabled"
+            elif service.health_check:
+                try:
+                    ok, detail = service.health_check(service.instance)
+                except Exception as e:
+                    ok, detail = False, str(e)
+            service.last_health = {'ok': bool(ok), 'detail': detail, 'checked_at': time.time()}
+            report[name] = service.last_health
+        return report
+
+
+# ==================== SERVICES ====================
+
+def _build_audio():
+    from audio_handler import AudioHandler
+    audio_handler = AudioHandler()
+    # Once per process, not once per browser session
+    if agent_settings.ENABLE_TTS_CACHE:
+        print("🚀 Pre-loading common TTS phrases...")
+        audio_handler.preload_common_phrases()
+    return audio_handler
+
+
+def _audio_health(audio_handler):
+    stats = audio_handler.get_cache_stats()
+    return True, f"{stats['cached_phrases']} cached phrases"
+
+
+def _build_db(write_behind: bool):
+    def _factory():
+        from database_handler import DatabaseHandler
+        return DatabaseHandler(write_behind=write_behind)
+    return _factory
+
+
+def _db_health(db_handler):
+    if db_handler.sessions_table is None:
+        return False, "DynamoDB tables unavailable"
+    if db_handler.message_writer is not None:
+        return True, f"{db_handler.message_writer.pending_count()} message(s) pending"
+    return True, "connected"
+
+
+def _close_db(db_handler):
+    db_handler.flush_messages()
+
+
+def _build_robot():
+    if not agent_settings.ENABLE_ROBOT_ACTIONS:
+        return None
+    from robot_controller import RobotController, RobotDispatcher
+    return RobotDispatcher(RobotController()).start()
+
+
+def _robot_health(robot_dispatcher):
+    # Heartbeat result, so the health pane never waits on the robot
+    stats = robot_dispatcher.stats.summary()
+    latency = f", p95 {stats['p95_ms']} ms over {stats['sent']} command(s)" if stats['p95_ms'] is not None else ""
+    if robot_dispatcher.is_robot_available():
+        return True, f"reachable at {robot_dispatcher.base_url}{latency}"
+    return False, f"unreachable at {robot_dispatcher.base_url}"
+
+
+def _close_robot(robot_dispatcher):
+    robot_dispatcher.stop()
+
+
+def _build_emotion_display():
+    from emotion_display_handler import EmotionDisplayHandler
+    try:
+        return EmotionDisplayHandler()
+    except Exception as e:
+        print(f"⚠️ Warning: Could not initialize emotion handler: {e}")
+        return None
+
+
+def _build_emotion_reader():
+    from emotion_reader import EmotionReader
+    return EmotionReader()
+
+
+def _emotion_reader_health(emotion_reader):
+    if emotion_reader.emotion_table is None:
+        return False, "emotion table unavailable"
+    return True, "connected"
+
+
+def _build_agent_pool():
+    from agent_pool import AgentPool
+    pool = AgentPool(get_resource("audio"), size=agent_settings.AGENT_POOL_SIZE)
+    # Filled on the first prewarm event, not here: no LLM/TTS calls at process start
+    pool.listen()
+    return pool
+
+
+def _agent_pool_health(pool):
+    # An empty pool is normal until a child is selected; acquire() then builds on demand
+    return True, f"{pool.ready_count()}/{pool.size} warm agent(s)"
+
+
+def _load_system_prompt():
+    with open(agent_settings.SYSTEM_PROMPT_PATH, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _build_summary_llm():
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        api_key=agent_settings.OPENAI_API_KEY,
+        model=agent_settings.MEMORY_SUMMARY_MODEL,
+        temperature=0
+    )
+
+
+def _build_prompt_assembler():
+    from prompt_assembler import PromptAssembler
+    return PromptAssembler(get_resource("system_prompt"), structured=agent_settings.STRUCTURED_TURN_OUTPUT)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ResourceRegistry:
+    """Process-wide registry with the app's services declared"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                registry = ResourceRegistry()
+                registry.register("audio", _build_audio, health_check=_audio_health)
+                registry.register("db", _build_db(False), health_check=_db_health, close=_close_db)
+                # Child view: message writes go through the journaled write-behind queue
+                registry.register(
+                    "message_db",
+                    _build_db(agent_settings.MESSAGE_WRITE_BEHIND),
+                    health_check=_db_health,
+                    close=_close_db
+                )
+                registry.register("robot", _build_robot, health_check=_robot_health, close=_close_robot)
+                registry.register("emotion_display", _build_emotion_display)
+                registry.register("emotion_reader", _build_emotion_reader, health_check=_emotion_reader_health)
+                registry.register("system_prompt", _load_system_prompt)
+                registry.register("prompt_assembler", _build_prompt_assembler)
+                registry.register("summary_llm", _build_summary_llm)
+                registry.register("agent_pool", _build_agent_pool, health_check=_agent_pool_health)
+                _registry = registry
+    return _registry
+
+
+def get_resource(name: str):
+    """Shortcut for get_registry().get(name)"""
+    return get_registry().get(name)
@@ -2,17 +2,84 @@
 WaveGo Robot Controller
 Sends action commands to WaveGo robot based on LLM decisions
 Updated to include extended actions from ServoCtrl.h
+
+RobotController talks to the robot synchronously over a keep-alive HTTP
+session. RobotDispatcher wraps it for the conversation: commands go on a queue
+served by one background worker, a new gesture replaces the one still waiting
+(only the latest gesture matters, so at most one waits behind the one being
+sent), and a heartbeat keeps the robot's health cached, so a slow or offline
+robot never delays a turn.
 """
 
+import threading
+from collections import deque
+
 import requests
+from requests.adapters import HTTPAdapter
 import agent_settings
 from typing import Optional, Dict
 import time
 
 
+class LatencyStats:
+    """Rolling per-command latency and outcome counters"""
+
+    def __init__(self, window: int = 200):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.sent = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.skipped = 0
+
+    def record(self, seconds: float, ok: bool):
+        with self._lock:
+            self._latencies.append(seconds)
+            if ok:
+                self.sent += 1
+            else:
+                self.failed += 1
+
+    def count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def summary(self) -> Dict:
+        """
+        Returns:
+            dict with 'sent', 'failed', 'coalesced', 'skipped' and
+            'avg_ms', 'p95_ms', 'last_ms' (None before the first command)
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            last = self._latencies[-1] if self._latencies else None
+            summary = {
+                'sent': self.sent,
+                'failed': self.failed,
+                'coalesced': self.coalesced,
+                'skipped': self.skipped,
+                'avg_ms': None,
+                'p95_ms': None,
+                'last_ms': None
+            }
+        if latencies:
+            summary['avg_ms'] = round(sum(latencies) / len(latencies) * 1000, 1)
+            summary['p95_ms'] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1)
+            summary['last_ms'] = round(last * 1000, 1)
+        return summary
+
+
+def _keep_alive_session() -> requests.Session:
+    session = requests.Session()
+    # One robot, one connection: reuse it instead of a TCP handshake per gesture
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0)
+    session.mount("http://", adapter)
+    return session
+
+
 class RobotController:
     """Interface to control WaveGo robot actions"""
-    
+
     # Available robot actions mapped to funcMode values
     # Based on ServoCtrl.h and WebPage.h
     ROBOT_ACTIONS = {
@@ -31,72 +98,232 @@ class RobotController:
         'sleep': 13,        # Sleep/rest mode
         'scared': 14        # Scared/shivering animation
     }
-    
-    def __init__(self):
+
+    def __init__(self, base_url: str = None, timeout: float = None):
         """
         Initialize robot controller
-        
+
         Args:
-            : IP address of WaveGo robot (from config if not provided)
-            robot_port: Port number (default 80)
+            base_url: Robot address, e.g. "http://127.0.0.1:8080" for a local stub
+                      (default: agent_settings.ROBOT_IP / ROBOT_PORT)
+            timeout: Seconds to wait for each command
         """
         self.robot_ip = agent_settings.ROBOT_IP
         self.robot_port = agent_settings.ROBOT_PORT
-        self.base_url = f"http://{self.robot_ip}:{self.robot_port}"
+        self.base_url = (base_url or f"http://{self.robot_ip}:{self.robot_port}").rstrip('/')
+        self.timeout = timeout or agent_settings.ROBOT_COMMAND_TIMEOUT
         self.last_action = None
         self.last_action_time = None
-    
+        self.stats = LatencyStats()
+
+        # Commands and health probes run on different threads, so each gets its own session
+        self.session = _keep_alive_session()
+        self._probe_session = _keep_alive_session()
+
     def send_command(self, var: str, val: int, cmd: int = 0) -> bool:
         """
         Send control command to robot
         """
+        start = time.time()
+        ok = False
         try:
             url = f"{self.base_url}/control?var={var}&val={val}&cmd={cmd}"
-            response = requests.get(url, timeout=2)
-            
+            response = self.session.get(url, timeout=self.timeout)
+
             if response.status_code == 200:
-                print(f"✓ Robot command sent: {var}={val}")
-                return True
+                ok = True
+                print(f"✓ Robot command sent: {var}={val} ({(time.time() - start) * 1000:.0f} ms)")
             else:
                 print(f"✗ Robot command failed: {response.status_code}")
-                return False
-                
+
         except requests.exceptions.Timeout:
             print(f"✗ Robot command timeout")
-            return False
         except Exception as e:
             print(f"✗ Robot command error: {e}")
-            return False
-    
-    def perform_action(self, action_name: str) -> bool:
+
+        self.stats.record(time.time() - start, ok)
+        return ok
+
+    def normalize_action(self, action_name: str) -> Optional[str]:
         """
-        Perform a named action
+        Map an action name to a ROBOT_ACTIONS key
+
+        Returns:
+            The action name, or None if there is no such action
         """
         # Normalize input (e.g. "Jump Forward" -> "jump_forward")
-        action_name = action_name.lower().replace(' ', '_')
-        
+        action_name = (action_name or '').lower().replace(' ', '_')
+
         # Handle "digging" alias to "dig"
         if action_name == 'digging':
             action_name = 'dig'
-        
+
         if action_name not in self.ROBOT_ACTIONS:
             print(f"✗ Unknown action: {action_name}")
             print(f"Available actions: {list(self.ROBOT_ACTIONS.keys())}")
+            return None
+        return action_name
+
+    def perform_action(self, action_name: str) -> bool:
+        """
+        Perform a named action (blocks until the robot answers)
+        """
+        action_name = self.normalize_action(action_name)
+        if action_name is None:
             return False
-        
+
         func_mode = self.ROBOT_ACTIONS[action_name]
         success = self.send_command('funcMode', func_mode, 0)
-        
+
         if success:
             self.last_action = action_name
             self.last_action_time = time.time()
-        
+
         return success
-    
+
     def is_robot_available(self) -> bool:
         """Check if robot is reachable"""
         try:
-            response = requests.get(self.base_url, timeout=2)
+            response = self._probe_session.get(self.base_url, timeout=agent_settings.ROBOT_PING_TIMEOUT)
             return response.status_code == 200
-        except:
-            return False
\ No newline at end of file
+        except Exception:
+            return False
+
+    def close(self):
+        self.session.close()
+        self._probe_session.close()
+
+
+class RobotDispatcher:
+    """Non-blocking robot commands: coalescing queue, one worker, cached health"""
+
+    def __init__(self, controller: RobotController, heartbeat_seconds: float = None):
+        """
+        Args:
+            controller: Sends the commands
+            heartbeat_seconds: Health probe interval (0 disables the heartbeat)
+        """
+        self.controller = controller
+        self.heartbeat_seconds = (agent_settings.ROBOT_HEARTBEAT_SECONDS
+                                  if heartbeat_seconds is None else heartbeat_seconds)
+        self._cond = threading.Condition()
+        self._queue = deque(maxlen=1)   # (action_name, queued_at) waiting behind the one in flight
+        self._busy = False
+        self._stopped = False
+        self._healthy = None        # None until the first heartbeat
+        self._checked_at = None
+        self._worker = None
+        self._heartbeat = None
+
+    @property
+    def base_url(self) -> str:
+        return self.controller.base_url
+
+    @property
+    def stats(self) -> LatencyStats:
+        return self.controller.stats
+
+    def start(self):
+        """Start the worker and heartbeat threads (idempotent)"""
+        with self._cond:
+            if self._worker is not None:
+                return self
+            self._stopped = False
+            self._worker = threading.Thread(target=self._run, name="robot-dispatcher", daemon=True)
+            self._worker.start()
+            if self.heartbeat_seconds:
+                self._heartbeat = threading.Thread(target=self._beat, name="robot-heartbeat", daemon=True)
+                self._heartbeat.start()
+        return self
+
+    def submit(self, action_name: str) -> bool:
+        """
+        Queue a named action and return immediately
+
+        Returns:
+            True if queued, False if the action is unknown or the heartbeat reports the robot offline
+        """
+        action_name = self.controller.normalize_action(action_name)
+        if action_name is None:
+            return False
+        if self._healthy is False and self._heartbeat is not None:
+            print(f"⏭️ Robot offline - skipping '{action_name}'")
+            self.stats.count('skipped')
+            return False
+
+        with self._cond:
+            # Only the latest gesture matters: one still waiting is superseded
+            if self._queue:
+                superseded, _ = self._queue.popleft()
+                self.stats.count('coalesced')
+                print(f"🔀 Robot action '{superseded}' superseded by '{action_name}'")
+            self._queue.append((action_name, time.time()))
+            self._cond.notify_all()
+        return True
+
+    def perform_action(self, action_name: str) -> bool:
+        """Same as submit() (drop-in for callers of RobotController.perform_action)"""
+        return self.submit(action_name)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                action_name, queued_at = self._queue.popleft()
+                self._busy = True
+            try:
+                waited = time.time() - queued_at
+                if waited > 0.5:
+                    print(f"⏱️ Robot action '{action_name}' waited {waited:.2f}s in the queue")
+                ok = self.controller.perform_action(action_name)
+                if not ok and self._heartbeat is not None:
+                    # Stop queueing gestures until the heartbeat sees the robot again
+                    self._healthy = self.controller.is_robot_available()
+                    self._checked_at = time.time()
+            except Exception as e:
+                print(f"❌ Robot dispatch error: {e}")
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _beat(self):
+        while not self._stopped:
+            healthy = self.controller.is_robot_available()
+            if healthy != self._healthy:
+                print(f"🤖 Robot {'reachable' if healthy else 'unreachable'} at {self.base_url}")
+            self._healthy = healthy
+            self._checked_at = time.time()
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopped, timeout=self.heartbeat_seconds)
+
+    def is_robot_available(self) -> bool:
+        """Cached heartbeat result (probes once if no heartbeat has run yet)"""
+        if self._healthy is None:
+            self._healthy = self.controller.is_robot_available()
+            self._checked_at = time.time()
+        return self._healthy
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._queue) + (1 if self._busy else 0)
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        """Block until the queue is drained (for tests and shutdown)"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and not self._busy, timeout=timeout)
+
+    def stop(self):
+        """Stop the threads; queued commands are discarded"""
+        with self._cond:
+            self._stopped = True
+            self._queue.clear()
+            self._cond.notify_all()
+        for thread in (self._worker, self._heartbeat):
+            if thread is not None:
+                thread.join(timeout=self.controller.timeout + 1)
+        self._worker = self._heartbeat = None
+        self.controller.close()
@@ -0,0 +1,150 @@
+"""
+Incremental sentence splitting for streamed LLM output
+Tokens go in, speakable sentences come out; the ROBOT_ACTION block is stripped on the fly
+"""
+
+import re
+
+ROBOT_ACTION_MARKER = "ROBOT_ACTION:"
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by whitespace
+_SENTENCE_END = re.compile(r'[.!?…]+["\')\]]*\s+')
+
+
+def _partial_marker_length(text: str) -> int:
+    """Length of the longest suffix of text that is a prefix of the marker"""
+    for length in range(min(len(text), len(ROBOT_ACTION_MARKER) - 1), 0, -1):
+        if ROBOT_ACTION_MARKER.startswith(text[-length:]):
+            return length
+    return 0
+
+
+class SpeechChunker:
+    """
+    Split a token stream into sentences for TTS
+
+    Text inside ROBOT_ACTION: {...} is never emitted; it is kept in action_text
+    and handed out once through pop_action() as soon as the JSON closes.
+    """
+
+    def __init__(self, min_chars: int = 12):
+        """
+        Args:
+            min_chars: Sentences shorter than this are merged with the next one
+                       (avoids a TTS round trip for "Hi!" on its own)
+        """
+        self.min_chars = min_chars
+        self.raw_text = ""
+        self.action_text = ""
+        self._speakable = ""
+        self._unclassified = ""
+        self._in_action = False
+        self._action_open = False
+        self._action_ready = False
+
+    def feed(self, token: str) -> list:
+        """
+        Add streamed text
+
+        Returns:
+            Sentences completed by this token (possibly empty)
+        """
+        if not token:
+            return []
+        self.raw_text += token
+        self._unclassified += token
+        self._classify()
+        return self._take_sentences(final=False)
+
+    def close(self) -> list:
+        """End of stream: return whatever speakable text is left"""
+        if not self._in_action:
+            self._speakable += self._unclassified
+        self._unclassified = ""
+        return self._take_sentences(final=True)
+
+    def pop_action(self):
+        """Return the complete ROBOT_ACTION text once, as soon as it has been streamed"""
+        if not self._action_ready:
+            return None
+        self._action_ready = False
+        return self.action_text
+
+    def _classify(self):
+        while self._unclassified:
+            if self._in_action:
+                if not self._consume_action():
+                    return
+                continue
+
+            marker_index = self._unclassified.find(ROBOT_ACTION_MARKER)
+            if marker_index != -1:
+                # Text before the marker is complete; it always ends a sentence
+                self._speakable += self._unclassified[:marker_index] + "\n"
+                self.action_text += ROBOT_ACTION_MARKER
+                self._unclassified = self._unclassified[marker_index + len(ROBOT_ACTION_MARKER):]
+                self._in_action = True
+                self._action_open = False
+                continue
+
+            # Hold back a possible partial marker ("ROBOT_AC") until the next token
+            keep = _partial_marker_length(self._unclassified)
+            split_at = len(self._unclassified) - keep
+            self._speakable += self._unclassified[:split_at]
+            self._unclassified = self._unclassified[split_at:]
+            return
+
+    def _consume_action(self) -> bool:
+        """Swallow the action block; returns False while it is still incomplete"""
+        text = self._unclassified
+        if not self._action_open:
+            stripped = text.lstrip()
+            if not stripped:
+                self.action_text += text
+                self._unclassified = ""
+                return False
+            if not stripped.startswith("{"):
+                # No JSON after the marker: the block ends at the line break
+                newline = text.find("\n")
+                if newline == -1:
+                    self.action_text += text
+                    self._unclassified = ""
+                    return False
+                self.action_text += text[:newline]
+                self._unclassified = text[newline + 1:]
+                self._end_action()
+                return True
+            self._action_open = True
+
+        end = text.find("}")
+        if end == -1:
+            self.action_text += text
+            self._unclassified = ""
+            return False
+        self.action_text += text[:end + 1]
+        self._unclassified = text[end + 1:]
+        self._end_action()
+        return True
+
+    def _end_action(self):
+        self._in_action = False
+        self._action_open = False
+        self._action_ready = True
+
+    def _take_sentences(self, final: bool) -> list:
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._speakable):
+            sentence = self._speakable[start:match.end()].strip()
+            if len(sentence) < self.min_chars:
+                continue  # Merge with the next sentence
+            sentences.append(sentence)
+            start = match.end()
+        self._speakable = self._speakable[start:]
+
+        if final:
+            rest = self._speakable.strip()
+            if rest:
+                sentences.append(rest)
+            self._speakable = ""
+        return sentences
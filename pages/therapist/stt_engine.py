@@ -0,0 +1,129 @@
+"""
+Local Whisper transcription on a warm worker process pool
+
+Each worker loads the Whisper model once (pool initializer) and then transcribes
+raw 16-bit mono PCM sent from the app, so there is no upload, no API round trip
+and no temp file per utterance. Workers are separate processes so decoding never
+holds the GIL of the Streamlit server.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+import agent_settings
+
+WHISPER_SAMPLE_RATE = 16000
+
+# Per-worker state (set by the pool initializer)
+_model = None
+_use_fp16 = False
+
+
+def _init_worker(model_name: str):
+    """Load the model once per worker process"""
+    global _model, _use_fp16
+    import torch
+    import whisper
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    _model = whisper.load_model(model_name, device=device)
+    _use_fp16 = device == "cuda"
+    print(f"✅ Whisper '{model_name}' worker ready on {device}")
+
+
+def _transcribe_pcm(pcm: bytes, sample_rate: int) -> str:
+    """Transcribe 16-bit mono PCM (runs in a worker)"""
+    audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+    if audio.size == 0:
+        return ""
+    if sample_rate != WHISPER_SAMPLE_RATE:
+        target_length = int(round(audio.size * WHISPER_SAMPLE_RATE / sample_rate))
+        audio = np.interp(
+            np.linspace(0, audio.size - 1, target_length),
+            np.arange(audio.size),
+            audio
+        ).astype(np.float32)
+    result = _model.transcribe(audio, language="en", fp16=_use_fp16)
+    return result.get("text", "").strip()
+
+
+class LocalWhisperEngine:
+    """Long-lived pool of Whisper worker processes"""
+
+    def __init__(self, model_name: str, workers: int = 1):
+        """
+        Args:
+            model_name: Whisper model size ("tiny", "base", ...)
+            workers: Worker processes (each holds its own copy of the model)
+        """
+        self.model_name = model_name
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._pool = None
+        self._warm_future = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: the Streamlit server is multi-threaded, fork is unsafe there
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_name,)
+                )
+            return self._pool
+
+    def warm(self):
+        """Start the workers and load the model in the background (one second of silence)"""
+        if self._warm_future is None:
+            try:
+                self._warm_future = self.submit(b"\x00\x00" * WHISPER_SAMPLE_RATE, WHISPER_SAMPLE_RATE)
+            except Exception as e:
+                print(f"⚠️ Whisper warm-up failed: {e}")
+        return self._warm_future
+
+    def submit(self, pcm: bytes, sample_rate: int):
+        """
+        Queue a transcription
+
+        Args:
+            pcm: 16-bit little-endian mono PCM
+            sample_rate: Sample rate of pcm (resampled to 16 kHz in the worker if needed)
+
+        Returns:
+            Future resolving to the transcript
+        """
+        try:
+            return self._get_pool().submit(_transcribe_pcm, pcm, sample_rate)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start a fresh pool once
+            print("⚠️ Whisper worker pool broken - restarting")
+            self.shutdown()
+            return self._get_pool().submit(_transcribe_pcm, pcm, sample_rate)
+
+    def transcribe(self, pcm: bytes, sample_rate: int, timeout: float = None) -> str:
+        return self.submit(pcm, sample_rate).result(timeout=timeout)
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_local_engine() -> LocalWhisperEngine:
+    """Process-wide local engine (the pool is shared by every AudioHandler)"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = LocalWhisperEngine(agent_settings.WHISPER_MODEL, agent_settings.STT_LOCAL_WORKERS)
+    return _engine
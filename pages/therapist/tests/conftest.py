@@ -0,0 +1,17 @@
+"""
+Test setup for the therapist app modules
+
+The app imports its modules flat (import agent_settings, from audio_handler import ...),
+as Streamlit runs it from pages/therapist, so the tests do the same.
+"""
+
+import os
+import sys
+
+THERAPIST_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if THERAPIST_DIR not in sys.path:
+    sys.path.insert(0, THERAPIST_DIR)
+
+# agent_settings reads these at import time; the tests point the robot at local stubs
+os.environ.setdefault("ROBOT_IP", "127.0.0.1")
+os.environ.setdefault("ROBOT_PORT", "80")
@@ -0,0 +1,71 @@
+"""
+mp3_duration on synthetic MPEG-1 Layer III streams (built here, no fixture files)
+"""
+
+import pytest
+
+from mp3_info import mp3_duration
+
+SAMPLE_RATE = 44100
+SAMPLES_PER_FRAME = 1152
+FRAME_SECONDS = SAMPLES_PER_FRAME / SAMPLE_RATE
+
+# MPEG-1 Layer III bitrate indexes (kbps)
+BITRATE_INDEX = {64: 5, 128: 9, 192: 11}
+
+
+def _frame(kbps: int = 128, payload: bytes = b"") -> bytes:
+    """One stereo 44.1 kHz frame without CRC or padding, zero-filled after payload"""
+    header = bytes((0xFF, 0xFB, BITRATE_INDEX[kbps] << 4, 0x00))
+    length = 144 * kbps * 1000 // SAMPLE_RATE
+    body = payload.ljust(length - len(header), b"\0")
+    return header + body
+
+
+def _tag_frame(tag: bytes, frames: int = None) -> bytes:
+    """Xing/Info frame (after 32 bytes of stereo side info), with or without the frame count"""
+    if frames is None:
+        fields = tag + (0).to_bytes(4, "big")
+    else:
+        fields = tag + (1).to_bytes(4, "big") + frames.to_bytes(4, "big")
+    return _frame(payload=bytes(32) + fields)
+
+
+def _id3(size: int = 64) -> bytes:
+    synchsafe = bytes(((size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F))
+    return b"ID3\x04\x00\x00" + synchsafe + bytes(size)
+
+
+def test_cbr_frames_are_counted():
+    assert mp3_duration(_frame() * 100) == pytest.approx(100 * FRAME_SECONDS)
+
+
+def test_cbr_info_frame_without_count_is_not_counted():
+    data = _tag_frame(b"Info") + _frame() * 100
+    assert mp3_duration(data) == pytest.approx(100 * FRAME_SECONDS)
+
+
+def test_cbr_info_frame_count_is_used():
+    data = _tag_frame(b"Info", frames=100) + _frame() * 100
+    assert mp3_duration(data) == pytest.approx(100 * FRAME_SECONDS)
+
+
+def test_vbr_xing_frame_count_is_used():
+    audio = b"".join(_frame(kbps) for kbps in [64, 128, 192] * 40)
+    data = _id3() + _tag_frame(b"Xing", frames=120) + audio
+    assert mp3_duration(data) == pytest.approx(120 * FRAME_SECONDS)
+
+
+def test_vbr_without_xing_walks_mixed_bitrates():
+    audio = b"".join(_frame(kbps) for kbps in [64, 192, 128] * 20)
+    assert mp3_duration(_id3() + audio) == pytest.approx(60 * FRAME_SECONDS)
+
+
+def test_truncated_last_frame_is_ignored():
+    data = _frame() * 10 + _frame()[:100]
+    assert mp3_duration(data) == pytest.approx(10 * FRAME_SECONDS)
+
+
+def test_no_frames():
+    assert mp3_duration(b"") == 0.0
+    assert mp3_duration(b"not an mp3 at all") == 0.0
@@ -0,0 +1,144 @@
+"""
+RobotDispatcher against a local http.server stub of the robot's /control endpoint
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("dotenv")  # agent_settings
+
+from robot_controller import RobotController, RobotDispatcher
+
+
+class _RobotStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the robot's web server
+
+    def do_GET(self):
+        server = self.server
+        if self.path.startswith('/control'):
+            query = parse_qs(urlparse(self.path).query)
+            with server.lock:
+                server.commands.append(int(query['val'][0]))
+                server.client_ports.append(self.client_address[1])
+            server.release.wait(timeout=5)
+            status = 200
+        else:
+            status = 200 if server.healthy else 503
+        self.send_response(status)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def robot():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _RobotStub)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.commands = []
+    server.client_ports = []
+    server.healthy = True
+    server.release = threading.Event()
+    server.release.set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def _dispatcher(robot, heartbeat_seconds=0):
+    controller = RobotController(base_url=robot.base_url, timeout=5)
+    return RobotDispatcher(controller, heartbeat_seconds=heartbeat_seconds).start()
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_burst_sends_only_the_latest_action(robot):
+    dispatcher = _dispatcher(robot)
+    try:
+        robot.release.clear()  # Hold the first command in flight
+        assert dispatcher.submit('wave')
+        assert _wait_for(lambda: robot.commands)
+
+        for action in ('jump', 'bow', 'twist', 'sit'):
+            assert dispatcher.submit(action)
+        robot.release.set()
+
+        assert dispatcher.wait_idle(timeout=5)
+        actions = RobotController.ROBOT_ACTIONS
+        assert robot.commands == [actions['wave'], actions['sit']]
+        assert dispatcher.stats.summary()['coalesced'] == 3
+    finally:
+        dispatcher.stop()
+
+
+def test_submit_returns_without_waiting_for_the_robot(robot):
+    dispatcher = _dispatcher(robot)
+    try:
+        robot.release.clear()
+        start = time.time()
+        assert dispatcher.submit('bow')
+        assert time.time() - start < 0.5
+        robot.release.set()
+        assert dispatcher.wait_idle(timeout=5)
+    finally:
+        dispatcher.stop()
+
+
+def test_commands_are_skipped_while_the_heartbeat_reports_offline(robot):
+    robot.healthy = False
+    dispatcher = _dispatcher(robot, heartbeat_seconds=0.05)
+    try:
+        assert _wait_for(lambda: dispatcher.is_robot_available() is False)
+        assert not dispatcher.submit('wave')
+        assert dispatcher.stats.summary()['skipped'] == 1
+        assert robot.commands == []
+
+        robot.healthy = True
+        assert _wait_for(dispatcher.is_robot_available)
+        assert dispatcher.submit('wave')
+        assert dispatcher.wait_idle(timeout=5)
+        assert robot.commands == [RobotController.ROBOT_ACTIONS['wave']]
+    finally:
+        dispatcher.stop()
+
+
+def test_commands_reuse_one_keep_alive_connection(robot):
+    dispatcher = _dispatcher(robot)
+    try:
+        for action in ('wave', 'bow', 'sit', 'dig'):
+            assert dispatcher.submit(action)
+            assert dispatcher.wait_idle(timeout=5)
+
+        assert len(robot.commands) == 4
+        assert len(set(robot.client_ports)) == 1
+        assert dispatcher.stats.summary()['sent'] == 4
+    finally:
+        dispatcher.stop()
+
+
+def test_unknown_action_is_rejected(robot):
+    dispatcher = _dispatcher(robot)
+    try:
+        assert not dispatcher.submit('smile')
+        assert dispatcher.pending() == 0
+        assert robot.commands == []
+    finally:
+        dispatcher.stop()
@@ -0,0 +1,87 @@
+"""
+SpeechChunker fed token by token, the way chat_stream feeds it
+"""
+
+from sentence_stream import SpeechChunker
+
+ACTION = 'ROBOT_ACTION: {"action": "wave", "reason": "greeting the child"}'
+
+
+def _stream(tokens, chunker=None):
+    """Feed tokens one by one; returns (sentences in order, actions in order, chunker)"""
+    chunker = chunker or SpeechChunker()
+    sentences = []
+    actions = []
+    for token in tokens:
+        sentences.extend(chunker.feed(token))
+        action = chunker.pop_action()
+        if action:
+            actions.append(action)
+    sentences.extend(chunker.close())
+    action = chunker.pop_action()
+    if action:
+        actions.append(action)
+    return sentences, actions, chunker
+
+
+def _chars(text):
+    return list(text)
+
+
+def test_marker_split_across_tokens_is_never_spoken():
+    tokens = ["Hello there, my friend! ", "ROBOT", "_AC", "TION", ": {\"action\": ",
+              "\"wave\", \"reason\": ", "\"greeting the child\"", "}"]
+    sentences, actions, _ = _stream(tokens)
+
+    assert sentences == ["Hello there, my friend!"]
+    assert actions == [ACTION]
+
+
+def test_action_is_available_as_soon_as_its_json_closes():
+    chunker = SpeechChunker()
+    chunker.feed("Nice to meet you! ")
+    chunker.feed('ROBOT_ACTION: {"action": "wave", ')
+    assert chunker.pop_action() is None
+    chunker.feed('"reason": "greeting the child"}')
+    assert chunker.pop_action() == ACTION
+    assert chunker.pop_action() is None
+
+
+def test_text_after_the_action_block_is_spoken():
+    text = f"Great job describing that!\n{ACTION}\nWhat else can you see in the picture?"
+    sentences, actions, _ = _stream(_chars(text))
+
+    assert sentences == ["Great job describing that!", "What else can you see in the picture?"]
+    assert actions == [ACTION]
+
+
+def test_short_sentence_is_merged_with_the_next_one():
+    sentences, _, _ = _stream(_chars("Hi! How are you doing today? "))
+
+    assert sentences == ["Hi! How are you doing today?"]
+
+
+def test_short_trailing_sentence_is_flushed_on_close():
+    chunker = SpeechChunker()
+    sentences = []
+    for token in _chars("Tell me about your favourite toy. Okay?"):
+        sentences.extend(chunker.feed(token))
+    assert sentences == ["Tell me about your favourite toy."]
+    assert chunker.close() == ["Okay?"]
+
+
+def test_marker_lookalike_is_released():
+    sentences, actions, _ = _stream(_chars("ROBOTS can dance really well. Can you dance too?"))
+
+    assert sentences == ["ROBOTS can dance really well.", "Can you dance too?"]
+    assert actions == []
+
+
+def test_token_boundaries_do_not_change_the_result():
+    text = f"That sounds like so much fun! Do you play football with friends?\n{ACTION}"
+    whole, whole_actions, _ = _stream([text])
+    by_char, char_actions, chunker = _stream(_chars(text))
+
+    assert by_char == whole == ["That sounds like so much fun!", "Do you play football with friends?"]
+    assert char_actions == whole_actions == [ACTION]
+    assert chunker.raw_text == text
@@ -0,0 +1,49 @@
+"""
+text_classifier must give the same answers as the keyword loops it replaced
+"""
+
+import pytest
+
+import text_classifier
+from text_classifier import COMMAND_PATTERNS, RESPONSE_EMOTION_PATTERNS
+from text_classifier_benchmark import AGENT_TEXTS, CHILD_TEXTS, parity_mismatches
+
+# Edge cases on top of the benchmark corpus: empty text, case, overlapping command phrases
+EXTRA_TEXTS = [
+    "", "   ", "JUMP FORWARD NOW", "jump", "hop forward and then jump back", "No no, stop that!",
+    "I can't do that", "stop doing that", "So sorry!", "That's great!", "great", "Um... uh?",
+    "Is it a cat or a dog?", "What does it look like?", "Describe the house", "well done",
+]
+
+# One probe per keyword the original inline lists used, so dropping or changing
+# a keyword in text_classifier fails here
+LEGACY_KEYWORDS = [
+    'yay', 'happy', 'love', 'fun', 'great', 'awesome', 'cool', 'yes!', 'yeah!',
+    'wow', 'amazing', 'exciting',
+    'sad', 'cry', 'bad', "don't like", 'hate', 'no',
+    'maybe', "i don't know", 'um', 'uh', 'dunno',
+    'what', 'how', 'why', 'tell me', 'describe', 'explain', 'what does', 'look like',
+]
+KEYWORD_TEXTS = [f"well then {keyword} over there" for keyword in LEGACY_KEYWORDS]
+# The shared tables: each entry on its own, to check the matching logic around it
+KEYWORD_TEXTS += [phrase.upper() for phrases in COMMAND_PATTERNS.values() for phrase in phrases]
+KEYWORD_TEXTS += [f"Oh, {keyword}." for spec in RESPONSE_EMOTION_PATTERNS.values() for keyword in spec['keywords']]
+
+
+@pytest.mark.parametrize("text", CHILD_TEXTS + AGENT_TEXTS + EXTRA_TEXTS + KEYWORD_TEXTS)
+def test_matches_original_heuristics(text):
+    text_classifier.classify.cache_clear()
+    assert parity_mismatches(text) == []
+
+
+def test_memoised_result_is_the_same():
+    text = "Wow! Good job describing the picture!"
+    first = text_classifier.classify(text)
+    assert text_classifier.classify(text) is first
+    assert parity_mismatches(text) == []
+
+
+def test_highest_priority_command_wins():
+    # 'bow' is listed before 'wave' in COMMAND_PATTERNS
+    assert text_classifier.detect_command("wave and then take a bow") == 'bow'
+    assert text_classifier.detect_command("tell me a story") is None
@@ -0,0 +1,251 @@
+"""
+Compiled keyword classifier for the per-turn text heuristics
+
+One precompiled matcher replaces the separate keyword loops and uncompiled
+re.search calls of:
+    - LanguageScreeningAgent.detect_child_robot_command  (child text -> robot command)
+    - LanguageScreeningAgent._detect_emotion             (child text -> emotion)
+    - LanguageScreeningAgent._track_question_type        (agent text -> question type)
+    - EmotionDisplayHandler.select_emotion               (agent text -> mad/sad/surprise cues)
+
+All keywords and command phrases are merged into one deduplicated table, each
+tagged with the categories it belongs to, and matched in a single pass of
+substring searches. On utterance-length text this measured faster than a
+combined regex alternation or a pure-Python Aho-Corasick scan (both step
+through the text position by position). The regex patterns are compiled once
+and only run when their leading literal is present.
+
+classify(text) is memoised, so the child view re-selecting the emotion of the
+same message on every rerun is a cache hit. Results are identical to the
+original heuristics: keywords are plain substrings of the lowercased text and
+the highest-priority command wins (text_classifier_benchmark.py checks this).
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+# Child commands, in priority order (the first action with any phrase in the text wins)
+COMMAND_PATTERNS = {
+    'bow': ['bow', 'take a bow'],
+    'handshake': ['handshake', 'shake hands', 'shake hand', 'give me five', 'high five'],
+    'wave': ['wave', 'say hi', 'say hello', 'wave hello'],
+    'jump': ['jump', 'jump up'],
+    'jump_forward': ['jump forward', 'hop forward'],
+    'jump_backward': ['jump backward', 'jump back', 'hop back'],
+    'twist': ['twist', 'dance', 'wiggle'],
+    'sit': ['sit', 'sit down'],
+    'stay_low': ['stay low', 'crouch', 'get low', 'go down'],
+    'push_up': ['push up', 'pushup', 'do pushups', 'exercise'],
+    'dig': ['dig', 'scratch'],
+    'scared': ['be scared', 'act scared', 'shiver'],
+    'sleep': ['sleep', 'go to sleep', 'take a nap'],
+    'steady': ['stand up', 'steady', 'balance']
+}
+
+# Child speech emotion cues (checked in this order by child_emotion)
+CHILD_EMOTION_KEYWORDS = {
+    'happy': ['yay', 'happy', 'love', 'fun', 'great', 'awesome', 'cool', 'yes!', 'yeah!'],
+    'excited': ['wow', 'amazing', 'exciting'],
+    'sad': ['sad', 'cry', 'bad', 'don\'t like', 'hate', 'no'],
+    'shy': ['maybe', 'i don\'t know', 'um', 'uh', 'dunno']
+}
+
+# Question type cues in the agent's reply
+QUESTION_KEYWORDS = {
+    'open': ['what', 'how', 'why', 'tell me'],
+    'descriptive': ['describe', 'explain', 'what does', 'look like']
+}
+
+# Emotion cues in the agent's reply (ordered by priority), used by EmotionDisplayHandler
+RESPONSE_EMOTION_PATTERNS = {
+    'mad': {
+        'keywords': [
+            'no no', 'stop that', 'don\'t do that', 'that\'s not right',
+            'you must', 'frustrated', 'be careful', 'wait', 'hold on',
+            'that\'s wrong', 'incorrect', 'not allowed', 'dangerous'
+        ],
+        'patterns': [
+            r'\bno\s+no\b',
+            r'\bstop\b.*\bthat\b',
+            r'\bdon\'t\b',
+            r'\bcan\'t\b.*\bthat\b'
+        ]
+    },
+    'sad': {
+        'keywords': [
+            'sorry', 'sad', 'unfortunate', 'that\'s tough', 'difficult',
+            'hard time', 'struggle', 'miss', 'lost', 'hurt',
+            'don\'t worry', 'it\'s okay', 'understandable',
+            'i understand', 'that must be', 'feel bad', 'upset',
+            'crying', 'tears', 'lonely', 'scared'
+        ],
+        'patterns': [
+            r'\bso\s+sorry\b',
+            r'\bfeel\s+(?:sad|bad|upset)\b',
+            r'\bmust\s+be\s+(?:hard|tough|difficult)\b',
+            r'\bthat\'s\s+(?:tough|hard|sad)\b'
+        ]
+    },
+    'surprise': {
+        'keywords': [
+            'great', 'awesome', 'wonderful', 'amazing', 'wow', 'love',
+            'yay', 'hooray', 'excellent', 'fantastic', 'good job',
+            'well done', 'perfect', 'brilliant', 'nice', 'cool',
+            'really', 'whoa', 'oh my', 'incredible', 'super', 'terrific',
+            'exciting', 'fun', 'happy', 'joy', 'beautiful', 'lovely',
+            'impressive', 'outstanding', 'marvelous', 'splendid'
+        ],
+        'patterns': [
+            r'\b(?:great|awesome|amazing|wonderful)\b.*!',
+            r'\bgood\s+job\b',
+            r'\bwell\s+done\b',
+            r'\bthat\'s\s+(?:great|amazing|awesome)\b'
+        ]
+    }
+}
+
+
+# keyword -> categories it counts for; commands are tagged ('command', rank, action)
+_KEYWORD_TAGS = {}
+
+
+def _tag(keyword, tag):
+    _KEYWORD_TAGS.setdefault(keyword, []).append(tag)
+
+
+for _name, _keywords in CHILD_EMOTION_KEYWORDS.items():
+    for _keyword in _keywords:
+        _tag(_keyword, f'child_{_name}')
+for _name, _keywords in QUESTION_KEYWORDS.items():
+    for _keyword in _keywords:
+        _tag(_keyword, f'question_{_name}')
+for _name, _spec in RESPONSE_EMOTION_PATTERNS.items():
+    for _keyword in _spec['keywords']:
+        _tag(_keyword, f'response_{_name}')
+_rank = 0
+for _action, _phrases in COMMAND_PATTERNS.items():
+    for _phrase in _phrases:
+        _tag(_phrase, ('command', _rank, _action))
+        _rank += 1
+
+_KEYWORD_TABLE = tuple((keyword, tuple(tags)) for keyword, tags in _KEYWORD_TAGS.items())
+
+_LEADING_LITERAL = re.compile(r"\\b((?:[a-z]|\\')+)")
+
+
+def _compile_pattern(pattern):
+    """(leading literal or None, compiled regex) - the literal must occur for the regex to match"""
+    match = _LEADING_LITERAL.match(pattern)
+    literal = match.group(1).replace("\\'", "'") if match else None
+    return literal, re.compile(pattern)
+
+
+_RESPONSE_REGEXES = {
+    f'response_{_name}': tuple(_compile_pattern(pattern) for pattern in _spec['patterns'])
+    for _name, _spec in RESPONSE_EMOTION_PATTERNS.items()
+}
+
+
+class Classification(NamedTuple):
+    """Everything the turn heuristics need to know about one text"""
+    categories: frozenset          # Category names with at least one match
+    command: Optional[str]         # Robot action the text asks for, if any
+    exclamations: int
+    has_question: bool
+    has_or: bool                   # ' or ' in the text (choice questions)
+    word_count: int
+
+
+@lru_cache(maxsize=2048)
+def classify(text: str) -> Classification:
+    """
+    Match every heuristic category against text in one call (memoised by text)
+
+    Args:
+        text: Child or agent utterance
+
+    Returns:
+        Classification for the text
+    """
+    text_lower = text.lower()
+    categories = set()
+    command_rank = None
+    command = None
+    for keyword, tags in _KEYWORD_TABLE:
+        if keyword in text_lower:
+            for tag in tags:
+                if isinstance(tag, tuple):
+                    if command_rank is None or tag[1] < command_rank:
+                        command_rank, command = tag[1], tag[2]
+                else:
+                    categories.add(tag)
+
+    for name, regexes in _RESPONSE_REGEXES.items():
+        if name in categories:
+            continue
+        for literal, regex in regexes:
+            if (literal is None or literal in text_lower) and regex.search(text_lower):
+                categories.add(name)
+                break
+
+    return Classification(
+        categories=frozenset(categories),
+        command=command,
+        exclamations=text.count('!'),
+        has_question='?' in text,
+        has_or=' or ' in text_lower,
+        word_count=len(text.split())
+    )
+
+
+def detect_command(text: str) -> Optional[str]:
+    """Robot action a child's utterance asks for (None if it is not a command)"""
+    return classify(text).command
+
+
+def child_emotion(text: str) -> str:
+    """
+    Emotion suggested by the child's words
+
+    Returns:
+        'happy', 'excited', 'sad', 'shy', 'engaged', 'disengaged' or 'neutral'
+    """
+    result = classify(text)
+    if 'child_happy' in result.categories:
+        return 'happy'
+    if 'child_excited' in result.categories or result.exclamations >= 2:
+        return 'excited'
+    if 'child_sad' in result.categories:
+        return 'sad'
+    if 'child_shy' in result.categories:
+        return 'shy'
+    if result.word_count > 10:
+        return 'engaged'
+    if result.word_count <= 2:
+        return 'disengaged'
+    return 'neutral'
+
+
+def question_type(text: str) -> Optional[str]:
+    """
+    Kind of question in the agent's reply
+
+    Returns:
+        'open', 'choice', 'descriptive', 'closed', or None if it asks nothing
+    """
+    result = classify(text)
+    if 'question_open' in result.categories:
+        return 'open'
+    if result.has_or and result.has_question:
+        return 'choice'
+    if 'question_descriptive' in result.categories:
+        return 'descriptive'
+    if result.has_question:
+        return 'closed'
+    return None
+
+
+def has_response_emotion(text: str, emotion: str) -> bool:
+    """True if the agent's reply contains cues for emotion ('mad', 'sad' or 'surprise')"""
+    return f'response_{emotion}' in classify(text).categories
@@ -0,0 +1,170 @@
+"""
+Benchmark: text_classifier against the original keyword-loop heuristics
+
+Checks that both give identical results on a mixed corpus, then times each
+(tests/test_text_classifier.py runs the same parity check under pytest).
+The first compiled pass runs with a cold cache; the memoised pass measures
+the repeated-text case (child-view reruns re-selecting the same emotion).
+
+Usage:
+    python text_classifier_benchmark.py [rounds]
+"""
+
+import re
+import sys
+import time
+
+import text_classifier
+from text_classifier import COMMAND_PATTERNS, RESPONSE_EMOTION_PATTERNS
+
+# ==================== ORIGINAL IMPLEMENTATIONS ====================
+
+def legacy_detect_command(user_input):
+    user_lower = user_input.lower().strip()
+    for action, patterns in COMMAND_PATTERNS.items():
+        for pattern in patterns:
+            if pattern in user_lower:
+                return action
+    return None
+
+
+def legacy_child_emotion(text):
+    text_lower = text.lower()
+    if any(word in text_lower for word in ['yay', 'happy', 'love', 'fun', 'great', 'awesome', 'cool', 'yes!', 'yeah!']):
+        return 'happy'
+    if any(word in text_lower for word in ['wow', 'amazing', 'exciting']) or text.count('!') >= 2:
+        return 'excited'
+    if any(word in text_lower for word in ['sad', 'cry', 'bad', 'don\'t like', 'hate', 'no']):
+        return 'sad'
+    if any(word in text_lower for word in ['maybe', 'i don\'t know', 'um', 'uh', 'dunno']):
+        return 'shy'
+    if len(text.split()) > 10:
+        return 'engaged'
+    if len(text.split()) <= 2:
+        return 'disengaged'
+    return 'neutral'
+
+
+def legacy_question_type(response):
+    lower = response.lower()
+    if any(word in lower for word in ['what', 'how', 'why', 'tell me']):
+        return 'open'
+    elif ' or ' in lower and '?' in response:
+        return 'choice'
+    elif any(word in lower for word in ['describe', 'explain', 'what does', 'look like']):
+        return 'descriptive'
+    elif '?' in response:
+        return 'closed'
+    return None
+
+
+def legacy_response_emotion(text, emotion):
+    text_lower = text.lower()
+    patterns = RESPONSE_EMOTION_PATTERNS[emotion]
+    for keyword in patterns['keywords']:
+        if keyword in text_lower:
+            return True
+    for pattern in patterns['patterns']:
+        if re.search(pattern, text_lower):
+            return True
+    return False
+
+
+# ==================== CORPUS ====================
+
+CHILD_TEXTS = [
+    "Can you jump forward?", "jump back please", "I want you to dance!", "hop back", "sit down",
+    "My name is Bilal", "I like football and my dog", "um I don't know", "no", "yes!",
+    "Wow that's amazing!!", "I don't like spiders", "maybe", "we went to the park and played on the swings all day long",
+    "give me five", "Can you say hello to my mum", "go to sleep robot", "I am happy", "dunno", "it was bad",
+    "stand up", "Do a push up", "can you be scared", "the cat is sleeping on the sofa", "what is that",
+]
+AGENT_TEXTS = [
+    "That's great, Bilal! What do you like to play?", "Oh no, I'm so sorry to hear that. Do you feel sad?",
+    "Wow! Good job describing the picture!", "Wait, hold on - that's dangerous.", "Do you like apples or bananas?",
+    "Can you describe what you see in the picture?", "Hello there! What's your name?", "Is it sunny today?",
+    "I understand, that must be hard.", "Let's talk about your favourite animal.", "Don't worry, it's okay.",
+    "Tell me more about your dog!", "Well done! That was a wonderful story!", "Okay.", "You must be careful with that.",
+]
+
+
+def parity_mismatches(text):
+    """
+    Compare every heuristic on one text
+
+    Returns:
+        List of (heuristic, original result, text_classifier result) that differ
+    """
+    pairs = [
+        ('detect_command', legacy_detect_command(text), text_classifier.detect_command(text)),
+        ('child_emotion', legacy_child_emotion(text), text_classifier.child_emotion(text)),
+        ('question_type', legacy_question_type(text), text_classifier.question_type(text)),
+    ] + [
+        (f'response_emotion[{emotion}]', legacy_response_emotion(text, emotion),
+         text_classifier.has_response_emotion(text, emotion))
+        for emotion in RESPONSE_EMOTION_PATTERNS
+    ]
+    return [(name, expected, actual) for name, expected, actual in pairs if expected != actual]
+
+
+def _check():
+    mismatches = 0
+    for text in CHILD_TEXTS + AGENT_TEXTS:
+        for name, expected, actual in parity_mismatches(text):
+            mismatches += 1
+            print(f"❌ {name} mismatch for {text!r}: {expected!r} != {actual!r}")
+    return mismatches
+
+
+def _run_legacy(texts):
+    for text in texts:
+        legacy_detect_command(text)
+        legacy_child_emotion(text)
+        legacy_question_type(text)
+        for emotion in RESPONSE_EMOTION_PATTERNS:
+            legacy_response_emotion(text, emotion)
+
+
+def _run_compiled(texts):
+    for text in texts:
+        text_classifier.detect_command(text)
+        text_classifier.child_emotion(text)
+        text_classifier.question_type(text)
+        for emotion in RESPONSE_EMOTION_PATTERNS:
+            text_classifier.has_response_emotion(text, emotion)
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    mismatches = _check()
+    print(f"✅ Results identical" if not mismatches else f"❌ {mismatches} mismatch(es)")
+
+    texts = CHILD_TEXTS + AGENT_TEXTS
+    # Unique texts per round defeat the cache, as new utterances would
+    unique = [[f"{text} {i}" for text in texts] for i in range(rounds)]
+
+    start = time.perf_counter()
+    for batch in unique:
+        _run_legacy(batch)
+    legacy = time.perf_counter() - start
+
+    text_classifier.classify.cache_clear()
+    start = time.perf_counter()
+    for batch in unique:
+        _run_compiled(batch)
+    compiled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        _run_compiled(texts)
+    memoised = time.perf_counter() - start
+
+    calls = rounds * len(texts)
+    print(f"{calls} texts, all heuristics per text:")
+    print(f"  original loops : {legacy * 1e6 / calls:7.1f} µs/text")
+    print(f"  compiled       : {compiled * 1e6 / calls:7.1f} µs/text  ({legacy / compiled:.1f}x)")
+    print(f"  memoised       : {memoised * 1e6 / calls:7.1f} µs/text  ({legacy / memoised:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
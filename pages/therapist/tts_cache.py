@@ -0,0 +1,244 @@
+"""
+Persistent TTS audio cache shared by every process on this host
+
+Entries are content-addressed by a hash of (text, voice, speed, model, format) and
+stored as one file per clip under the cache directory. A SQLite index (WAL mode,
+safe across processes) tracks size and last access for LRU eviction by total bytes.
+Recently used clips stay memory-mapped in a per-process hot tier.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import agent_settings
+
+# Refresh an entry's last_access at most this often (hot-tier hits do not touch SQLite)
+_TOUCH_INTERVAL_SECONDS = 60
+
+
+def make_key(text: str, voice: str, speed: float, model: str, audio_format: str) -> str:
+    """Content address of one synthesised clip"""
+    payload = json.dumps([text, voice, float(speed), model, audio_format], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """On-disk LRU cache of synthesised audio with a memory-mapped hot tier"""
+
+    def __init__(self, root: str, max_bytes: int, hot_bytes: int):
+        """
+        Args:
+            root: Cache directory (shared by every process that should share audio)
+            max_bytes: Total size of cached clips before least-recently-used ones are evicted
+            hot_bytes: Size of the per-process memory-mapped hot tier
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hot_bytes = hot_bytes
+        self.index_path = os.path.join(root, "index.sqlite3")
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+
+        self._local = threading.local()
+        self._hot_lock = threading.Lock()
+        self._hot = OrderedDict()  # key -> (mmap, size)
+        self._hot_size = 0
+        self._touched = {}
+        self.hits = 0
+        self.misses = 0
+
+        db = self._connect()
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS clips ("
+            " key TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " text TEXT)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS clips_last_access ON clips(last_access)")
+
+    # ==================== INTERNALS ====================
+
+    def _connect(self) -> sqlite3.Connection:
+        """One SQLite connection per thread"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.index_path, timeout=10, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _blob_path(self, key: str) -> str:
+        return os.path.join(self.root, "blobs", key[:2], key)
+
+    def _hot_get(self, key: str):
+        with self._hot_lock:
+            entry = self._hot.get(key)
+            if entry is None:
+                return None
+            self._hot.move_to_end(key)
+            return entry[0][:]
+
+    def _hot_put(self, key: str, path: str, size: int):
+        if size == 0 or size > self.hot_bytes:
+            return
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return
+        with self._hot_lock:
+            if key in self._hot:
+                mapped.close()
+                return
+            self._hot[key] = (mapped, size)
+            self._hot_size += size
+            while self._hot_size > self.hot_bytes and self._hot:
+                _, (old_map, old_size) = self._hot.popitem(last=False)
+                old_map.close()
+                self._hot_size -= old_size
+
+    def _hot_drop(self, key: str):
+        with self._hot_lock:
+            entry = self._hot.pop(key, None)
+            if entry:
+                entry[0].close()
+                self._hot_size -= entry[1]
+
+    def _touch(self, key: str, force: bool = False):
+        now = time.time()
+        if not force and now - self._touched.get(key, 0) < _TOUCH_INTERVAL_SECONDS:
+            return
+        self._touched[key] = now
+        try:
+            self._connect().execute("UPDATE clips SET last_access = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            print(f"⚠️ TTS cache touch failed: {e}")
+
+    # ==================== API ====================
+
+    def get(self, key: str):
+        """Cached audio bytes, or None"""
+        data = self._hot_get(key)
+        if data is not None:
+            self.hits += 1
+            self._touch(key)
+            return data
+
+        row = self._connect().execute("SELECT size FROM clips WHERE key = ?", (key,)).fetchone()
+        path = self._blob_path(key)
+        if row is None or not os.path.exists(path):
+            self.misses += 1
+            return None
+
+        self._hot_put(key, path, row[0])
+        data = self._hot_get(key)
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        self.hits += 1
+        self._touch(key, force=True)
+        return data
+
+    def put(self, key: str, data: bytes, text: str = None):
+        """Store a clip (atomic file replace, then index update and eviction)"""
+        if not data:
+            return
+        path = self._blob_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ TTS cache write failed: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        db = self._connect()
+        db.execute(
+            "INSERT OR REPLACE INTO clips (key, size, last_access, text) VALUES (?, ?, ?, ?)",
+            (key, len(data), time.time(), (text or "")[:200])
+        )
+        self._touched[key] = time.time()
+        self._evict()
+
+    def _evict(self):
+        """Delete least-recently-used clips until the cache fits in max_bytes"""
+        db = self._connect()
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM clips").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for key, size in db.execute("SELECT key, size FROM clips ORDER BY last_access ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._hot_drop(key)
+            try:
+                os.remove(self._blob_path(key))
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue  # Still mapped by another process (Windows); retry on a later eviction
+            db.execute("DELETE FROM clips WHERE key = ?", (key,))
+            total -= size
+
+    def clear(self):
+        """Remove every cached clip"""
+        with self._hot_lock:
+            keys = list(self._hot)
+        for key in keys:
+            self._hot_drop(key)
+        db = self._connect()
+        for (key,) in db.execute("SELECT key FROM clips").fetchall():
+            try:
+                os.remove(self._blob_path(key))
+            except OSError:
+                pass
+        db.execute("DELETE FROM clips")
+
+    def stats(self) -> dict:
+        count, total = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM clips"
+        ).fetchone()
+        with self._hot_lock:
+            hot_count, hot_size = len(self._hot), self._hot_size
+        return {
+            'entries': count,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'hot_entries': hot_count,
+            'hot_bytes': hot_size,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> TTSCache:
+    """Process-wide cache instance (every AudioHandler in the process shares it)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TTSCache(
+                    agent_settings.TTS_CACHE_DIR,
+                    agent_settings.TTS_CACHE_MAX_BYTES,
+                    agent_settings.TTS_CACHE_HOT_BYTES
+                )
+    return _cache
@@ -0,0 +1,166 @@
+"""
+Concurrent pipeline for one child turn
+
+    STT (critical path) ──────────────┐
+    emotion lookup (DynamoDB) ────────┼─> LLM + TTS ─> reply
+    agent construction (first turn) ──┘       │
+    user-message write <── after STT          ├─> robot command (background)
+                                              └─> assistant-message write (overlaps TTS)
+
+Side stages run on a shared thread pool with per-stage deadlines
+(agent_settings.TURN_STAGE_DEADLINES). A stage that misses its deadline is
+cancelled if it has not started, otherwise abandoned, and the turn carries on
+without it, so a slow robot or DynamoDB never holds up the child's reply.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import agent_settings
+
+# Shared by every turn in this process
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="turn-stage")
+
+
+class TurnOrchestrator:
+    """Runs the independent stages of a turn concurrently"""
+
+    def __init__(self, audio_handler, db_handler, robot_dispatcher=None, deadlines: dict = None):
+        self.audio_handler = audio_handler
+        self.db_handler = db_handler
+        self.robot_dispatcher = robot_dispatcher
+        self.deadlines = {**agent_settings.TURN_STAGE_DEADLINES, **(deadlines or {})}
+        self.timings = {}
+        self._started = {}
+
+    # ==================== STAGE HELPERS ====================
+
+    def submit(self, stage: str, fn, *args, **kwargs):
+        """Start a stage in the background"""
+        self._started[stage] = time.time()
+
+        def _run():
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.timings[stage] = time.time() - self._started[stage]
+
+        return _executor.submit(_run)
+
+    def await_stage(self, stage: str, future, default=None):
+        """
+        Wait for a background stage until its deadline (measured from when it started)
+
+        Returns:
+            The stage result, or default if it failed or missed the deadline
+        """
+        deadline = self.deadlines.get(stage)
+        remaining = None
+        if deadline is not None:
+            remaining = max(0.0, self._started.get(stage, time.time()) + deadline - time.time())
+        try:
+            return future.result(timeout=remaining)
+        except FutureTimeout:
+            future.cancel()
+            print(f"⏱️ Stage '{stage}' missed its {deadline:.1f}s deadline - continuing without it")
+        except Exception as e:
+            print(f"❌ Stage '{stage}' failed: {e}")
+        return default
+
+    def _timed(self, stage: str, fn, *args, **kwargs):
+        """Run a stage on the calling thread and record its duration"""
+        self._started[stage] = time.time()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.timings[stage] = time.time() - self._started[stage]
+
+    # ==================== TURN ====================
+
+    def run_turn(self, session_id: str, audio_bytes: bytes, agent=None, agent_factory=None, respond=None):
+        """
+        Run one turn from recorded audio to the agent's reply
+
+        Args:
+            session_id: Active session ID
+            audio_bytes: Recorded audio from the child
+            agent: Existing LanguageScreeningAgent, or None on the first turn
+            agent_factory: Builds the agent when agent is None (runs while STT is in flight)
+            respond: Callable(agent, transcript, emotion_context) -> result dict, run on the
+                     calling thread (Streamlit UI calls must stay on the script thread).
+                     Defaults to agent.chat.
+
+        Returns:
+            dict with 'transcript', 'agent', 'result', 'user_message' and 'timings',
+            or None if nothing was transcribed
+        """
+        self.timings = {}
+        turn_start = time.time()
+
+        agent_future = None
+        if agent is None:
+            agent_future = self.submit('agent_init', agent_factory)
+
+        def _fetch_emotion():
+            emotion_agent = agent if agent is not None else agent_future.result()
+            return emotion_agent.get_current_emotion_context()
+
+        # DynamoDB emotion lookup overlaps transcription
+        emotion_future = self.submit('emotion', _fetch_emotion)
+
+        transcript = self._timed('stt', self.audio_handler.transcribe_audio, audio_bytes)
+        if not transcript or not transcript.strip():
+            return None
+
+        # User message write overlaps the LLM call
+        user_future = self.submit('user_write', self.db_handler.add_message, session_id, "user", transcript)
+
+        if agent is None:
+            agent = agent_future.result()  # Needed for the reply; no useful fallback
+        emotion_context = self.await_stage('emotion', emotion_future, default="")
+
+        if respond is None:
+            respond = lambda turn_agent, text, context: turn_agent.chat(text, emotion_context=context)
+        result = self._timed('llm', respond, agent, transcript, emotion_context)
+
+        user_message = self.await_stage('user_write', user_future)
+
+        self.timings['total'] = time.time() - turn_start
+        print("⏱️ Turn stages: " + ", ".join(f"{stage}={seconds:.2f}s" for stage, seconds in self.timings.items()))
+
+        return {
+            'transcript': transcript,
+            'agent': agent,
+            'result': result,
+            'user_message': user_message,
+            'timings': dict(self.timings)
+        }
+
+    def dispatch_robot_action(self, robot_action: dict):
+        """Queue the robot command for the dispatcher's worker; the reply never waits for it"""
+        if not (self.robot_dispatcher and robot_action and robot_action.get('action')):
+            return False
+        print(f"🤖 Executing robot action: {robot_action.get('action')} ({robot_action.get('reason', '')})")
+        return self.robot_dispatcher.submit(robot_action['action'])
+
+    def persist_reply(self, session_id: str, result: dict):
+        """Start the assistant-message write (overlaps the remaining TTS)"""
+        metadata = {}
+        if result.get('emotion'):
+            metadata['emotion'] = result['emotion']
+        if result.get('robot_action'):
+            metadata['robot_action'] = result['robot_action']
+        if result.get('picture'):
+            picture_info = result['picture']
+            metadata['picture_path'] = picture_info['filepath']
+            metadata['picture_filename'] = picture_info['filename']
+            metadata['picture_complexity'] = picture_info['complexity']
+
+        return self.submit(
+            'assistant_write',
+            self.db_handler.add_message,
+            session_id,
+            "assistant",
+            result['response'],
+            metadata=metadata if metadata else None
+        )
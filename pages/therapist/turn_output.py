@@ -0,0 +1,62 @@
+"""
+Structured turn output for LanguageScreeningAgent
+
+With STRUCTURED_TURN_OUTPUT the LLM answers through a function call whose
+arguments follow TurnOutput: the spoken text, a robot action constrained to
+RobotController.ROBOT_ACTIONS, the reason, and the question type asked. Invalid
+actions cannot be produced, so nothing has to be scanned out of the text or
+patched with a fallback.
+"""
+
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+from robot_controller import RobotController
+
+VALID_ROBOT_ACTIONS = tuple(RobotController.ROBOT_ACTIONS)
+QUESTION_TYPES = ('open', 'closed', 'choice', 'descriptive', 'none')
+
+
+class TurnOutput(BaseModel):
+    """One robot turn: what to say to the child and which robot action to perform"""
+
+    model_config = ConfigDict(extra='forbid')
+
+    # Action first: when streaming, the robot can move before the text is generated
+    # (chat_stream handles any key order, sending the action once it and the reason are final)
+    action: Literal[VALID_ROBOT_ACTIONS] = Field(description="Robot action performed while speaking")
+    reason: str = Field(description="Brief reason for the action")
+    text: str = Field(description="Exactly what the robot says to the child (spoken aloud, no action markup)")
+    question_type: Literal[QUESTION_TYPES] = Field(
+        description="Kind of question asked: open (what/how/why), closed (yes/no), "
+                    "choice (2-3 options), descriptive (describe/explain), or none"
+    )
+
+
+# JSON schema passed to with_structured_output (dict form, so streaming yields partial arguments)
+TURN_OUTPUT_SCHEMA = TurnOutput.model_json_schema()
+
+
+def bind_structured(llm):
+    """LLM runnable that answers with TurnOutput arguments (dicts, partial while streaming)"""
+    return llm.with_structured_output(TURN_OUTPUT_SCHEMA, method="function_calling", strict=True)
+
+
+def parse_turn(data) -> TurnOutput:
+    """
+    Validate structured LLM output
+
+    Args:
+        data: Function-call arguments (dict) from the structured runnable
+
+    Returns:
+        TurnOutput, or None if the arguments are missing or invalid
+    """
+    if not isinstance(data, dict):
+        return None
+    try:
+        return TurnOutput.model_validate(data)
+    except ValidationError as e:
+        print(f"⚠️ Invalid structured turn output: {e.errors()[:1]}")
+        return None
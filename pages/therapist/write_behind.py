@@ -0,0 +1,279 @@
+"""
+Write-behind persistence for conversation messages
+
+With DatabaseHandler(write_behind=True) (the child view's handler, MESSAGE_WRITE_BEHIND),
+add_message appends the message to a local JSONL journal and returns immediately;
+a background thread writes pending messages to DynamoDB in batches (batch_writer)
+and then appends an ack line to the journal.
+On start-up, journaled messages without an ack are replayed, so a crash between
+the reply and the flush loses nothing (puts are idempotent on message_id).
+
+Each writer holds an exclusive lock on its journal. A second process using the
+same path claims the next free slot (messages.1.jsonl, ...) instead of rewriting
+a journal another process is still appending to; an orphaned slot is replayed by
+the next process that claims it.
+
+Throttling and network errors are retried with backoff, up to max_attempts;
+anything else (or a batch that keeps failing) is moved to a dead-letter file
+next to the journal and acknowledged, so one bad item cannot stall the queue.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, HTTPClientError
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Error codes worth retrying: the same batch can succeed once capacity or the service recovers
+RETRYABLE_ERROR_CODES = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'InternalServerError',
+    'ServiceUnavailable',
+}
+
+# Processes sharing one journal path claim messages.jsonl, messages.1.jsonl, ...
+MAX_JOURNAL_SLOTS = 16
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for throttling and connection errors, False for errors retrying cannot fix"""
+    if isinstance(error, ClientError):
+        return error.response.get('Error', {}).get('Code') in RETRYABLE_ERROR_CODES
+    return isinstance(error, (BotoConnectionError, HTTPClientError))
+
+
+def _try_lock(lock_file) -> bool:
+    """Take an exclusive, non-blocking lock on an open file (released when it is closed)"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _claim_journal(journal_path: str):
+    """
+    Lock the first journal slot no other process holds
+
+    Returns:
+        (journal path, open lock file)
+    """
+    base, ext = os.path.splitext(journal_path)
+    for slot in range(MAX_JOURNAL_SLOTS):
+        path = journal_path if slot == 0 else f"{base}.{slot}{ext}"
+        lock_file = open(path + '.lock', 'a')
+        if _try_lock(lock_file):
+            return path, lock_file
+        lock_file.close()
+    raise RuntimeError(f"all {MAX_JOURNAL_SLOTS} journal slots for {journal_path} are in use")
+
+
+class MessageWriteBehind:
+    """Journaled, batched background writer for one DynamoDB table"""
+
+    def __init__(self, table, journal_path: str, to_item=None, on_flushed=None,
+                 key_name: str = 'message_id', flush_interval: float = 0.2, batch_size: int = 25,
+                 max_attempts: int = 6):
+        """
+        Args:
+            table: DynamoDB table resource
+            journal_path: Local JSONL journal (the next free slot is used if another process holds it)
+            to_item: Converts a journaled (JSON) message to a DynamoDB item
+            on_flushed: Called with the list of messages once they are durable in DynamoDB
+            key_name: Primary key attribute (puts are idempotent on it)
+            flush_interval: Seconds to wait for more messages before writing a batch
+            batch_size: Maximum messages per flush
+            max_attempts: Tries per batch before it is dead-lettered (retryable errors only)
+        """
+        self.table = table
+        self.to_item = to_item or (lambda message: message)
+        self.on_flushed = on_flushed
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.key_name = key_name
+        self.max_attempts = max(1, max_attempts)
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pending = []
+        self._in_flight = 0
+        self._stopped = False
+
+        journal_dir = os.path.dirname(journal_path)
+        if journal_dir:
+            os.makedirs(journal_dir, exist_ok=True)
+        self.journal_path, self._journal_lock = _claim_journal(journal_path)
+        self.dead_letter_path = f"{os.path.splitext(self.journal_path)[0]}.dead.jsonl"
+        self._replay()
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+
+        self._thread = threading.Thread(target=self._run, name="message-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ==================== JOURNAL ====================
+
+    def _replay(self):
+        """Queue journaled messages that were never acknowledged"""
+        if not os.path.exists(self.journal_path):
+            return
+
+        unacked = {}
+        with open(self.journal_path, encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Torn last line from a crash
+                if 'ack' in entry:
+                    for message_id in entry['ack']:
+                        unacked.pop(message_id, None)
+                elif 'message' in entry:
+                    message = entry['message']
+                    unacked[message[self.key_name]] = message
+
+        if unacked:
+            print(f"♻️ Replaying {len(unacked)} unflushed message(s) from {self.journal_path}")
+        self._pending = list(unacked.values())
+
+        # Rewrite the journal with only the pending entries
+        with open(self.journal_path, 'w', encoding='utf-8') as journal:
+            for message in self._pending:
+                journal.write(json.dumps({'message': message}) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+
+    def _append(self, entry: dict):
+        self._journal.write(json.dumps(entry, default=str) + '\n')
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def _compact(self):
+        """Truncate the journal once everything in it is acknowledged (called with the lock held)"""
+        if not self._pending and not self._in_flight:
+            self._journal.seek(0)
+            self._journal.truncate()
+
+    # ==================== WRITES ====================
+
+    def enqueue(self, message: dict):
+        """Journal a message and schedule it for the next batch"""
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("write-behind queue is closed")
+            self._append({'message': message})
+            self._pending.append(message)
+            self._wakeup.notify()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._pending and not self._stopped:
+                    self._wakeup.wait()
+                if not self._pending and self._stopped:
+                    return
+
+            # Give the rest of the turn a moment to join this batch
+            time.sleep(self.flush_interval)
+
+            with self._lock:
+                batch = self._pending[:self.batch_size]
+                del self._pending[:len(batch)]
+                self._in_flight += len(batch)
+
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: list):
+        delay = 0.5
+        error = None
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                with self.table.batch_writer(overwrite_by_pkeys=[self.key_name]) as writer:
+                    for message in batch:
+                        writer.put_item(Item=self.to_item(message))
+                error = None
+                break
+            except Exception as e:
+                error = e
+                if not is_retryable(e) or attempt == self.max_attempts:
+                    break
+                print(f"❌ Write-behind flush failed (attempt {attempt}/{self.max_attempts}), "
+                      f"retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, 10)
+
+        if error is not None:
+            self._dead_letter(batch, error)
+
+        with self._lock:
+            self._in_flight -= len(batch)
+            self._append({'ack': [message[self.key_name] for message in batch]})
+            self._compact()
+            self._wakeup.notify_all()
+
+        if error is None and self.on_flushed:
+            try:
+                self.on_flushed(batch)
+            except Exception as e:
+                print(f"⚠️ Write-behind flush callback failed: {e}")
+
+    def _dead_letter(self, batch: list, error: Exception):
+        """Keep a batch that cannot be written, so it can be inspected and re-imported by hand"""
+        print(f"🪦 Write-behind gave up on {len(batch)} message(s), moved to {self.dead_letter_path}: {error}")
+        try:
+            with open(self.dead_letter_path, 'a', encoding='utf-8') as dead_letters:
+                for message in batch:
+                    dead_letters.write(json.dumps(
+                        {'message': message, 'error': str(error), 'failed_at': time.time()}, default=str
+                    ) + '\n')
+                dead_letters.flush()
+                os.fsync(dead_letters.fileno())
+        except Exception as e:
+            print(f"❌ Could not write dead-letter file: {e}")
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending) + self._in_flight
+
+    def flush(self, timeout: float = 10) -> bool:
+        """
+        Block until every queued message is in DynamoDB
+
+        Returns:
+            True if the queue drained before the timeout
+        """
+        deadline = time.time() + timeout
+        with self._lock:
+            self._wakeup.notify_all()
+            while self._pending or self._in_flight:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._wakeup.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 10):
+        """Flush what is pending and stop the background thread (the journal keeps anything left)"""
+        if self._stopped:
+            return
+        self.flush(timeout)
+        with self._lock:
+            self._stopped = True
+            self._wakeup.notify_all()
+        self._thread.join(timeout=1)
+        self._journal.close()
+        self._journal_lock.close()